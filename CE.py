@@ -1,5 +1,4 @@
 import sys
-import webbrowser
 import tkinter as tk
 from tkinter import messagebox, filedialog
 import ttkbootstrap as ttk
@@ -7,6 +6,7 @@ from ttkbootstrap.constants import *
 import sqlite3
 import os
 import csv
+import configparser
 from datetime import datetime
 import shutil
 import uuid
@@ -15,25 +15,19 @@ import time
 import threading
 import hashlib
 
-# Optional camera/pyzbar support for barcode scanning
-try:
-    import cv2
-    CV2_AVAILABLE = True
-except Exception:
-    CV2_AVAILABLE = False
-
-try:
-    from pyzbar import pyzbar
-    PYZBAR_AVAILABLE = True
-except Exception:
-    PYZBAR_AVAILABLE = False
-
-# Optional Pillow support for image preview
-try:
-    from PIL import Image, ImageTk
-    PIL_AVAILABLE = True
-except Exception:
-    PIL_AVAILABLE = False
+from utils import thresholds
+from utils.csv_export import iter_inventory_csv
+from utils.search_index import match_filter
+from utils.aggregates import read_totals
+from utils.db_pool import connect as open_connection, load_settings
+from utils.db_worker import DBWorker, TkDispatcher
+from utils.migrations import migrate
+from utils.sales import SaleError, sell
+from utils.suggest import SuggestionIndex
+from utils import query_profiler
+from utils.virtual_table import RowModel, VirtualTreeview
+# Camera (OpenCV/pyzbar) and Pillow support load on first use, not at launch
+from utils import lazy_imports
 
 # --- Define Theme Colors ---
 ThemeColors = {
@@ -50,6 +44,13 @@ ThemeColors = {
     "border": "#E2E8F0"
 }
 
+# Inventory table: Treeview heading -> inventory_v2 column it shows and sorts by
+TABLE_COLUMNS = ("id", "sku", "name", "category", "quantity", "price", "status")
+HEADING_SORTS = {"ID": "id", "SKU": "sku", "Title": "name", "Category": "category",
+                 "QTY": "quantity", "Price": "price", "Status": "status"}
+# Pause in typing before the search box asks for suggestions
+SUGGEST_DELAY_MS = 150
+
 def get_base_dir():
     return getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
 
@@ -88,14 +89,8 @@ class LoginWindow(ttk.Toplevel):
         self.geometry(f'{width}x{height}+{x}+{y}')
 
     def init_users_table(self):
+        migrate(self.conn)
         cursor = self.conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                username TEXT PRIMARY KEY,
-                password_hash TEXT,
-                role TEXT
-            )
-        """)
         cursor.execute("SELECT count(*) FROM users")
         if cursor.fetchone()[0] == 0:
             admin_pass = hashlib.sha256("admin".encode()).hexdigest()
@@ -193,8 +188,13 @@ class InventoryApp:
         self._barcode_buf = ""
         self._barcode_last_time = 0.0
 
-        self.low_stock_threshold = 10
-        self.category_thresholds = {}
+        # Synced with the database before each use, so threshold changes from the web app apply here too
+        self.thresholds = thresholds.ThresholdResolver()
+        self.search_placeholder = "Search products, SKUs, categories..."
+        self.status_var = tk.StringVar(value="Ready")
+        self.time_var = tk.StringVar(value="")
+        self._busy = 0
+        self._search_term = None
 
         self.root.title(f"CHRIS EFFECT - Dashboard | Logged in as: {username.upper()} ({role.upper()})")
         self.root.geometry("1200x800")
@@ -207,12 +207,32 @@ class InventoryApp:
             pass
         self.configure_custom_styles()
 
+        # [LOGGING] QUERY_PROFILER in config.ini turns on the slow-query log
+        config = configparser.ConfigParser()
+        config.read(os.path.join(self.base_dir, "config.ini"))
+        self.query_profiler = query_profiler.from_config(config, self.base_dir)
+        query_profiler.install(self.query_profiler)
+
         db_path = os.path.join(self.base_dir, "store_inventory.db")
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        settings = load_settings(config)
+        factory = query_profiler.connection_factory()
+        # Dialog lookups and single-row writes stay on the Tk thread
+        self.conn = open_connection(db_path, settings, row_factory=None, factory=factory)
         self.cursor = self.conn.cursor()
         self.create_table()
-        self._load_settings()
-        self._load_category_thresholds()
+        # Listing, search, dashboard, import and export run on the DB worker's own connection
+        self.db = DBWorker(lambda: open_connection(db_path, settings, row_factory=None, factory=factory))
+        self.dispatcher = TkDispatcher(self.root)
+        # One row model for the app's lifetime, so the sort and loaded pages outlive view rebuilds
+        self.table_model = RowModel(self.db.connection(), TABLE_COLUMNS)
+        self._table_sort = (self.table_model.sort, self.table_model.descending)
+        # Type-ahead gets its own worker, so a long listing or import never delays it
+        self.suggestions = SuggestionIndex()
+        self.suggest_db = DBWorker(lambda: open_connection(db_path, settings, row_factory=None, factory=factory),
+                                   name="suggest-worker")
+        self.suggest_db.submit(self.suggestions.load)
+        self._suggest_timer = None
+        self._suggest_future = None
 
         self.root.grid_columnconfigure(1, weight=1)
         self.root.grid_rowconfigure(0, weight=1)
@@ -222,9 +242,9 @@ class InventoryApp:
         self.main_content_frame = ttk.Frame(self.root, padding=20)
         self.main_content_frame.grid(row=0, column=1, sticky="nsew")
 
+        self.build_status_bar()
         self.build_header()
         self.build_dashboard_view()
-        self.build_status_bar()
         self.bind_shortcuts()
         self.show_inventory()
         self._update_clock()
@@ -267,7 +287,9 @@ class InventoryApp:
             if not os.path.exists(p): continue
             try:
                 abs_p = os.path.abspath(p)
-                if PIL_AVAILABLE:
+                pil = lazy_imports.load_pil()
+                if pil:
+                    Image, ImageTk = pil
                     img = Image.open(abs_p)
                     img.thumbnail((256, 256))
                     tkimg = ImageTk.PhotoImage(img)
@@ -290,7 +312,9 @@ class InventoryApp:
         top = tk.Toplevel(self.root)
         top.title(title)
         top.geometry("500x500")
-        if PIL_AVAILABLE:
+        pil = lazy_imports.load_pil()
+        if pil:
+            Image, ImageTk = pil
             img = Image.open(image_path)
             img.thumbnail((480, 480))
             tkimg = ImageTk.PhotoImage(img)
@@ -303,17 +327,57 @@ class InventoryApp:
     def _set_status(self, message):
         self.status_var.set(message)
 
+    # --- Background database work ---
+    def run_in_background(self, job, on_done=None, message=None, on_error=None):
+        """Run job(conn) on the DB worker; on_done(result) then runs on the Tk thread
+
+        message shows in the status bar, with the busy indicator, until the job ends.
+        """
+        if message:
+            self._begin_busy(message)
+
+        def finish(result):
+            if message:
+                self._end_busy()
+            if on_done is not None:
+                on_done(result)
+
+        def failed(error):
+            if message:
+                self._end_busy()
+            if on_error is not None:
+                on_error(error)
+            else:
+                messagebox.showerror("Error", str(error))
+        return self.dispatcher.when_done(self.db.submit(job), finish, failed)
+
+    def _run_table_job(self, job, callback):
+        # VirtualTreeview's runner: its model only touches the worker's connection
+        self.run_in_background(lambda conn: job(), callback)
+
+    def _begin_busy(self, message):
+        self._busy += 1
+        self._set_status(message)
+        if self._busy == 1:
+            self.busy_bar.pack(side="right", padx=12)
+            self.busy_bar.start(15)
+            self.root.configure(cursor="watch")
+
+    def _end_busy(self):
+        self._busy = max(0, self._busy - 1)
+        if self._busy == 0:
+            self.busy_bar.stop()
+            self.busy_bar.pack_forget()
+            self.root.configure(cursor="")
+
     def _update_clock(self):
         self.time_var.set(datetime.now().strftime("%b %d, %Y %I:%M %p"))
         self.root.after(30000, self._update_clock)
 
-    def _compute_status(self, qty, category=None):
-        threshold = self._get_category_threshold(category)
-        if qty <= 0:
-            return "Out of Stock"
-        if qty < threshold:
-            return "Low Stock"
-        return "In Stock"
+    def _compute_status(self, qty, category=None, conn=None):
+        """Status for qty under the current thresholds; pass conn off the Tk thread"""
+        self.thresholds.sync(conn or self.conn)
+        return self.thresholds.status(qty, category)
 
     def _get_categories(self):
         try:
@@ -329,53 +393,6 @@ class InventoryApp:
                 cats.append(d)
         return cats
 
-    def _load_settings(self):
-        try:
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS app_settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT
-                )
-            """)
-            self.conn.commit()
-            self.cursor.execute("SELECT value FROM app_settings WHERE key='low_stock_default'")
-            row = self.cursor.fetchone()
-            if row and row[0].strip().isdigit():
-                self.low_stock_threshold = int(row[0])
-        except Exception:
-            pass
-
-    def _save_setting(self, key, value):
-        self.cursor.execute(
-            "INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)",
-            (key, str(value)),
-        )
-        self.conn.commit()
-
-    def _load_category_thresholds(self):
-        self.category_thresholds = {}
-        try:
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS category_thresholds (
-                    category TEXT PRIMARY KEY,
-                    threshold INTEGER NOT NULL
-                )
-            """)
-            self.conn.commit()
-            self.cursor.execute("SELECT category, threshold FROM category_thresholds")
-            for cat, threshold in self.cursor.fetchall():
-                try:
-                    self.category_thresholds[cat] = int(threshold)
-                except Exception:
-                    continue
-        except Exception:
-            pass
-
-    def _get_category_threshold(self, category):
-        if not category:
-            return self.low_stock_threshold
-        return self.category_thresholds.get(category, self.low_stock_threshold)
-
     def _set_search_placeholder(self):
         if self.entry_search.get():
             return
@@ -462,6 +479,8 @@ class InventoryApp:
         ttk.Label(self.status_bar, textvariable=self.time_var, style="Status.TLabel").pack(
             side="right", padx=12
         )
+        # Shown while background database work is running
+        self.busy_bar = ttk.Progressbar(self.status_bar, mode="indeterminate", length=120)
 
     def build_dashboard_view(self):
         self.summary_frame = ttk.Frame(self.main_content_frame)
@@ -511,14 +530,45 @@ class InventoryApp:
 
         alerts = ttk.Frame(self.main_content_frame)
         alerts.pack(fill="x", pady=(6, 20))
+        ttk.Label(alerts, text="Loading...", foreground=ThemeColors["text_dim"]).pack(anchor="w")
+
+        recent_frame = ttk.Frame(self.main_content_frame)
+        recent_frame.pack(fill="x", pady=(0, 8))
+        ttk.Label(recent_frame, text="Recent Activity", font=("Segoe UI", 14, "bold")).pack(anchor="w")
+
+        activity = ttk.Frame(self.main_content_frame)
+        activity.pack(fill="x")
+        ttk.Label(activity, text="Loading...", foreground=ThemeColors["text_dim"]).pack(anchor="w")
+
+        self.run_in_background(
+            self._load_dashboard,
+            lambda result: self._fill_dashboard(alerts, activity, *result),
+            message="Loading dashboard...",
+        )
 
+    def _load_dashboard(self, conn):
+        """(low stock rows, recent sales) for the dashboard; runs on the DB worker"""
         try:
-            self.cursor.execute(
+            low_rows = conn.execute(
                 "SELECT id, name, category, quantity FROM inventory_v2 WHERE quantity > 0 ORDER BY quantity ASC LIMIT 3"
-            )
-            low_rows = self.cursor.fetchall()
+            ).fetchall()
         except Exception:
             low_rows = []
+        try:
+            recent_rows = conn.execute(
+                "SELECT name, quantity, sale_date FROM sales ORDER BY sale_date DESC LIMIT 5"
+            ).fetchall()
+        except Exception:
+            recent_rows = []
+        return low_rows, recent_rows
+
+    def _fill_dashboard(self, alerts, activity, low_rows, recent_rows):
+        # The user may have left the dashboard while it loaded
+        if not alerts.winfo_exists():
+            return
+        for frame in (alerts, activity):
+            for child in frame.winfo_children():
+                child.destroy()
 
         if not low_rows:
             ttk.Label(alerts, text="No low stock items.", foreground=ThemeColors["text_dim"]).pack(anchor="w")
@@ -533,21 +583,6 @@ class InventoryApp:
                 ttk.Label(card, text=category or "Uncategorized", foreground=ThemeColors["text_dim"]).pack(anchor="w", pady=(4, 6))
                 ttk.Button(card, text="Restock", style="Soft.TButton", command=lambda p=pid: self.open_edit_product_popup(p)).pack(anchor="w")
 
-        recent_frame = ttk.Frame(self.main_content_frame)
-        recent_frame.pack(fill="x", pady=(0, 8))
-        ttk.Label(recent_frame, text="Recent Activity", font=("Segoe UI", 14, "bold")).pack(anchor="w")
-
-        activity = ttk.Frame(self.main_content_frame)
-        activity.pack(fill="x")
-
-        try:
-            self.cursor.execute(
-                "SELECT name, quantity, sale_date FROM sales ORDER BY sale_date DESC LIMIT 5"
-            )
-            recent_rows = self.cursor.fetchall()
-        except Exception:
-            recent_rows = []
-
         if not recent_rows:
             ttk.Label(activity, text="No recent sales.", foreground=ThemeColors["text_dim"]).pack(anchor="w")
         else:
@@ -588,13 +623,18 @@ class InventoryApp:
         aligns = ["w", "w", "w", "w", "center", "e", "center"]
         
         for col, w, a in zip(cols, widths, aligns):
-            self.tree.heading(col, text=col, anchor=a, command=lambda c=col: self.sort_treeview(c, False))
+            self.tree.heading(col, text=col, anchor=a, command=lambda c=col: self.sort_treeview(c))
             self.tree.column(col, width=w, anchor=a)
 
-        sb = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=sb.set)
+        # Only the rows on screen are Treeview items; the scrollbar moves through the model
+        sb = ttk.Scrollbar(self.table_frame, orient="vertical")
         sb.pack(side="right", fill="y")
         self.tree.pack(fill="both", expand=True)
+        self.table = VirtualTreeview(
+            self.tree, sb, self.table_model, self._format_inventory_row, run=self._run_table_job,
+        )
+        self._search_term = None
+        self._show_sort_headings()
         
         self.tree.bind("<Double-1>", self.show_product_image_popup)
         self.tree.tag_configure('low_stock', foreground=ThemeColors['warning'])
@@ -604,28 +644,30 @@ class InventoryApp:
 
         self.setup_context_menu()
 
-    def _coerce_sort_value(self, col, value):
-        if col in ("ID", "QTY"):
-            try:
-                return int(value)
-            except Exception:
-                return 0
-        if col == "Price":
-            try:
-                return float(str(value).replace("$", ""))
-            except Exception:
-                return 0.0
-        return str(value).lower()
-
-    def sort_treeview(self, col, reverse):
-        data = []
-        for child in self.tree.get_children(""):
-            value = self.tree.set(child, col)
-            data.append((self._coerce_sort_value(col, value), child))
-        data.sort(reverse=reverse)
-        for index, (_, child) in enumerate(data):
-            self.tree.move(child, "", index)
-        self.tree.heading(col, command=lambda c=col: self.sort_treeview(c, not reverse))
+    def _format_inventory_row(self, row, index):
+        pid, sku, name, category, qty, price, status = row
+        tags = ['even' if index % 2 == 0 else 'odd']
+        if status == "Low Stock":
+            tags.append('low_stock')
+        elif status == "Out of Stock":
+            tags.append('out_stock')
+        return (pid, sku, name, category, qty, f"{price:.2f}", status), tuple(tags)
+
+    def sort_treeview(self, col, reverse=None):
+        """Sort by a heading's column; reverse=None flips it if the table is already sorted by col"""
+        # ORDER BY on the column's index in SQLite; the rows on screen are reloaded from the top
+        sort = HEADING_SORTS[col]
+        if reverse is None:
+            reverse = self._table_sort == (sort, False)
+        self._table_sort = (sort, reverse)
+        self._show_sort_headings()
+        self.table.refresh(reset_position=True, prepare=lambda model: model.set_sort(sort, reverse))
+
+    def _show_sort_headings(self):
+        sort, reverse = self._table_sort
+        for col, col_sort in HEADING_SORTS.items():
+            arrow = (" ▼" if reverse else " ▲") if col_sort == sort else ""
+            self.tree.heading(col, text=col + arrow)
 
     def setup_context_menu(self):
         self.context_menu = tk.Menu(self.root, tearoff=0)
@@ -645,6 +687,7 @@ class InventoryApp:
                 item = self.tree.identify_row(event.y)
                 if item:
                     if item not in self.tree.selection():
+                        self.table.clear_selection()
                         self.tree.selection_set(item)
                     self.context_menu.tk_popup(event.x_root, event.y_root)
             finally:
@@ -654,143 +697,112 @@ class InventoryApp:
 
     # --- DATABASE & LOGIC ---
     def create_table(self):
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS inventory_v2 (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                sku TEXT,
-                name TEXT NOT NULL,
-                category TEXT,
-                quantity INTEGER NOT NULL,
-                price REAL NOT NULL,
-                status TEXT DEFAULT 'In Stock',
-                image TEXT
-            )
-        """)
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sales (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_id INTEGER,
-                sku TEXT,
-                name TEXT,
-                quantity INTEGER,
-                price REAL,
-                sale_date TEXT
-            )
-        """)
-        self.conn.commit()
+        # Tables, triggers and indexes are versioned in utils/migrations.py
+        migrate(self.conn)
 
     def delete_product(self):
         if self.current_role != 'admin':
             messagebox.showerror("Permission Denied", "Only Admins can delete items.")
             return
 
-        selected_items = self.tree.selection()
-        if not selected_items:
+        selected_ids = self.table.selected_ids()
+        if not selected_ids:
             messagebox.showwarning("Error", "Please select items to delete.")
             return
 
-        count = len(selected_items)
+        count = len(selected_ids)
         if not messagebox.askyesno("Confirm", f"Delete {count} items?"):
             return
 
         try:
-            for item in selected_items:
-                vals = self.tree.item(item)['values']
-                if vals:
-                    self.cursor.execute("DELETE FROM inventory_v2 WHERE id=?", (vals[0],))
+            self.cursor.executemany("DELETE FROM inventory_v2 WHERE id=?", [(pid,) for pid in selected_ids])
             self.conn.commit()
-            self.show_inventory()
-            self.refresh_summary()
+            self.table.clear_selection()
+            self.refresh_table()
             messagebox.showinfo("Success", "Items deleted.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed: {e}")
     
     def refresh_summary(self):
+        self.run_in_background(read_totals, self._show_totals, on_error=lambda e: None)
+
+    def _show_totals(self, totals):
         try:
-            self.cursor.execute("SELECT COUNT(*), COALESCE(SUM(quantity),0), COALESCE(SUM(quantity*price),0) FROM inventory_v2")
-            res = self.cursor.fetchone()
-            self.cursor.execute("SELECT category, quantity FROM inventory_v2")
-            low = 0
-            for category, qty in self.cursor.fetchall():
-                if self._compute_status(qty, category) == "Low Stock":
-                    low += 1
-            
-            self.lbl_total_products.config(text=str(res[0]))
+            self.lbl_total_products.config(text=str(totals["product_count"]))
             if hasattr(self, "lbl_total_qty"):
-                self.lbl_total_qty.config(text=f"Total quantity: {res[1]}")
-            self.lbl_inventory_value.config(text=f"${res[2]:.2f}")
-            self.lbl_low_stock.config(text=str(low))
+                self.lbl_total_qty.config(text=f"Total quantity: {totals['total_quantity']}")
+            self.lbl_inventory_value.config(text=f"${totals['total_value']:.2f}")
+            self.lbl_low_stock.config(text=str(totals["low_stock_count"]))
         except: pass
 
     def show_inventory(self):
         if not hasattr(self, "tree") or not self.tree.winfo_exists():
             self._build_inventory_view()
-        self.tree.delete(*self.tree.get_children())
-        self.cursor.execute("SELECT id, sku, name, category, quantity, price, status FROM inventory_v2")
-        updates = []
-        rows = self.cursor.fetchall()
-        for idx, r in enumerate(rows):
-            pid, sku, name, category, qty, price, status = r
-            new_status = self._compute_status(qty, category)
-            if new_status != status:
-                updates.append((new_status, pid))
-                status = new_status
-            tags = ['even' if idx % 2 == 0 else 'odd']
-            if status == "Low Stock":
-                tags.append('low_stock')
-            elif status == "Out of Stock":
-                tags.append('out_stock')
-            self.tree.insert("", "end", values=(pid, sku, name, category, qty, f"{price:.2f}", status), tags=tuple(tags))
-        if updates:
-            self.cursor.executemany("UPDATE inventory_v2 SET status=? WHERE id=?", updates)
-            self.conn.commit()
+        # Keeps the scroll position unless a search was showing
+        searching, self._search_term = self._search_term, None
+        self._begin_busy("Loading inventory...")
+
+        def loaded(total):
+            self._end_busy()
+            self._set_status(f"Loaded {total} items")
+        self.table.refresh(reset_position=searching is not None, prepare=lambda model: model.set_filter(), on_done=loaded)
+        self.refresh_summary()
+
+    def refresh_table(self):
+        """Show writes in the inventory table, redrawing only the rows they changed"""
+        if not hasattr(self, "tree") or not self.tree.winfo_exists():
+            return self.show_inventory()
+        self.table.sync()
         self.refresh_summary()
-        self._set_status(f"Loaded {len(rows)} items")
 
-    def search_product(self):
+    def search_product(self, on_done=None):
+        """Filter the table by the search box; on_done(match count) once it is shown"""
         term = self.entry_search.get().strip()
         if not term or term == self.search_placeholder:
             return self.show_inventory()
-        self.tree.delete(*self.tree.get_children())
-        self.cursor.execute(
-            "SELECT id, sku, name, category, quantity, price, status FROM inventory_v2 "
-            "WHERE name LIKE ? OR sku LIKE ? OR category LIKE ?",
-            ('%'+term+'%', '%'+term+'%', '%'+term+'%')
+        if not hasattr(self, "tree") or not self.tree.winfo_exists():
+            self._build_inventory_view()
+        self._search_term = term
+        self._begin_busy(f"Searching for {term}...")
+
+        def found(total):
+            self._end_busy()
+            self._set_status(f"Search results: {total} items")
+            if on_done is not None:
+                on_done(total)
+        # Matches stay in the table's current sort order
+        self.table.refresh(
+            reset_position=True,
+            prepare=lambda model: model.set_filter(*match_filter(model.conn, term)),
+            on_done=found,
         )
-        rows = self.cursor.fetchall()
-        updates = []
-        for idx, r in enumerate(rows):
-            pid, sku, name, category, qty, price, status = r
-            new_status = self._compute_status(qty, category)
-            if new_status != status:
-                updates.append((new_status, pid))
-                status = new_status
-            tags = ['even' if idx % 2 == 0 else 'odd']
-            if status == "Low Stock":
-                tags.append('low_stock')
-            elif status == "Out of Stock":
-                tags.append('out_stock')
-            self.tree.insert("", "end", values=(pid, sku, name, category, qty, f"{price:.2f}", status), tags=tuple(tags))
-        if updates:
-            self.cursor.executemany("UPDATE inventory_v2 SET status=? WHERE id=?", updates)
-            self.conn.commit()
-        self._set_status(f"Search results: {len(rows)} items")
-        return len(rows)
 
     def on_search_keyrelease(self, event):
+        # Debounce: only the term left after a pause in typing is looked up
+        if self._suggest_timer is not None:
+            self.root.after_cancel(self._suggest_timer)
+            self._suggest_timer = None
         term = self.entry_search.get().strip()
         if term and term != self.search_placeholder:
-            self.query_suggestions(term)
+            self._suggest_timer = self.root.after(SUGGEST_DELAY_MS, lambda: self.query_suggestions(term))
         else:
             self.hide_suggestions()
 
     def query_suggestions(self, term):
-        try:
-            self.cursor.execute("SELECT name FROM inventory_v2 WHERE name LIKE ? LIMIT 5", ('%'+term+'%',))
-            rows = [r[0] for r in self.cursor.fetchall()]
-            if rows: self.show_suggestions(rows)
-            else: self.hide_suggestions()
-        except: pass
+        self._suggest_timer = None
+        # A lookup still queued for an older term is dropped
+        if self._suggest_future is not None:
+            self._suggest_future.cancel()
+        self._suggest_future = self.suggest_db.submit(self.suggestions.lookup, term)
+        self.dispatcher.when_done(self._suggest_future, lambda texts: self._show_suggestions_for(term, texts),
+                                  on_error=lambda e: None)
+
+    def _show_suggestions_for(self, term, texts):
+        # The box has moved on since this lookup was sent
+        if self.entry_search.get().strip() != term:
+            return
+        if texts: self.show_suggestions(texts)
+        else: self.hide_suggestions()
 
     def show_suggestions(self, texts):
         if not hasattr(self, 'sugg_win') or not self.sugg_win:
@@ -799,8 +811,10 @@ class InventoryApp:
             self.sugg_lb = tk.Listbox(self.sugg_win)
             self.sugg_lb.pack(fill='both', expand=True)
             self.sugg_lb.bind('<Button-1>', lambda e: self.apply_sugg())
-        self.sugg_lb.delete(0, 'end')
-        for t in texts: self.sugg_lb.insert('end', t)
+        # Keep the list as it is when the matches haven't changed
+        if tuple(texts) != self.sugg_lb.get(0, 'end'):
+            self.sugg_lb.delete(0, 'end')
+            for t in texts: self.sugg_lb.insert('end', t)
         x, y, w = self.entry_search.winfo_rootx(), self.entry_search.winfo_rooty() + self.entry_search.winfo_height(), self.entry_search.winfo_width()
         self.sugg_win.geometry(f"{w}x{len(texts)*20}+{x}+{y}")
         self.sugg_win.deiconify()
@@ -824,7 +838,7 @@ class InventoryApp:
         top.transient(self.root)
         top.grab_set()
 
-        self._load_category_thresholds()
+        self.thresholds.sync(self.conn)
 
         wrap = ttk.Frame(top, padding=16)
         wrap.pack(fill="both", expand=True)
@@ -832,7 +846,7 @@ class InventoryApp:
         default_frame = ttk.Labelframe(wrap, text="Default Threshold", padding=10)
         default_frame.pack(fill="x", pady=(0, 12))
 
-        default_var = tk.StringVar(value=str(self.low_stock_threshold))
+        default_var = tk.StringVar(value=str(self.thresholds.default))
         ttk.Label(default_frame, text="Default quantity threshold:").pack(side="left")
         default_entry = ttk.Entry(default_frame, textvariable=default_var, width=8)
         default_entry.pack(side="left", padx=8)
@@ -845,11 +859,10 @@ class InventoryApp:
             except Exception:
                 messagebox.showerror("Invalid", "Default threshold must be a non-negative integer.")
                 return
-            self.low_stock_threshold = val
-            self._save_setting("low_stock_default", val)
+            # Stored statuses are updated in the same transaction
+            thresholds.set_default_threshold(self.conn, val)
             self._refresh_threshold_tree(tree)
-            self.show_inventory()
-            self.refresh_summary()
+            self.refresh_table()
             self._set_status("Default threshold updated")
 
         ttk.Button(default_frame, text="Save", style="Accent.TButton", command=save_default).pack(side="left", padx=6)
@@ -893,7 +906,7 @@ class InventoryApp:
             cat, thr = tree.item(sel[0], "values")
             cat_var.set(cat)
             if isinstance(thr, str) and thr.startswith("Default"):
-                thr_var.set(str(self.low_stock_threshold))
+                thr_var.set(str(self.thresholds.default))
             else:
                 thr_var.set(str(thr))
 
@@ -909,15 +922,9 @@ class InventoryApp:
             except Exception:
                 messagebox.showerror("Invalid", "Threshold must be a non-negative integer.")
                 return
-            self.cursor.execute(
-                "INSERT OR REPLACE INTO category_thresholds (category, threshold) VALUES (?, ?)",
-                (cat, val),
-            )
-            self.conn.commit()
-            self.category_thresholds[cat] = val
+            thresholds.set_category_threshold(self.conn, cat, val)
             self._refresh_threshold_tree(tree)
-            self.show_inventory()
-            self.refresh_summary()
+            self.refresh_table()
             self._set_status(f"Set {cat} threshold to {val}")
 
         def clear_override():
@@ -928,13 +935,9 @@ class InventoryApp:
                     cat = tree.item(sel[0], "values")[0]
             if not cat:
                 return
-            self.cursor.execute("DELETE FROM category_thresholds WHERE category=?", (cat,))
-            self.conn.commit()
-            if cat in self.category_thresholds:
-                del self.category_thresholds[cat]
+            thresholds.clear_category_threshold(self.conn, cat)
             self._refresh_threshold_tree(tree)
-            self.show_inventory()
-            self.refresh_summary()
+            self.refresh_table()
             self._set_status(f"Cleared {cat} override")
 
         ttk.Button(btns, text="Save Override", bootstyle="success", command=save_override).pack(side="left", expand=True, fill="x", padx=(0, 6))
@@ -945,12 +948,14 @@ class InventoryApp:
 
     def _refresh_threshold_tree(self, tree):
         tree.delete(*tree.get_children())
-        cats = sorted(set(self._get_categories()) | set(self.category_thresholds.keys()))
+        self.thresholds.sync(self.conn)
+        overrides = self.thresholds.overrides
+        cats = sorted(set(self._get_categories()) | set(overrides.keys()))
         for cat in cats:
-            if cat in self.category_thresholds:
-                tree.insert("", "end", values=(cat, self.category_thresholds[cat]))
+            if cat in overrides:
+                tree.insert("", "end", values=(cat, overrides[cat]))
             else:
-                tree.insert("", "end", values=(cat, f"Default ({self.low_stock_threshold})"))
+                tree.insert("", "end", values=(cat, f"Default ({self.thresholds.default})"))
 
     def open_add_product_popup(self):
         self.add_popup = ttk.Toplevel(self.root)
@@ -1037,18 +1042,18 @@ class InventoryApp:
             )
             self.conn.commit()
             self.add_popup.destroy()
-            self.show_inventory()
+            self.refresh_table()
             self._set_status(f"Added product: {name}")
         except Exception as e:
             messagebox.showerror("Error", f"Invalid Input: {e}")
 
     def open_edit_product_popup(self, pid=None):
         if pid is None:
-            sel = self.tree.selection()
+            sel = self.table.selected_ids()
             if not sel:
                 messagebox.showwarning("Select", "Please select a product to edit.")
                 return
-            pid = self.tree.item(sel[0])["values"][0]
+            pid = sel[0]
         self.cursor.execute(
             "SELECT sku, name, category, quantity, price, image FROM inventory_v2 WHERE id=?",
             (pid,),
@@ -1157,7 +1162,7 @@ class InventoryApp:
             )
             self.conn.commit()
             self.edit_popup.destroy()
-            self.show_inventory()
+            self.refresh_table()
             self._set_status(f"Updated product: {name}")
         except Exception as e:
             messagebox.showerror("Error", f"Update failed: {e}")
@@ -1170,9 +1175,9 @@ class InventoryApp:
         f.pack(fill='both')
 
         if product_id is None:
-            sel = self.tree.selection()
+            sel = self.table.selected_ids() if hasattr(self, "table") else []
             if sel:
-                product_id = self.tree.item(sel[0])["values"][0]
+                product_id = sel[0]
         
         self.cursor.execute("SELECT id, name, quantity FROM inventory_v2")
         rows = self.cursor.fetchall()
@@ -1207,29 +1212,24 @@ class InventoryApp:
                 messagebox.showerror("Error", "Quantity must be greater than zero.")
                 return
             
-            self.cursor.execute("SELECT quantity, price, name, sku, category FROM inventory_v2 WHERE id=?", (pid,))
-            cur_qty, price, name, sku, category = self.cursor.fetchone()
-            
-            if qty_sold > cur_qty:
-                messagebox.showerror("Error", "Not enough stock")
+            # Stock check, decrement and status happen in one conditional UPDATE
+            try:
+                sell(self.conn, pid, qty_sold)
+            except SaleError as e:
+                messagebox.showerror("Error", str(e))
                 return
-                
-            new_qty = cur_qty - qty_sold
-            status = self._compute_status(new_qty, category)
-            self.cursor.execute("UPDATE inventory_v2 SET quantity=?, status=? WHERE id=?", (new_qty, status, pid))
-            self.cursor.execute("INSERT INTO sales (product_id, sku, name, quantity, price, sale_date) VALUES (?,?,?,?,?,?)",
-                                (pid, sku, name, qty_sold, price, datetime.now().isoformat()))
-            self.conn.commit()
+            self.cursor.execute("SELECT name FROM inventory_v2 WHERE id=?", (pid,))
+            name = self.cursor.fetchone()[0]
             self.sale_popup.destroy()
-            self.show_inventory()
+            self.refresh_table()
             messagebox.showinfo("Success", "Sale Recorded")
             self._set_status(f"Sale recorded: {name} (-{qty_sold})")
         except Exception as e: messagebox.showerror("Error", str(e))
 
     def show_product_image_popup(self, event=None):
-        sel = self.tree.selection()
+        sel = self.table.selected_ids()
         if not sel: return
-        pid = self.tree.item(sel)['values'][0]
+        pid = sel[0]
         self.cursor.execute("SELECT image FROM inventory_v2 WHERE id=?", (pid,))
         res = self.cursor.fetchone()
         if res and res[0] and os.path.exists(os.path.join(self.base_dir, res[0])):
@@ -1263,6 +1263,7 @@ class InventoryApp:
         columns = 4
         thumb_size = (150, 150)
         self._marketplace_images = [] 
+        pil = lazy_imports.load_pil()
 
         for index, row_data in enumerate(rows):
             pid, name, price, img_rel = row_data
@@ -1273,8 +1274,9 @@ class InventoryApp:
 
             img_path = self._resolve_image_path(img_rel)
             tk_image = None
-            if img_path and os.path.exists(img_path) and PIL_AVAILABLE:
+            if img_path and os.path.exists(img_path) and pil:
                 try:
+                    Image, ImageTk = pil
                     pil_img = Image.open(img_path)
                     pil_img.thumbnail(thumb_size)
                     tk_image = ImageTk.PhotoImage(pil_img)
@@ -1407,23 +1409,50 @@ class InventoryApp:
         path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")])
         if not path:
             return
-        try:
-            rows = self._read_csv_rows(path)
-        except Exception as e:
-            messagebox.showerror("Import Failed", f"Could not read CSV:\n{e}")
-            return
-        if not rows:
-            messagebox.showinfo("Import", "No rows found in the CSV.")
-            return
 
-        self.cursor.execute("SELECT id, sku FROM inventory_v2")
-        existing_ids = {int(r[0]) for r in self.cursor.fetchall() if r[0] is not None}
-        self.cursor.execute("SELECT sku FROM inventory_v2 WHERE sku IS NOT NULL AND sku != ''")
-        existing_skus = {r[0] for r in self.cursor.fetchall()}
+        def planned(plan):
+            if plan is None:
+                messagebox.showinfo("Import", "No rows found in the CSV.")
+                return
+            choice = None
+            if plan["conflicts"]:
+                choice = self._prompt_conflict_handling()
+                if choice is None:
+                    return
+            self.run_in_background(
+                lambda conn: self._apply_csv_import(conn, plan, choice), imported, message="Importing CSV..."
+            )
+
+        def imported(counts):
+            imported_, updated, skipped, invalid = counts
+            self.refresh_table()
+            messagebox.showinfo(
+                "Import Complete",
+                f"Imported: {imported_}\nUpdated: {updated}\nSkipped: {skipped}\nInvalid: {invalid}",
+            )
+            self._set_status(f"Imported CSV: {imported_} new, {updated} updated, {skipped} skipped, {invalid} invalid")
 
-        choice = None
-        imported = updated = skipped = invalid = 0
+        self.run_in_background(
+            lambda conn: self._plan_csv_import(conn, path), planned, message="Reading CSV...",
+            on_error=lambda e: messagebox.showerror("Import Failed", f"Could not read CSV:\n{e}"),
+        )
 
+    def _plan_csv_import(self, conn, path):
+        """Read and validate the CSV and look for id/SKU conflicts; runs on the DB worker
+
+        Returns None for an empty file, else a dict for _apply_csv_import.
+        """
+        rows = self._read_csv_rows(path)
+        if not rows:
+            return None
+
+        existing_ids = {int(r[0]) for r in conn.execute("SELECT id FROM inventory_v2") if r[0] is not None}
+        existing_skus = {r[0] for r in conn.execute("SELECT sku FROM inventory_v2 WHERE sku IS NOT NULL AND sku != ''")}
+
+        records = []
+        invalid = 0
+        conflicts = False
+        seen_skus = set(existing_skus)
         for raw in rows:
             row = self._normalize_csv_row(raw)
             name = str(row.get("name", "")).strip()
@@ -1441,48 +1470,55 @@ class InventoryApp:
                 invalid += 1
                 continue
 
+            records.append((row_id, sku, name, category, qty, price, image))
+            if (row_id is not None and row_id in existing_ids) or (sku and sku in seen_skus):
+                conflicts = True
+            elif sku:
+                seen_skus.add(sku)
+
+        return {"records": records, "invalid": invalid, "conflicts": conflicts,
+                "existing_ids": existing_ids, "existing_skus": existing_skus}
+
+    def _apply_csv_import(self, conn, plan, choice):
+        """Write the planned rows in one transaction; returns (imported, updated, skipped, invalid)"""
+        existing_ids = plan["existing_ids"]
+        existing_skus = set(plan["existing_skus"])
+        imported = updated = skipped = 0
+
+        for row_id, sku, name, category, qty, price, image in plan["records"]:
             conflict_id = row_id is not None and row_id in existing_ids
             conflict_sku = bool(sku) and sku in existing_skus
 
             if conflict_id or conflict_sku:
-                if choice is None:
-                    choice = self._prompt_conflict_handling()
-                    if choice is None:
-                        return
                 if choice == "skip":
                     skipped += 1
                     continue
 
-                status = self._compute_status(qty, category)
+                status = self._compute_status(qty, category, conn)
                 if conflict_id:
-                    self.cursor.execute(
+                    # A blank SKU is stored as NULL, as on insert, so blanks don't collide on the unique index
+                    conn.execute(
                         "UPDATE inventory_v2 SET sku=?, name=?, category=?, quantity=?, price=?, status=?, image=? WHERE id=?",
-                        (sku, name, category, qty, price, status, image, row_id),
+                        (sku or None, name, category, qty, price, status, image, row_id),
                     )
                 else:
-                    self.cursor.execute(
+                    conn.execute(
                         "UPDATE inventory_v2 SET name=?, category=?, quantity=?, price=?, status=?, image=? WHERE sku=?",
                         (name, category, qty, price, status, image, sku),
                     )
                 updated += 1
             else:
-                status = self._compute_status(qty, category)
-                self.cursor.execute(
+                status = self._compute_status(qty, category, conn)
+                conn.execute(
                     "INSERT INTO inventory_v2 (sku, name, category, quantity, price, status, image) VALUES (?,?,?,?,?,?,?)",
-                    (sku, name, category, qty, price, status, image),
+                    (sku or None, name, category, qty, price, status, image),
                 )
                 imported += 1
                 if sku:
                     existing_skus.add(sku)
 
-        self.conn.commit()
-        self.show_inventory()
-        self.refresh_summary()
-        messagebox.showinfo(
-            "Import Complete",
-            f"Imported: {imported}\nUpdated: {updated}\nSkipped: {skipped}\nInvalid: {invalid}",
-        )
-        self._set_status(f"Imported CSV: {imported} new, {updated} updated, {skipped} skipped, {invalid} invalid")
+        conn.commit()
+        return imported, updated, skipped, plan["invalid"]
 
     def _lookup_scanned_code(self, code):
         if not code:
@@ -1492,19 +1528,24 @@ class InventoryApp:
         self.entry_search.delete(0, "end")
         self.entry_search.insert(0, code)
         self.entry_search.configure(foreground=ThemeColors["text_light"])
-        count = self.search_product()
-        if count == 0:
-            messagebox.showinfo("Not Found", f"No item matched code: {code}")
-        else:
-            self._set_status(f"Scan matched {count} item(s)")
+
+        def matched(count):
+            if count == 0:
+                messagebox.showinfo("Not Found", f"No item matched code: {code}")
+            else:
+                self._set_status(f"Scan matched {count} item(s)")
+        self.search_product(on_done=matched)
 
     def _update_scanner_preview(self):
         if not hasattr(self, "_scanner_top") or not self._scanner_top.winfo_exists():
             return
         if not getattr(self, "_scanner_active", False):
             return
-        if PIL_AVAILABLE and getattr(self, "_scanner_frame", None) is not None:
+        pil = lazy_imports.load_pil()
+        if pil and getattr(self, "_scanner_frame", None) is not None:
             try:
+                Image, ImageTk = pil
+                cv2 = lazy_imports.load('cv2')
                 frame = cv2.cvtColor(self._scanner_frame, cv2.COLOR_BGR2RGB)
                 img = Image.fromarray(frame)
                 img.thumbnail((360, 240))
@@ -1516,12 +1557,20 @@ class InventoryApp:
         self.root.after(100, self._update_scanner_preview)
 
     def _scanner_loop(self, auto_stop=True):
+        # The first scan pays for importing OpenCV here, off the Tk thread
+        self.root.after(0, lambda: self._scanner_status.set("Starting camera..."))
+        scanner = lazy_imports.load_scanner()
+        if scanner is None:
+            self.root.after(0, lambda: self._scanner_status.set("Camera scanning unavailable"))
+            return
+        cv2, pyzbar = scanner
         cap = cv2.VideoCapture(0)
         if not cap.isOpened():
             self.root.after(0, lambda: self._scanner_status.set("Camera not available"))
             return
         self._scanner_active = True
         self.root.after(0, lambda: self._scanner_status.set("Scanning..."))
+        self.root.after(0, self._update_scanner_preview)
         while not self._scanner_stop.is_set():
             ret, frame = cap.read()
             if not ret:
@@ -1577,7 +1626,7 @@ class InventoryApp:
         self._scanner_status = tk.StringVar(value="Scanner idle")
         ttk.Label(container, textvariable=self._scanner_status).pack(anchor="w")
 
-        scanner_available = CV2_AVAILABLE and PYZBAR_AVAILABLE
+        scanner_available = lazy_imports.scanner_available()
         if not scanner_available:
             ttk.Label(
                 container,
@@ -1604,7 +1653,6 @@ class InventoryApp:
                 t = threading.Thread(target=self._scanner_loop, args=(auto_stop,), daemon=True)
                 t.start()
                 self._scanner_thread = t
-                self._update_scanner_preview()
 
             def stop_scan():
                 self._scanner_stop.set()
@@ -1626,15 +1674,21 @@ class InventoryApp:
     def export_to_csv(self):
         path = filedialog.asksaveasfilename(defaultextension=".csv")
         if path:
-            self.cursor.execute("SELECT id, sku, name, category, quantity, price, status, image FROM inventory_v2")
-            with open(path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(["id", "sku", "name", "category", "quantity", "price", "status", "image"])
-                writer.writerows(self.cursor.fetchall())
-            messagebox.showinfo("Export", "Saved.")
-            self._set_status(f"Exported CSV to {path}")
+            def write(conn):
+                with open(path, 'w', newline='', encoding='utf-8') as f:
+                    for chunk in iter_inventory_csv(conn):
+                        f.write(chunk)
+
+            def saved(result):
+                messagebox.showinfo("Export", "Saved.")
+                self._set_status(f"Exported CSV to {path}")
+            self.run_in_background(write, saved, message="Exporting CSV...")
 
     def on_close(self):
+        self.db.close()
+        self.suggest_db.close()
+        if self.query_profiler:
+            self.query_profiler.write_report()
         self.conn.close()
         self.root.destroy()
 
@@ -1,6 +1,8 @@
 import os
 import sys
+import atexit
 import sqlite3
+import configparser
 import csv
 import uuid
 import shutil
@@ -9,8 +11,20 @@ from datetime import datetime
 from pathlib import Path
 from functools import wraps
 
-from flask import Flask, render_template_string, request, jsonify, send_file, send_from_directory, Response
+from flask import Flask, Request, render_template_string, request, jsonify, send_file, send_from_directory, Response, make_response, g, has_app_context, stream_with_context
 from flask_cors import CORS
+from werkzeug.serving import make_server
+from utils.db_pool import ConnectionPool, load_settings
+from utils.thresholds import ThresholdResolver
+from utils.csv_import import DEFAULT_BATCH_SIZE, import_rows, iter_csv_upload
+from utils.csv_export import iter_inventory_csv, parse_columns
+from utils.search_index import match_filter, search as search_inventory
+from utils.pagination import DEFAULT_SORT, CursorError, fetch_page
+from utils.aggregates import read_totals, top_categories
+from utils import columnar, data_version, metrics, query_profiler, thresholds
+from utils.migrations import migrate
+from utils.sales import ProductNotFound, SaleError, parse_lines, record_sales, sell
+from utils.startup import StartupTimer
 import threading
 import time
 try:
@@ -18,78 +32,78 @@ try:
 except ImportError:
     webview = None
 
+# Launch milestones for the desktop window (see __main__)
+startup_timer = StartupTimer()
+
 # --- Configuration ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "store_inventory.db")
 IMAGES_DIR = os.path.join(BASE_DIR, "images")
 os.makedirs(IMAGES_DIR, exist_ok=True)
 
+config = configparser.ConfigParser()
+config.read(os.path.join(BASE_DIR, "config.ini"))
+SERVER_HOST = config.get('SERVER', 'HOST', fallback='127.0.0.1')
+SERVER_PORT = config.getint('SERVER', 'PORT', fallback=5000)
+METRICS_ENABLED = config.getboolean('LOGGING', 'METRICS', fallback=True)
+SERVER_TIMING = config.getboolean('LOGGING', 'SERVER_TIMING', fallback=False)
+
 # --- Flask App Setup ---
+class UploadLimitRequest(Request):
+    """Raises the body size limit for the CSV import route only"""
+
+    @property
+    def max_content_length(self):
+        # Uploads are streamed to disk, so large CSV catalogs don't need to fit in memory
+        if self.endpoint == 'import_csv':
+            return CSV_IMPORT_MAX_BYTES
+        return super().max_content_length
+
+CSV_IMPORT_MAX_BYTES = config.getint('INVENTORY', 'CSV_IMPORT_MAX_BYTES', fallback=256 * 1024 * 1024)
 app = Flask(__name__, static_folder=BASE_DIR)
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.request_class = UploadLimitRequest
+app.config['MAX_CONTENT_LENGTH'] = config.getint('API', 'MAX_CONTENT_LENGTH', fallback=16 * 1024 * 1024)
 CORS(app)
 
 # --- Database Helper Functions ---
+# Opt-in slow-query log and per-statement totals ([LOGGING] QUERY_PROFILER)
+profiler = query_profiler.from_config(config, BASE_DIR)
+query_profiler.install(profiler)
+if profiler:
+    atexit.register(profiler.write_report)
+
+def open_pool(path):
+    """Connection pool for path; its connections time their SQL when metrics or the profiler are on"""
+    if profiler:
+        factory = query_profiler.ProfiledConnection
+    elif METRICS_ENABLED or SERVER_TIMING:
+        factory = metrics.TimedConnection
+    else:
+        factory = sqlite3.Connection
+    return ConnectionPool(path, load_settings(config), factory=factory)
+
+db_pool = open_pool(DB_PATH)
+atexit.register(lambda: db_pool.close_all())
+
 def get_db():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Return this thread's pooled connection; it is released when the app context ends"""
+    if not has_app_context():
+        return db_pool.acquire()
+    if 'db' not in g:
+        g.db = db_pool.acquire()
+    return g.db
+
+@app.teardown_appcontext
+def release_db(exc):
+    if g.pop('db', None) is not None:
+        db_pool.release()
 
 def init_db():
     conn = get_db()
     c = conn.cursor()
     
-    # Users table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            username TEXT PRIMARY KEY,
-            password_hash TEXT,
-            role TEXT
-        )
-    """)
-    
-    # Inventory table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS inventory_v2 (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            sku TEXT UNIQUE,
-            name TEXT NOT NULL,
-            category TEXT,
-            quantity INTEGER NOT NULL,
-            price REAL NOT NULL,
-            status TEXT DEFAULT 'In Stock',
-            image TEXT
-        )
-    """)
-    
-    # Sales table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS sales (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            product_id INTEGER,
-            sku TEXT,
-            name TEXT,
-            quantity INTEGER,
-            price REAL,
-            sale_date TEXT
-        )
-    """)
-    
-    # Settings table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS app_settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        )
-    """)
-    
-    # Category thresholds
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS category_thresholds (
-            category TEXT PRIMARY KEY,
-            threshold INTEGER NOT NULL
-        )
-    """)
+    # Tables, triggers and indexes are versioned in utils/migrations.py
+    migrate(conn)
     
     # Check if default users exist
     c.execute("SELECT count(*) FROM users")
@@ -100,7 +114,56 @@ def init_db():
         c.execute("INSERT INTO users VALUES (?, ?, ?)", ("user", user_pass, "user"))
     
     conn.commit()
-    conn.close()
+    db_pool.release()
+
+# --- Request Metrics ---
+request_metrics = metrics.Metrics()
+
+def _count_bytes(chunks, counter):
+    for chunk in chunks:
+        counter[0] += len(chunk)
+        yield chunk
+
+@app.before_request
+def start_request_timer():
+    if METRICS_ENABLED or SERVER_TIMING:
+        g.request_started = time.perf_counter()
+        metrics.reset_sql()
+
+@app.after_request
+def measure_response(response):
+    if 'request_started' not in g:
+        return response
+    g.response_status = response.status_code
+    g.response_bytes = [response.content_length or 0]
+    if response.content_length is None and response.is_streamed:
+        # Streamed bodies (CSV export) are counted as they are sent
+        response.response = _count_bytes(response.response, g.response_bytes)
+    if SERVER_TIMING:
+        sql_count, sql_seconds = metrics.sql_totals()
+        elapsed = time.perf_counter() - g.request_started
+        response.headers['Server-Timing'] = (
+            f'db;dur={sql_seconds * 1000:.2f};desc="{sql_count} SQL statements", '
+            f'app;dur={(elapsed - sql_seconds) * 1000:.2f};desc="Python and serialization"'
+        )
+    return response
+
+@app.teardown_request
+def record_request_metrics(exc):
+    # Streamed responses get here once the last chunk has been produced
+    started = g.pop('request_started', None)
+    if started is None or not METRICS_ENABLED:
+        return
+    sql_count, sql_seconds = metrics.sql_totals()
+    request_metrics.record(
+        request.url_rule.rule if request.url_rule else 'unmatched',
+        request.method,
+        g.pop('response_status', 500),
+        time.perf_counter() - started,
+        g.pop('response_bytes', [0])[0],
+        sql_count,
+        sql_seconds,
+    )
 
 # --- Authentication ---
 def require_login(f):
@@ -112,6 +175,23 @@ def require_login(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def etag_on_data_version(f):
+    """Answer If-None-Match with 304 while the data version is unchanged"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        tag = data_version.etag(data_version.current(get_db()))
+        if request.if_none_match.contains_weak(tag):
+            resp = Response(status=304)
+        else:
+            resp = make_response(f(*args, **kwargs))
+            if resp.status_code != 200:
+                return resp
+        resp.set_etag(tag, weak=True)
+        # Let browsers keep the body but revalidate every time
+        resp.headers['Cache-Control'] = 'private, no-cache'
+        return resp
+    return decorated_function
+
 @app.route('/api/login', methods=['POST'])
 def login():
     data = request.json
@@ -126,7 +206,6 @@ def login():
     hashed = hashlib.sha256(password.encode()).hexdigest()
     c.execute("SELECT role FROM users WHERE username=? AND password_hash=?", (username, hashed))
     row = c.fetchone()
-    conn.close()
     
     if row:
         return jsonify({
@@ -141,64 +220,98 @@ def login():
 # --- Dashboard/Analytics ---
 @app.route('/api/dashboard', methods=['GET'])
 @require_login
+@etag_on_data_version
 def get_dashboard():
     conn = get_db()
     c = conn.cursor()
     
-    # Total products and quantity
-    c.execute("SELECT COUNT(*), COALESCE(SUM(quantity),0), COALESCE(SUM(quantity*price),0) FROM inventory_v2")
-    total_prod, total_qty, total_value = c.fetchone()
-    
-    # Low stock count
-    c.execute("SELECT COUNT(*) FROM inventory_v2 WHERE status='Low Stock'")
-    low_stock = c.fetchone()[0]
-    
-    # Out of stock count
-    c.execute("SELECT COUNT(*) FROM inventory_v2 WHERE status='Out of Stock'")
-    out_stock = c.fetchone()[0]
+    # Totals and status counts (trigger-maintained, one row)
+    totals = read_totals(conn)
+    total_prod = totals['product_count']
+    total_qty = totals['total_quantity']
+    total_value = totals['total_value']
+    low_stock = totals['low_stock_count']
+    out_stock = totals['out_of_stock_count']
     
     # Get category distribution
-    c.execute("SELECT category, SUM(quantity) as qty FROM inventory_v2 GROUP BY category ORDER BY qty DESC LIMIT 5")
-    categories = [{'name': row[0] or 'Uncategorized', 'qty': row[1]} for row in c.fetchall()]
+    categories = top_categories(conn, 5)
     
     # Recent sales
     c.execute("SELECT name, quantity, price, sale_date FROM sales ORDER BY sale_date DESC LIMIT 10")
-    recent_sales = [dict(row) for row in c.fetchall()]
-    
-    conn.close()
+    recent_sales = c.fetchall()
     
-    return jsonify({
+    dashboard = {
         'total_products': total_prod or 0,
         'total_quantity': total_qty or 0,
         'total_value': round(total_value or 0, 2),
         'low_stock': low_stock or 0,
         'out_of_stock': out_stock or 0,
-        'categories': categories,
-        'recent_sales': recent_sales
-    })
+    }
+    if columnar.requested(request.args):
+        dashboard['categories'] = columnar.table(('name', 'qty'), categories)
+        dashboard['recent_sales'] = columnar.table(('name', 'quantity', 'price', 'sale_date'), recent_sales)
+        return columnar.response(dashboard)
+    dashboard['categories'] = [{'name': name, 'qty': qty} for name, qty in categories]
+    dashboard['recent_sales'] = [dict(row) for row in recent_sales]
+    return jsonify(dashboard)
 
 # --- Inventory Management ---
+INVENTORY_COLUMNS = ('id', 'sku', 'name', 'category', 'quantity', 'price', 'status', 'image')
+
 @app.route('/api/inventory', methods=['GET'])
 @require_login
+@etag_on_data_version
 def get_inventory():
     conn = get_db()
     c = conn.cursor()
     search = request.args.get('search', '').strip()
     
+    as_columns = columnar.requested(request.args)
+    
+    if 'limit' in request.args or 'after' in request.args:
+        return get_inventory_page(conn, search, as_columns)
+    
     if search:
-        c.execute("""
-            SELECT id, sku, name, category, quantity, price, status, image 
-            FROM inventory_v2 
-            WHERE name LIKE ? OR sku LIKE ? OR category LIKE ?
-            ORDER BY name
-        """, ('%' + search + '%', '%' + search + '%', '%' + search + '%'))
+        # FTS5 index lookup, ranked best match first (LIKE scan if FTS5 is missing)
+        rows = search_inventory(conn, search, INVENTORY_COLUMNS)
     else:
+        if as_columns:
+            # Plain tuples go straight to the encoder
+            c.row_factory = None
         c.execute("SELECT id, sku, name, category, quantity, price, status, image FROM inventory_v2 ORDER BY name")
+        rows = c.fetchall()
     
-    items = [dict(row) for row in c.fetchall()]
-    conn.close()
+    if as_columns:
+        return columnar.response(columnar.table(INVENTORY_COLUMNS, rows))
+    items = [dict(row) for row in rows]
     return jsonify(items)
 
+def get_inventory_page(conn, search, as_columns=False):
+    """Keyset-paginated listing: ?limit=&after=<cursor>&sort=name|sku|quantity|price|status|category&order=asc|desc"""
+    sort = request.args.get('sort', DEFAULT_SORT)
+    descending = request.args.get('order', 'asc').lower() == 'desc'
+    limit = request.args.get('limit', 50, type=int)
+    after = request.args.get('after') or None
+    
+    where, params = match_filter(conn, search) if search else (None, [])
+    try:
+        rows, next_cursor = fetch_page(conn, INVENTORY_COLUMNS, sort, descending, limit, after, where, params)
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if as_columns:
+        page = columnar.table(INVENTORY_COLUMNS, rows)
+    else:
+        page = {'items': [dict(zip(INVENTORY_COLUMNS, row)) for row in rows]}
+    page.update(next_cursor=next_cursor, sort=sort, order='desc' if descending else 'asc')
+    # Count once on the first page; later pages reuse the client's total
+    if not after:
+        if where:
+            page['total'] = conn.execute(f"SELECT COUNT(*) FROM inventory_v2 WHERE {where}", params).fetchone()[0]
+        else:
+            page['total'] = read_totals(conn)['product_count']
+    return columnar.response(page) if as_columns else jsonify(page)
+
 @app.route('/api/inventory', methods=['POST'])
 @require_login
 def add_product():
@@ -221,17 +334,10 @@ def add_product():
     # Check for duplicate SKU
     c.execute("SELECT 1 FROM inventory_v2 WHERE sku=?", (sku,))
     if c.fetchone():
-        conn.close()
         return jsonify({'error': 'SKU already exists'}), 400
     
     # Determine status
-    threshold = get_category_threshold(category)
-    if quantity == 0:
-        status = 'Out of Stock'
-    elif quantity < threshold:
-        status = 'Low Stock'
-    else:
-        status = 'In Stock'
+    status = compute_status(quantity, category)
     
     c.execute("""
         INSERT INTO inventory_v2 (sku, name, category, quantity, price, status)
@@ -240,7 +346,6 @@ def add_product():
     
     conn.commit()
     product_id = c.lastrowid
-    conn.close()
     
     return jsonify({'id': product_id, 'message': 'Product added'}), 201
 
@@ -251,7 +356,6 @@ def get_product(product_id):
     c = conn.cursor()
     c.execute("SELECT id, sku, name, category, quantity, price, status, image FROM inventory_v2 WHERE id=?", (product_id,))
     row = c.fetchone()
-    conn.close()
     
     if not row:
         return jsonify({'error': 'Product not found'}), 404
@@ -274,13 +378,7 @@ def update_product(product_id):
     c = conn.cursor()
     
     # Determine status
-    threshold = get_category_threshold(category)
-    if quantity == 0:
-        status = 'Out of Stock'
-    elif quantity < threshold:
-        status = 'Low Stock'
-    else:
-        status = 'In Stock'
+    status = compute_status(quantity, category)
     
     c.execute("""
         UPDATE inventory_v2 
@@ -289,7 +387,6 @@ def update_product(product_id):
     """, (name, category, quantity, price, status, product_id))
     
     conn.commit()
-    conn.close()
     
     return jsonify({'message': 'Product updated'})
 
@@ -302,7 +399,6 @@ def delete_product(product_id):
     c = conn.cursor()
     c.execute("DELETE FROM inventory_v2 WHERE id=?", (product_id,))
     conn.commit()
-    conn.close()
     
     return jsonify({'message': 'Product deleted'})
 
@@ -311,61 +407,60 @@ def delete_product(product_id):
 @require_login
 def record_sale():
     data = request.json
-    product_id = data.get('product_id')
-    quantity_sold = int(data.get('quantity', 0))
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object with product_id and quantity'}), 400
+    try:
+        product_id = int(data.get('product_id'))
+        quantity_sold = int(data.get('quantity', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'product_id and quantity must be integers'}), 400
     
     if quantity_sold <= 0:
         return jsonify({'error': 'Quantity must be greater than zero'}), 400
     
-    conn = get_db()
-    c = conn.cursor()
-    
-    # Get product
-    c.execute("SELECT sku, name, quantity, price, category FROM inventory_v2 WHERE id=?", (product_id,))
-    row = c.fetchone()
-    if not row:
-        conn.close()
-        return jsonify({'error': 'Product not found'}), 404
-    
-    sku, name, current_qty, price, category = row
-    
-    if quantity_sold > current_qty:
-        conn.close()
-        return jsonify({'error': 'Not enough stock'}), 400
-    
-    new_qty = current_qty - quantity_sold
-    threshold = get_category_threshold(category)
-    if new_qty == 0:
-        status = 'Out of Stock'
-    elif new_qty < threshold:
-        status = 'Low Stock'
-    else:
-        status = 'In Stock'
-    
-    # Update inventory
-    c.execute("UPDATE inventory_v2 SET quantity=?, status=? WHERE id=?", (new_qty, status, product_id))
+    # One conditional UPDATE checks stock, decrements it and recomputes status
+    try:
+        with db_pool.write_lock:
+            new_qty = sell(get_db(), product_id, quantity_sold)
+    except ProductNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except SaleError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Record sale
-    c.execute("""
-        INSERT INTO sales (product_id, sku, name, quantity, price, sale_date)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (product_id, sku, name, quantity_sold, price, datetime.now().isoformat()))
+    return jsonify({'message': 'Sale recorded', 'new_quantity': new_qty})
+
+@app.route('/api/sales/batch', methods=['POST'])
+@require_login
+def record_sale_batch():
+    data = request.json
+    lines = data.get('lines') if isinstance(data, dict) else data
     
-    conn.commit()
-    conn.close()
+    conn = get_db()
+    try:
+        lines = parse_lines(lines)
+        # All lines are applied in one transaction, or none are
+        with db_pool.write_lock:
+            results = record_sales(conn, lines)
+    except SaleError as e:
+        return jsonify({'error': str(e), 'lines': e.problems}), 400
     
-    return jsonify({'message': 'Sale recorded', 'new_quantity': new_qty})
+    return jsonify({'message': 'Sale recorded', 'lines': results})
 
 @app.route('/api/sales', methods=['GET'])
 @require_login
+@etag_on_data_version
 def get_sales():
     conn = get_db()
     c = conn.cursor()
     limit = request.args.get('limit', 50, type=int)
+    as_columns = columnar.requested(request.args)
+    if as_columns:
+        c.row_factory = None
     c.execute("SELECT id, name, quantity, price, sale_date FROM sales ORDER BY sale_date DESC LIMIT ?", (limit,))
-    sales = [dict(row) for row in c.fetchall()]
-    conn.close()
-    return jsonify(sales)
+    rows = c.fetchall()
+    if as_columns:
+        return columnar.response(columnar.table(('id', 'name', 'quantity', 'price', 'sale_date'), rows))
+    return jsonify([dict(row) for row in rows])
 
 # --- CSV Import/Export ---
 @app.route('/api/import-csv', methods=['POST'])
@@ -379,65 +474,18 @@ def import_csv():
         return jsonify({'error': 'Only CSV files allowed'}), 400
     
     try:
-        imported = updated = skipped = invalid = 0
         conn = get_db()
-        c = conn.cursor()
+        threshold_resolver.sync(conn)
         
-        # Get existing SKUs
-        c.execute("SELECT sku FROM inventory_v2 WHERE sku IS NOT NULL AND sku != ''")
-        existing_skus = {row[0] for row in c.fetchall()}
-        
-        # Process CSV
-        reader = csv.DictReader(file.stream.read().decode('utf-8').splitlines())
-        for row in reader:
-            name = row.get('name', '').strip()
-            sku = row.get('sku', '').strip()
-            category = row.get('category', 'Uncategorized').strip() or 'Uncategorized'
-            
-            try:
-                qty = int(row.get('quantity', 0))
-                price = float(row.get('price', 0))
-            except:
-                invalid += 1
-                continue
-            
-            if not name or qty < 0 or price < 0:
-                invalid += 1
-                continue
-            
-            threshold = get_category_threshold(category)
-            if qty == 0:
-                status = 'Out of Stock'
-            elif qty < threshold:
-                status = 'Low Stock'
-            else:
-                status = 'In Stock'
-            
-            if sku and sku in existing_skus:
-                c.execute("""
-                    UPDATE inventory_v2 
-                    SET name=?, category=?, quantity=?, price=?, status=?
-                    WHERE sku=?
-                """, (name, category, qty, price, status, sku))
-                updated += 1
-            else:
-                c.execute("""
-                    INSERT INTO inventory_v2 (sku, name, category, quantity, price, status)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (sku, name, category, qty, price, status))
-                imported += 1
-                if sku:
-                    existing_skus.add(sku)
-        
-        conn.commit()
-        conn.close()
+        # Stream the upload through validation and batched upserts
+        counts = import_rows(
+            conn,
+            iter_csv_upload(file.stream),
+            threshold_resolver.status,
+            batch_size=config.getint('INVENTORY', 'CSV_IMPORT_BATCH_SIZE', fallback=DEFAULT_BATCH_SIZE),
+        )
         
-        return jsonify({
-            'imported': imported,
-            'updated': updated,
-            'skipped': skipped,
-            'invalid': invalid
-        })
+        return jsonify(counts)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -445,17 +493,18 @@ def import_csv():
 @app.route('/api/export-csv', methods=['GET'])
 @require_login
 def export_csv():
-    conn = get_db()
-    c = conn.cursor()
-    c.execute("SELECT id, sku, name, category, quantity, price, status, image FROM inventory_v2")
-    rows = c.fetchall()
-    conn.close()
-    
-    output = "id,sku,name,category,quantity,price,status,image\n"
-    for row in rows:
-        output += f"{row[0]},{row[1]},{row[2]},{row[3]},{row[4]},{row[5]},{row[6]},{row[7] or ''}\n"
+    try:
+        columns = parse_columns(request.args.get('columns', ''))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return output, 200, {'Content-Disposition': 'attachment; filename=inventory.csv'}
+    # Rows are pulled with fetchmany() while the response is being sent
+    chunks = iter_inventory_csv(get_db(), columns)
+    return Response(
+        stream_with_context(chunks),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=inventory.csv'}
+    )
 
 # --- Image Upload ---
 @app.route('/api/upload-image', methods=['POST'])
@@ -483,12 +532,12 @@ def serve_image(filename):
 # --- Categories ---
 @app.route('/api/categories', methods=['GET'])
 @require_login
+@etag_on_data_version
 def get_categories():
     conn = get_db()
     c = conn.cursor()
     c.execute("SELECT DISTINCT category FROM inventory_v2 WHERE category IS NOT NULL AND category != '' ORDER BY category")
     cats = [row[0] for row in c.fetchall()]
-    conn.close()
     
     defaults = ["Electronics", "Clothing", "Food", "Uncategorized"]
     for d in defaults:
@@ -498,34 +547,17 @@ def get_categories():
     return jsonify(sorted(cats))
 
 # --- Thresholds ---
-def get_category_threshold(category):
-    conn = get_db()
-    c = conn.cursor()
-    c.execute("SELECT value FROM app_settings WHERE key='low_stock_default'")
-    default = c.fetchone()
-    default_threshold = int(default[0]) if default else 10
-    
-    c.execute("SELECT threshold FROM category_thresholds WHERE category=?", (category,))
-    row = c.fetchone()
-    conn.close()
-    
-    return int(row[0]) if row else default_threshold
+threshold_resolver = ThresholdResolver()
+
+def compute_status(quantity, category):
+    threshold_resolver.sync(get_db())
+    return threshold_resolver.status(quantity, category)
 
 @app.route('/api/thresholds', methods=['GET'])
 @require_login
 def get_thresholds():
-    conn = get_db()
-    c = conn.cursor()
-    
-    c.execute("SELECT value FROM app_settings WHERE key='low_stock_default'")
-    default = c.fetchone()
-    default_threshold = int(default[0]) if default else 10
-    
-    c.execute("SELECT category, threshold FROM category_thresholds")
-    overrides = {row[0]: row[1] for row in c.fetchall()}
-    
-    conn.close()
-    return jsonify({'default': default_threshold, 'overrides': overrides})
+    threshold_resolver.sync(get_db())
+    return jsonify({'default': threshold_resolver.default, 'overrides': threshold_resolver.overrides})
 
 @app.route('/api/thresholds/default', methods=['PUT'])
 @require_login
@@ -533,13 +565,11 @@ def set_default_threshold():
     data = request.json
     value = int(data.get('value', 10))
     
-    conn = get_db()
-    c = conn.cursor()
-    c.execute("INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)", ('low_stock_default', str(value)))
-    conn.commit()
-    conn.close()
+    # Stored statuses are updated in the same transaction
+    updated = thresholds.set_default_threshold(get_db(), value)
+    threshold_resolver.invalidate()
     
-    return jsonify({'message': 'Default threshold updated'})
+    return jsonify({'message': 'Default threshold updated', 'updated': updated})
 
 @app.route('/api/thresholds/<category>', methods=['PUT'])
 @require_login
@@ -547,24 +577,18 @@ def set_category_threshold(category):
     data = request.json
     value = int(data.get('value', 10))
     
-    conn = get_db()
-    c = conn.cursor()
-    c.execute("INSERT OR REPLACE INTO category_thresholds (category, threshold) VALUES (?, ?)", (category, value))
-    conn.commit()
-    conn.close()
+    updated = thresholds.set_category_threshold(get_db(), category, value)
+    threshold_resolver.invalidate()
     
-    return jsonify({'message': f'Threshold for {category} updated'})
+    return jsonify({'message': f'Threshold for {category} updated', 'updated': updated})
 
 @app.route('/api/thresholds/<category>', methods=['DELETE'])
 @require_login
 def delete_category_threshold(category):
-    conn = get_db()
-    c = conn.cursor()
-    c.execute("DELETE FROM category_thresholds WHERE category=?", (category,))
-    conn.commit()
-    conn.close()
+    updated = thresholds.clear_category_threshold(get_db(), category)
+    threshold_resolver.invalidate()
     
-    return jsonify({'message': f'Threshold for {category} cleared'})
+    return jsonify({'message': f'Threshold for {category} cleared', 'updated': updated})
 
 # --- Admin Check ---
 def require_admin():
@@ -647,7 +671,9 @@ HTML_TEMPLATE = """<!DOCTYPE html>
         // API HELPER (Global scope)
         api = {
             async get(url) {
+                // no-cache: reuse the cached body when the server answers 304
                 const res = await fetch(url, {
+                    cache: 'no-cache',
                     headers: {'Authorization': localStorage.getItem('currentToken')}
                 });
                 if (!res.ok) throw new Error('API error');
@@ -762,7 +788,7 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             } else if (currentView === 'stock') {
                 loadStock();
             } else if (currentView === 'sales') {
-                loadStock();  // Load products for dropdown
+                loadSaleProducts();  // First products for the dropdown
                 loadSales();  // Load sales history
                 // Set up event listeners for sales form
                 setTimeout(() => {
@@ -832,17 +858,21 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                     <table class="w-full text-sm">
                         <thead class="bg-navy-800/50 border-b border-white/5">
                             <tr>
-                                <th class="px-6 py-3 text-left text-slate-300 font-semibold">SKU</th>
-                                <th class="px-6 py-3 text-left text-slate-300 font-semibold">Name</th>
-                                <th class="px-6 py-3 text-center text-slate-300 font-semibold">Qty</th>
-                                <th class="px-6 py-3 text-right text-slate-300 font-semibold">Price</th>
-                                <th class="px-6 py-3 text-center text-slate-300 font-semibold">Status</th>
+                                <th onclick="sortStock('sku')" class="px-6 py-3 text-left text-slate-300 font-semibold cursor-pointer">SKU</th>
+                                <th onclick="sortStock('name')" class="px-6 py-3 text-left text-slate-300 font-semibold cursor-pointer">Name</th>
+                                <th onclick="sortStock('quantity')" class="px-6 py-3 text-center text-slate-300 font-semibold cursor-pointer">Qty</th>
+                                <th onclick="sortStock('price')" class="px-6 py-3 text-right text-slate-300 font-semibold cursor-pointer">Price</th>
+                                <th onclick="sortStock('status')" class="px-6 py-3 text-center text-slate-300 font-semibold cursor-pointer">Status</th>
                                 <th class="px-6 py-3 text-center text-slate-300 font-semibold">Actions</th>
                             </tr>
                         </thead>
                         <tbody id="stockTable"></tbody>
                     </table>
                 </div>
+                <div class="flex items-center justify-between mt-4">
+                    <p id="stockCount" class="text-slate-400 text-sm"></p>
+                    <button id="loadMoreBtn" onclick="loadStock(true)" class="hidden px-4 py-2 bg-slate-700 hover:bg-slate-600 text-white rounded-lg text-sm font-medium">Load more</button>
+                </div>
             </main>
             `;
         }
@@ -954,9 +984,9 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                     <div class="space-y-4">
                         <div>
                             <label class="text-slate-400 text-sm font-semibold">Select Product</label>
+                            <input id="saleProductSearch" type="text" placeholder="Search by name or SKU..." oninput="handleSaleProductSearch()" class="w-full mt-2 bg-navy-800/50 border border-white/10 rounded-lg px-4 py-2 text-white placeholder:text-slate-500 focus:outline-none focus:border-primary"/>
                             <select id="saleProductSelect" class="w-full mt-2 bg-navy-800/50 border border-white/10 rounded-lg px-4 py-2 text-white focus:outline-none focus:border-primary">
                                 <option value="">Choose a product...</option>
-                                ${allProducts.map(p => `<option value="${p.id}" data-stock="${p.quantity}" data-price="${p.price}">${p.name} (SKU: ${p.sku}) - Stock: ${p.quantity}</option>`).join('')}
                             </select>
                         </div>
                         <div class="grid grid-cols-2 gap-4">
@@ -1043,14 +1073,14 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             }
         }
 
-        async function loadStock() {
-            try {
-                const products = await api.get('/api/inventory');
-                allProducts = products;
-                const table = document.getElementById('stockTable');
-                if (!table) return;
+        let stockSort = 'name';
+        let stockOrder = 'asc';
+        let stockCursor = null;
+        let stockTotal = 0;
+        let stockSearch = '';
 
-                table.innerHTML = products.map(p => `
+        function stockRowHTML(p) {
+            return `
                 <tr class="border-b border-white/5 hover:bg-navy-800/30 transition">
                     <td class="px-6 py-4 text-slate-300">${p.sku || '-'}</td>
                     <td class="px-6 py-4 text-slate-300">${p.name}</td>
@@ -1070,19 +1100,46 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                         </button>` : ''}
                     </td>
                 </tr>
-                `).join('');
+                `;
+        }
+
+        // Fetches one page at a time; append=true follows the cursor for "Load more"
+        async function loadStock(append = false) {
+            try {
+                const params = new URLSearchParams({limit: 100, sort: stockSort, order: stockOrder});
+                if (stockSearch) params.set('search', stockSearch);
+                if (append && stockCursor) params.set('after', stockCursor);
+                const page = await api.get(`/api/inventory?${params}`);
+                allProducts = append ? allProducts.concat(page.items) : page.items;
+                stockCursor = page.next_cursor;
+                if (page.total !== undefined) stockTotal = page.total;
+
+                const table = document.getElementById('stockTable');
+                if (!table) return;
+                const rows = page.items.map(stockRowHTML).join('');
+                if (append) {
+                    table.insertAdjacentHTML('beforeend', rows);
+                } else {
+                    table.innerHTML = rows;
+                }
+                document.getElementById('stockCount').textContent = `Showing ${allProducts.length} of ${stockTotal}`;
+                document.getElementById('loadMoreBtn').classList.toggle('hidden', !stockCursor);
             } catch (error) {
                 console.error('Error loading stock:', error);
             }
         }
 
+        function sortStock(column) {
+            stockOrder = (stockSort === column && stockOrder === 'asc') ? 'desc' : 'asc';
+            stockSort = column;
+            loadStock();
+        }
+
         function handleSearch() {
             const term = document.getElementById('searchInput')?.value || '';
-            if (term.length > 2) {
-                api.get(`/api/inventory?search=${encodeURIComponent(term)}`).then(results => {
-                    allProducts = results;
-                    loadStock();
-                }).catch(e => console.error('Search error:', e));
+            if (term.length > 2 || term.length === 0) {
+                stockSearch = term;
+                loadStock();
             }
         }
 
@@ -1102,9 +1159,15 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             }).catch(e => alert('Error: ' + e.message));
         }
 
-        function editProduct(id) {
-            const p = allProducts.find(x => x.id === id);
-            if (!p) return;
+        // Read the product itself: the stock table only holds the pages loaded so far
+        async function editProduct(id) {
+            let p;
+            try {
+                p = await api.get(`/api/inventory/${id}`);
+            } catch (error) {
+                alert('Error: ' + error.message);
+                return;
+            }
             const name = prompt('Edit name:', p.name);
             if (!name) return;
             const qty = parseInt(prompt('Edit quantity:', p.quantity));
@@ -1170,6 +1233,36 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             input.click();
         }
 
+        // The sale dropdown searches the whole inventory, separately from the paged stock table
+        const SALE_PRODUCT_LIMIT = 20;
+        let saleSearchTimer = null;
+
+        async function loadSaleProducts(term = '') {
+            try {
+                const params = new URLSearchParams({limit: SALE_PRODUCT_LIMIT});
+                if (term) params.set('search', term);
+                const page = await api.get(`/api/inventory?${params}`);
+                const select = document.getElementById('saleProductSelect');
+                const search = document.getElementById('saleProductSearch');
+                // Dropped if the view changed or the search moved on while this was loading
+                if (!select || (search && search.value.trim() !== term)) return;
+                const more = page.next_cursor ? `<option value="" disabled>Keep typing to narrow ${page.total} matches...</option>` : '';
+                select.innerHTML = `<option value="">${page.items.length ? 'Choose a product...' : 'No matching products'}</option>`
+                    + page.items.map(p => `<option value="${p.id}" data-stock="${p.quantity}" data-price="${p.price}">${p.name} (SKU: ${p.sku || '-'}) - Stock: ${p.quantity}</option>`).join('')
+                    + more;
+                updateSalePriceDisplay();
+            } catch (error) {
+                console.error('Error loading products:', error);
+            }
+        }
+
+        function handleSaleProductSearch() {
+            clearTimeout(saleSearchTimer);
+            saleSearchTimer = setTimeout(() => {
+                loadSaleProducts(document.getElementById('saleProductSearch')?.value.trim() || '');
+            }, 250);
+        }
+
         function updateSalePriceDisplay() {
             const select = document.getElementById('saleProductSelect');
             const priceDisplay = document.getElementById('salePriceDisplay');
@@ -1222,8 +1315,7 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                 qtyInput.value = '1';
                 updateSalePriceDisplay();
                 
-                // Reload data
-                await loadStock();
+                // Reload data (renderUI refreshes the product dropdown)
                 await loadSales();
                 renderUI();
             } catch (error) {
@@ -1337,8 +1429,34 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 
 @app.route('/', methods=['GET'])
 def index():
+    startup_timer.mark('first request')
     return render_template_string(HTML_TEMPLATE)
 
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Readiness probe: 200 once the server is up and the database answers"""
+    try:
+        get_db().execute("SELECT 1").fetchone()
+    except sqlite3.Error as e:
+        return jsonify({'status': 'unavailable', 'error': str(e)}), 503
+    return jsonify({'status': 'ok'})
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Per-route request metrics in the Prometheus text format (no login, for scrapers)"""
+    if not METRICS_ENABLED:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return Response(request_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/query-profile', methods=['GET'])
+@require_login
+def get_query_profile():
+    """Statements ranked by total time since start (?limit=20); needs QUERY_PROFILER = True"""
+    if not profiler:
+        return jsonify({'error': 'Query profiler is disabled'}), 404
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({'slow_ms': profiler.slow_ms, 'statements': profiler.summary(limit)})
+
 # --- Error Handlers ---
 @app.errorhandler(404)
 def not_found(e):
@@ -1352,30 +1470,51 @@ def server_error(e):
 def startup():
     init_db()
 
-def run_flask():
-    """Run Flask server in background thread"""
-    app.run(debug=False, host='127.0.0.1', port=5000, use_reloader=False)
+def start_server():
+    """Bind the server, then serve from a daemon thread; returns once it is accepting"""
+    # Once bound, early connections wait in the listen backlog instead of failing
+    server = make_server(SERVER_HOST, SERVER_PORT, app, threaded=True)
+    serving = threading.Event()
+    
+    def serve():
+        serving.set()
+        server.serve_forever()
+    
+    threading.Thread(target=serve, daemon=True).start()
+    serving.wait()
+    return server
 
 if __name__ == '__main__':
     startup()
+    startup_timer.mark('db init')
     
     # Try to run as desktop app with PyWebView, fall back to web mode
     if webview:
-        # Start Flask in background thread
-        flask_thread = threading.Thread(target=run_flask, daemon=True)
-        flask_thread.start()
-        time.sleep(2)  # Give Flask time to start
+        start_server()
+        startup_timer.mark('server ready')
         
         # Create and show desktop window
-        webview.create_window(
+        window = webview.create_window(
             title='Store Inventory Manager',
-            url='http://127.0.0.1:5000/',
+            url=f'http://{SERVER_HOST}:{SERVER_PORT}/',
             background_color='#0f172a',
             min_size=(1024, 768)
         )
+        
+        def on_loaded():
+            startup_timer.mark('first paint')
+            print(startup_timer.report())
+        
+        window.events.loaded += on_loaded
         webview.start(debug=False)
     else:
         # Fallback to web mode if PyWebView not available
-        print("PyWebView not found. Running in web mode.")
-        print("Open http://127.0.0.1:5000/ in your browser")
-        app.run(debug=True, host='127.0.0.1', port=5000)
+        print("PyWebView not found. Running in web mode (development server).")
+        print("For production use: python serve.py")
+        print(f"Open http://{SERVER_HOST}:{SERVER_PORT}/ in your browser")
+        app.run(
+            debug=config.getboolean('SERVER', 'DEBUG', fallback=False),
+            host=SERVER_HOST,
+            port=SERVER_PORT,
+            threaded=config.getboolean('SERVER', 'THREADED', fallback=True)
+        )
@@ -33,7 +33,7 @@ def load_sample_data():
     c.execute("SELECT COUNT(*) FROM inventory_v2")
     if c.fetchone()[0] > 0:
         print("Database already contains data. Skipping sample data load.")
-        conn.close()
+        inventory_app.db_pool.release()
         return
     
     print("Loading sample inventory data...")
@@ -70,7 +70,7 @@ def load_sample_data():
         )
     
     conn.commit()
-    conn.close()
+    inventory_app.db_pool.release()
     
     print(f"✓ Loaded {len(sample_products)} sample products")
     print(f"✓ Loaded {len(sample_sales)} sample sales")
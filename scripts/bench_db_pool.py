@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Connection Pool Benchmark
+Compares API requests per second with the legacy open-per-call connections
+(rollback journal) against the pooled per-thread WAL connections.
+
+Run from the root directory:
+    python scripts/bench_db_pool.py --requests 3000 --threads 8
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+
+# Add parent directory to path to import app module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as inventory_app
+from utils import dataset
+from utils.db_pool import ConnectionPool, load_settings
+
+AUTH = {'Authorization': 'bench'}
+
+
+class LegacyConnections:
+    """Mimics the old get_db(): a fresh default connection for every request"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def acquire(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def release(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    def close_all(self):
+        pass
+
+
+def seed(path, products):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+    inventory_app.DB_PATH = path
+    inventory_app.db_pool = LegacyConnections(path)
+    inventory_app.init_db()
+    conn = sqlite3.connect(path)
+    dataset.generate(conn, products, seed=products, stock=1000000)
+    conn.close()
+
+
+def run(pool, requests, threads, products):
+    inventory_app.db_pool = pool
+    per_thread = requests // threads
+    errors = []
+
+    def worker(seed_value):
+        rnd = random.Random(seed_value)
+        client = inventory_app.app.test_client()
+        for i in range(per_thread):
+            pick = rnd.random()
+            if pick < 0.2:
+                res = client.post('/api/sales', json={'product_id': rnd.randint(1, products), 'quantity': 1}, headers=AUTH)
+            elif pick < 0.4:
+                res = client.get('/api/dashboard', headers=AUTH)
+            else:
+                res = client.get(f'/api/inventory/{rnd.randint(1, products)}', headers=AUTH)
+            if res.status_code >= 400:
+                errors.append(res.status_code)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    pool.close_all()
+    return per_thread * threads / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs per-request SQLite connections")
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--products', type=int, default=2000)
+    args = parser.parse_args()
+
+    settings = load_settings(inventory_app.config)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = os.path.join(tmp, 'legacy.db')
+        pooled_db = os.path.join(tmp, 'pooled.db')
+        seed(legacy_db, args.products)
+        seed(pooled_db, args.products)
+
+        before, before_errors = run(LegacyConnections(legacy_db), args.requests, args.threads, args.products)
+        after, after_errors = run(ConnectionPool(pooled_db, settings), args.requests, args.threads, args.products)
+
+    print(f"Requests: {args.requests}  Threads: {args.threads}  Products: {args.products}")
+    print(f"  Per-request connections : {before:8.1f} req/s ({len(before_errors)} errors)")
+    print(f"  Pooled WAL connections  : {after:8.1f} req/s ({len(after_errors)} errors)")
+    print(f"  Speedup                 : {after / before:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Desktop DB Worker Responsiveness Benchmark
+Runs the desktop app's long database operations (full listing, search,
+dashboard, CSV export, bulk update) once on the event-loop thread, as
+CE.py used to, and once on the DB worker thread with TkDispatcher
+delivering the result, while a 60 fps frame loop stands in for Tk.
+Reports how late frames ran (a Tk frame must finish within 16 ms).
+
+Run from the root directory:
+    python scripts/bench_db_worker.py --products 200000
+"""
+
+import os
+import sys
+import time
+import heapq
+import sqlite3
+import argparse
+import tempfile
+
+# Add parent directory to path to import the shared utilities
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import dataset, migrations
+from utils.csv_export import iter_inventory_csv
+from utils.db_pool import connect
+from utils.db_worker import DBWorker, TkDispatcher
+from utils.search_index import like_search
+
+FRAME_MS = 1000 / 60
+FRAME_BUDGET_MS = 16
+
+
+class FrameLoop:
+    """The parts of a Tk root TkDispatcher uses, plus a frame tick that records lateness"""
+
+    def __init__(self):
+        self._timers = []
+        self._seq = 0
+        self._generation = 0
+        self.lateness = []
+
+    def after(self, ms, callback):
+        self._seq += 1
+        heapq.heappush(self._timers, (time.perf_counter() + ms / 1000, self._seq, callback))
+
+    def report_callback_exception(self, exc_type, exc, tb):
+        raise exc
+
+    def _frame(self, due, generation):
+        if generation != self._generation:
+            return  # left over from an earlier run_until
+        self.lateness.append(max(0.0, (time.perf_counter() - due) * 1000))
+        next_due = due + FRAME_MS / 1000
+        self.after((next_due - time.perf_counter()) * 1000, lambda: self._frame(next_due, generation))
+
+    def run_until(self, done):
+        self._generation += 1
+        self.lateness = []
+        start, generation = time.perf_counter(), self._generation
+        self.after(0, lambda: self._frame(start, generation))
+        while not done():
+            due, _, callback = heapq.heappop(self._timers)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            callback()
+
+
+def operations():
+    columns = ("id", "sku", "name", "category", "quantity", "price", "status")
+
+    def listing(conn):
+        return len(conn.execute("SELECT id, sku, name, category, quantity, price, status FROM inventory_v2").fetchall())
+
+    def search(conn):
+        return len(like_search(conn, "pro", columns))
+
+    def dashboard(conn):
+        conn.execute("SELECT id, name, category, quantity FROM inventory_v2 WHERE quantity > 0 ORDER BY quantity ASC LIMIT 3").fetchall()
+        return len(conn.execute("SELECT name, quantity, sale_date FROM sales ORDER BY sale_date DESC LIMIT 5").fetchall())
+
+    def export(conn):
+        with open(os.devnull, "w") as f:
+            for chunk in iter_inventory_csv(conn):
+                f.write(chunk)
+        return 0
+
+    def bulk_update(conn):
+        rows = conn.execute("SELECT id, quantity FROM inventory_v2 WHERE id % 4 = 0").fetchall()
+        for product_id, quantity in rows:
+            conn.execute("UPDATE inventory_v2 SET quantity = ? WHERE id = ?", (quantity + 1, product_id))
+        conn.commit()
+        return len(rows)
+
+    return [("full listing", listing), ("LIKE search", search), ("dashboard", dashboard),
+            ("CSV export", export), ("bulk update", bulk_update)]
+
+
+def summarize(lateness):
+    ordered = sorted(lateness)
+    worst = ordered[-1] if ordered else 0.0
+    p99 = ordered[int(len(ordered) * 0.99)] if ordered else 0.0
+    return worst, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame lateness with DB work inline vs on the worker thread")
+    parser.add_argument('--products', type=int, default=200000)
+    parser.add_argument('--sales', type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        conn = sqlite3.connect(path)
+        migrations.migrate(conn)
+        print(f"Generating {args.products:,} products and {args.sales:,} sales...")
+        dataset.generate(conn, args.products, args.sales, seed=1)
+        conn.close()
+
+        inline_conn = connect(path, row_factory=None)
+        worker = DBWorker(lambda: connect(path, row_factory=None))
+        loop = FrameLoop()
+        dispatcher = TkDispatcher(loop)
+
+        print(f"\n  {'operation':<14} {'op ms':>8} {'inline worst':>13} {'worker worst':>13} {'worker p99':>11}")
+        failed = False
+        for name, op in operations():
+            # Inline: the frame due while the query runs waits for all of it
+            start = time.perf_counter()
+            op(inline_conn)
+            op_ms = (time.perf_counter() - start) * 1000
+
+            results = []
+            dispatcher.when_done(worker.submit(op), results.append)
+            loop.run_until(lambda: bool(results))
+            worst, p99 = summarize(loop.lateness)
+            ok = worst < FRAME_BUDGET_MS
+            failed |= not ok
+            print(f"  {name:<14} {op_ms:>8.1f} {op_ms:>13.1f} {worst:>13.1f} {p99:>11.1f}  {'✓' if ok else '✗'}")
+
+        worker.close()
+        inline_conn.close()
+
+    print(f"\n{'✗' if failed else '✓'} Worst frame delay with the worker "
+          f"{'exceeded' if failed else 'stayed under'} {FRAME_BUDGET_MS} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
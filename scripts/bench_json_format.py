@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - JSON Response Format Benchmark
+Compares the default list-of-objects responses of /api/inventory and
+/api/sales with ?format=columnar (orjson when installed, and the json
+module fallback): server CPU time per request and payload size, and
+checks that both formats carry the same rows.
+
+Run from the root directory:
+    python scripts/bench_json_format.py --rows 100000
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+
+# Add parent directory to path to import app module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as inventory_app
+from utils import columnar, dataset
+
+HEADERS = {'Authorization': 'bench'}
+
+
+def build(path, rows, seed):
+    inventory_app.db_pool.close_all()
+    inventory_app.DB_PATH = path
+    inventory_app.db_pool = inventory_app.open_pool(path)
+    inventory_app.init_db()
+    conn = sqlite3.connect(path)
+    dataset.generate(conn, rows, rows, seed=seed)
+    conn.close()
+
+
+def measure(client, url, repeat):
+    """(best CPU ms, best wall ms, body) for GET url"""
+    best_cpu = best_wall = float('inf')
+    body = b""
+    for _ in range(repeat):
+        cpu, wall = time.process_time(), time.perf_counter()
+        resp = client.get(url, headers=HEADERS)
+        body = resp.get_data()
+        best_cpu = min(best_cpu, time.process_time() - cpu)
+        best_wall = min(best_wall, time.perf_counter() - wall)
+        if resp.status_code != 200:
+            raise SystemExit(f"✗ GET {url} returned {resp.status_code}")
+    return best_cpu * 1000, best_wall * 1000, body
+
+
+def as_objects(body):
+    """Columnar body turned back into the default list of objects"""
+    data = json.loads(body)
+    return [dict(zip(data['columns'], row)) for row in data['rows']]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark object vs columnar JSON listings")
+    parser.add_argument('--rows', type=int, default=100000, help="Products and sales to generate")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    encoder = columnar.orjson
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Generating {args.rows:,} products and sales...")
+        build(os.path.join(tmp, "bench.db"), args.rows, args.seed)
+        client = inventory_app.app.test_client()
+
+        endpoints = [
+            ("inventory", "/api/inventory"),
+            ("sales", f"/api/sales?limit={args.rows}"),
+        ]
+        variants = [("objects", None, False)]
+        if encoder is not None:
+            variants.append(("columnar (orjson)", encoder, True))
+        variants.append(("columnar (json)", None, True))
+
+        print(f"\n  {'endpoint':<10} {'format':<18} {'CPU ms':>9} {'wall ms':>9} {'bytes':>12} {'gzip bytes':>11}")
+        failed = False
+        for name, url in endpoints:
+            reference = None
+            for label, module, as_columns in variants:
+                columnar.orjson = module
+                target = url + ("&" if "?" in url else "?") + "format=columnar" if as_columns else url
+                cpu_ms, wall_ms, body = measure(client, target, args.repeat)
+                rows = as_objects(body) if as_columns else json.loads(body)
+                if reference is None:
+                    reference, base_cpu, base_bytes = rows, cpu_ms, len(body)
+                elif rows != reference:
+                    print(f"  ✗ {name} {label}: rows differ from the object format")
+                    failed = True
+                print(f"  {name:<10} {label:<18} {cpu_ms:>9.1f} {wall_ms:>9.1f} {len(body):>12,} "
+                      f"{len(gzip.compress(body, 6)):>11,}"
+                      + ("" if not as_columns else f"  ({base_cpu / cpu_ms:.1f}x CPU, {len(body) / base_bytes:.0%} size)"))
+        columnar.orjson = encoder
+
+    print("\n✗ Formats disagree" if failed else "\n✓ Columnar responses match the object format")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Batch Sales Benchmark
+Checks out the same baskets line by line through POST /api/sales and in one
+request through POST /api/sales/batch, and compares lines per second.
+
+Run from the root directory:
+    python scripts/bench_sales_batch.py --baskets 200 --lines 30
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+
+# Add parent directory to path to import app module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as inventory_app
+from utils import dataset
+from utils.db_pool import ConnectionPool, load_settings
+
+AUTH = {'Authorization': 'bench'}
+
+
+def seed(path, products):
+    inventory_app.DB_PATH = path
+    inventory_app.db_pool = ConnectionPool(path, load_settings(inventory_app.config))
+    inventory_app.init_db()
+    conn = sqlite3.connect(path)
+    dataset.generate(conn, products, seed=products, stock=1000000)
+    conn.close()
+
+
+def make_baskets(count, lines, products):
+    rnd = random.Random(count * lines)
+    return [
+        [{'product_id': rnd.randint(1, products), 'quantity': rnd.randint(1, 3)} for _ in range(lines)]
+        for _ in range(count)
+    ]
+
+
+def checkout_per_line(client, baskets):
+    for basket in baskets:
+        for line in basket:
+            res = client.post('/api/sales', json=line, headers=AUTH)
+            if res.status_code != 200:
+                raise RuntimeError(res.get_json())
+
+
+def checkout_batch(client, baskets):
+    for basket in baskets:
+        res = client.post('/api/sales/batch', json={'lines': basket}, headers=AUTH)
+        if res.status_code != 200:
+            raise RuntimeError(res.get_json())
+
+
+def timed(fn, path, baskets, products):
+    seed(path, products)
+    client = inventory_app.app.test_client()
+    start = time.perf_counter()
+    fn(client, baskets)
+    elapsed = time.perf_counter() - start
+    inventory_app.db_pool.close_all()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-line vs batched sales")
+    parser.add_argument('--baskets', type=int, default=200)
+    parser.add_argument('--lines', type=int, default=30)
+    parser.add_argument('--products', type=int, default=2000)
+    args = parser.parse_args()
+
+    baskets = make_baskets(args.baskets, args.lines, args.products)
+    total_lines = args.baskets * args.lines
+    with tempfile.TemporaryDirectory() as tmp:
+        per_line = timed(checkout_per_line, os.path.join(tmp, 'per_line.db'), baskets, args.products)
+        batch = timed(checkout_batch, os.path.join(tmp, 'batch.db'), baskets, args.products)
+
+    print(f"Baskets: {args.baskets}  Lines per basket: {args.lines}  Products: {args.products}")
+    print(f"  POST /api/sales (per line) : {total_lines / per_line:10.1f} lines/s  {per_line:6.2f}s")
+    print(f"  POST /api/sales/batch      : {total_lines / batch:10.1f} lines/s  {batch:6.2f}s")
+    print(f"  Speedup                    : {per_line / batch:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
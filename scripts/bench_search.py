@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Product Search Benchmark
+Times the old LIKE '%term%' scan against the FTS5 indexes used by
+/api/inventory?search= and the desktop search box.
+
+Run from the root directory:
+    python scripts/bench_search.py --sizes 10000,100000,1000000
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+
+# Add parent directory to path to import the shared utilities
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import dataset, search_index
+
+COLUMNS = ("id", "sku", "name", "category", "quantity", "price", "status", "image")
+TERMS = ["mouse", "charg", "ELE-000004", "wireless mouse", "ke", "zzzz"]
+
+
+def build(path, size):
+    """Generated catalog of size products; returns (conn, seconds to rebuild the FTS indexes)"""
+    conn = sqlite3.connect(path)
+    dataset.generate(conn, size, seed=size)
+    start = time.perf_counter()
+    with conn:
+        search_index.rebuild(conn)
+    return conn, time.perf_counter() - start
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    hits = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = len(fn())
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LIKE vs FTS5 product search")
+    parser.add_argument('--sizes', default="10000,100000,1000000")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",")):
+            conn, index_time = build(os.path.join(tmp, f"search_{size}.db"), size)
+            print(f"\n{size:,} products (index build {index_time:.1f}s)")
+            print(f"  {'term':<16} {'LIKE ms':>10} {'FTS5 ms':>10} {'hits':>8}")
+            for term in TERMS:
+                like_ms, like_hits = timed(lambda: search_index.like_search(conn, term, COLUMNS), args.repeat)
+                fts_ms, fts_hits = timed(lambda: search_index.search(conn, term, COLUMNS), args.repeat)
+                print(f"  {term:<16} {like_ms:>10.2f} {fts_ms:>10.2f} {fts_hits:>8}")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Web Server Load Benchmark
+Starts the Werkzeug development server (python app.py web mode) and the
+Waitress server (python serve.py) on a scratch database, drives both with
+keep-alive clients over the dashboard, inventory and sales endpoints, and
+compares requests per second and latency.
+
+Run from the root directory:
+    python scripts/bench_server.py --clients 16 --duration 10
+"""
+
+import os
+import sys
+import time
+import socket
+import signal
+import random
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+import http.client
+import multiprocessing
+
+# Add parent directory to path to import app module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as inventory_app
+from utils import dataset
+from utils.db_pool import ConnectionPool, load_settings
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUTH = {'Authorization': 'bench'}
+PATHS = ['/api/dashboard', '/api/inventory?limit=100', '/api/sales?limit=50']
+
+DEV_SERVER = """
+import sys
+sys.path.insert(0, {base!r})
+import app
+from utils.db_pool import ConnectionPool, load_settings
+app.DB_PATH = {db!r}
+app.db_pool = ConnectionPool(app.DB_PATH, load_settings(app.config))
+app.app.run(host='127.0.0.1', port={port}, threaded=True, debug=False)
+"""
+
+
+def seed(path, products, sales):
+    inventory_app.DB_PATH = path
+    inventory_app.db_pool = ConnectionPool(path, load_settings(inventory_app.config))
+    inventory_app.init_db()
+    inventory_app.db_pool.close_all()
+    conn = sqlite3.connect(path)
+    dataset.generate(conn, products, sales, seed=products, stock=1000)
+    conn.close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_ready(port, timeout=20):
+    """Poll /healthz until the server answers 200"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=0.5)
+        try:
+            conn.request('GET', '/healthz')
+            if conn.getresponse().status == 200:
+                return
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not become ready")
+
+
+def client(args):
+    """One keep-alive connection issuing requests until the deadline; returns latencies and errors"""
+    port, deadline, seed_value = args
+    rnd = random.Random(seed_value)
+    latencies, errors = [], 0
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request('GET', rnd.choice(PATHS), headers=AUTH)
+            res = conn.getresponse()
+            res.read()
+            if res.status != 200:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return latencies, errors
+
+
+def load(port, clients, duration):
+    deadline = time.monotonic() + duration
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(client, [(port, deadline, n) for n in range(clients)])
+    latencies = sorted(l for lats, _ in results for l in lats)
+    errors = sum(e for _, e in results)
+    if not latencies:
+        return 0.0, 0.0, 0.0, errors
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return len(latencies) / duration, pct(0.50), pct(0.99), errors
+
+
+def run_server(command, port, clients, duration):
+    proc = subprocess.Popen(command, cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_ready(port)
+        return load(port, clients, duration)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=20)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dev server against Waitress")
+    parser.add_argument('--clients', type=int, default=16, help="Concurrent keep-alive connections")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per server")
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--sales', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=8, help="Waitress threads per process")
+    parser.add_argument('--workers', type=int, default=2, help="Waitress worker processes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'bench.db')
+        seed(db, args.products, args.sales)
+
+        port = free_port()
+        dev = run_server([sys.executable, '-c', DEV_SERVER.format(base=BASE_DIR, db=db, port=port)],
+                         port, args.clients, args.duration)
+        runs = [("Werkzeug dev server", dev)]
+        for workers in sorted({1, args.workers}):
+            port = free_port()
+            command = [sys.executable, 'serve.py', '--db', db, '--port', str(port),
+                       '--threads', str(args.threads), '--workers', str(workers)]
+            runs.append((f"Waitress {workers}p x {args.threads}t", run_server(command, port, args.clients, args.duration)))
+
+    print(f"Clients: {args.clients}  Duration: {args.duration:.0f}s  Paths: {', '.join(PATHS)}")
+    print(f"  {'server':<22} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for label, (rps, p50, p99, errors) in runs:
+        print(f"  {label:<22} {rps:>9.1f} {p50:>8.2f} {p99:>8.2f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
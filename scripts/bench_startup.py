@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Desktop Startup Benchmark
+Measures what main.py pays before the login window can appear: importing
+CE.py (and everything it pulls in), using python -X importtime. Fails when
+the import goes over budget or when a lazily loaded dependency (OpenCV,
+pyzbar, Pillow, numpy) is imported at launch again.
+
+Run from the root directory:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --budget-ms 400 --runs 5 --top 15
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only the scanner and image previews need these; they must not load at launch
+LAZY_MODULES = ("cv2", "pyzbar", "PIL", "numpy")
+
+
+def import_profile(module):
+    """Import module in a fresh interpreter; returns [(package, depth, cumulative_us)]"""
+    # main.py imports ttkbootstrap before CE, so it counts towards launch too
+    code = f"import ttkbootstrap, {module}" if module == "CE" else f"import {module}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        raise RuntimeError(f"import {module} failed: {lines[-1] if lines else 'unknown error'}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", nested two spaces per level
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(cumulative)))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the desktop app's launch imports")
+    parser.add_argument("--module", default="CE", help="Module main.py imports (default: CE)")
+    parser.add_argument("--budget-ms", type=float, default=400.0,
+                        help="Fail if the median import time exceeds this")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    totals, profile = [], []
+    try:
+        for _ in range(max(1, args.runs)):
+            profile = import_profile(args.module)
+            totals.append(sum(us for _, depth, us in profile if depth == 0))
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return 1
+
+    median_ms = statistics.median(totals) / 1000
+    print(f"import {args.module}: median {median_ms:.0f} ms over {len(totals)} run(s) "
+          f"(min {min(totals) / 1000:.0f}, max {max(totals) / 1000:.0f})")
+    print("\nSlowest imports (cumulative, last run):")
+    for name, _, us in sorted(profile, key=lambda entry: -entry[2])[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    ok = True
+    eager = sorted({name for name, _, _ in profile if name.partition(".")[0] in LAZY_MODULES})
+    if eager:
+        print(f"\n✗ Loaded at launch but should be lazy: {', '.join(eager)}")
+        ok = False
+    if median_ms > args.budget_ms:
+        print(f"\n✗ Over budget: {median_ms:.0f} ms > {args.budget_ms:.0f} ms")
+        ok = False
+    if ok:
+        print(f"\n✓ Within {args.budget_ms:.0f} ms budget, no heavy optional imports at launch")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
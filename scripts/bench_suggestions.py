@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Search Suggestion Benchmark
+Builds a synthetic catalog, loads the in-memory suggestion index
+(utils/suggest.py) and times lookups for names and SKUs typed one
+character at a time - what the desktop search box sends after each pause
+in typing - against the FTS query the box used before. Then edits,
+inserts and deletes products and checks that the caught-up index answers
+like a fresh load.
+
+Run from the root directory:
+    python scripts/bench_suggestions.py --products 1000000
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import tracemalloc
+
+# Add parent directory to path to import the shared utilities
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import dataset, migrations, suggest
+from utils.search_index import search as search_inventory
+from utils.suggest import SuggestionIndex
+
+
+def typed(text, rnd):
+    """The prefixes of text a user sends while typing it, skipping some keystrokes like the debounce does"""
+    return [text[:n] for n in range(1, len(text) + 1) if n == len(text) or rnd.random() < 0.6]
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+    return pick(0.5), pick(0.95), pick(0.99), ordered[-1]
+
+
+def edit(conn, rnd, count):
+    """Rename, re-SKU, insert and delete products the way the app's dialogs do"""
+    ids = [r[0] for r in conn.execute("SELECT id FROM inventory_v2 ORDER BY RANDOM() LIMIT ?", (count * 3,))]
+    for product_id in ids[:count]:
+        conn.execute("UPDATE inventory_v2 SET name = name || ' Renamed' WHERE id = ?", (product_id,))
+    for product_id in ids[count:count * 2]:
+        conn.execute("UPDATE inventory_v2 SET sku = 'NEW-' || id WHERE id = ?", (product_id,))
+    conn.executemany("DELETE FROM inventory_v2 WHERE id = ?", [(i,) for i in ids[count * 2:]])
+    conn.executemany(
+        "INSERT INTO inventory_v2 (sku, name, category, quantity, price, status) VALUES (?, ?, 'Misc', 1, 1.0, 'In Stock')",
+        [(f"ADD-{i:05d}", f"Zephyr Added Gadget {i}") for i in range(count)],
+    )
+    conn.execute("UPDATE inventory_v2 SET quantity = quantity + 1 WHERE id = ?", (ids[0],))
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-memory search suggestions")
+    parser.add_argument('--products', type=int, default=1000000)
+    parser.add_argument('--samples', type=int, default=300, help="Products whose name and SKU are typed")
+    parser.add_argument('--budget-ms', type=float, default=5.0, help="p99 lookup budget")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rnd = random.Random(args.seed)
+    failed = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        migrations.migrate(conn)
+        print(f"Generating {args.products:,} products...")
+        dataset.generate(conn, args.products, 0, seed=args.seed)
+
+        index = SuggestionIndex()
+        start = time.perf_counter()
+        index.load(conn)
+        load_ms = (time.perf_counter() - start) * 1000
+        tracemalloc.start()
+        traced = SuggestionIndex()
+        traced.load(conn)
+        size_mb, peak_mb = (n / 1e6 for n in tracemalloc.get_traced_memory())
+        tracemalloc.stop()
+        del traced
+        print(f"  Index load: {load_ms:,.0f} ms, {size_mb:,.0f} MB in memory ({peak_mb:,.0f} MB peak while loading)")
+
+        sample = conn.execute("SELECT name, sku FROM inventory_v2 ORDER BY RANDOM() LIMIT ?", (args.samples,)).fetchall()
+        terms = []
+        for name, sku in sample:
+            terms.extend(typed(name, rnd))
+            terms.extend(typed(sku, rnd))
+        terms.extend(["zzzz", "qx", "wireless zzz", "pro ultra"])
+
+        print(f"\n  {'lookup':<24} {'terms':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for label, run, subset in (
+            ("in-memory index", lambda t: index.lookup(conn, t), terms),
+            # Every tenth term is plenty to show where the old query stands
+            ("FTS (previous)", lambda t: search_inventory(conn, t, ("name",), column="name", limit=5), terms[::10]),
+        ):
+            times = []
+            for term in subset:
+                start = time.perf_counter()
+                run(term)
+                times.append((time.perf_counter() - start) * 1000)
+            p50, p95, p99, worst = percentiles(times)
+            print(f"  {label:<24} {len(subset):>6} {p50:>8.3f} {p95:>8.3f} {p99:>8.3f} {worst:>8.3f}")
+            if label == "in-memory index" and p99 > args.budget_ms:
+                failed = True
+
+        # Incremental maintenance must end up where a fresh load does
+        edit(conn, rnd, 100)
+        start = time.perf_counter()
+        index.catch_up(conn)
+        catch_up_ms = (time.perf_counter() - start) * 1000
+        fresh = SuggestionIndex()
+        fresh.load(conn)
+        checks = terms[::7] + ["Zephyr", "zephyr added", "ADD-000", "NEW-", "renamed"]
+        # Slot order differs after edits, so compare every match as a set, with no walk cap
+        suggest.MAX_WALK = None
+        mismatched = [t for t in checks if set(index.suggest(t, 10 ** 7)) != set(fresh.suggest(t, 10 ** 7))]
+        print(f"\n  Catch-up after 400 edits: {catch_up_ms:.1f} ms")
+        if mismatched:
+            print(f"  ✗ {len(mismatched)} terms differ from a fresh load, e.g. {mismatched[:3]}")
+            failed = True
+        else:
+            print(f"  ✓ {len(checks)} terms match a fresh load")
+        conn.close()
+
+    print("\n✗ Suggestion benchmark failed" if failed
+          else f"\n✓ p99 lookup within {args.budget_ms} ms and the caught-up index matches the database")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - CSV Import Check
+Imports the same CSV into a database laid out like the shipped
+store_inventory.db (sku with only a plain, non-unique idx_inventory_sku)
+and into a freshly migrated one, and checks both end up with the same
+rows and import counts. Fails if the importer relies on a constraint the
+older layout doesn't have.
+
+Run from the root directory:
+    python scripts/check_csv_import.py
+"""
+
+import io
+import os
+import sys
+import sqlite3
+
+# Add parent directory to path to import the shared utilities
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.csv_import import import_rows, iter_csv_upload
+from utils.migrations import migrate
+
+# Created by the desktop app before the schema was versioned
+LEGACY_SCHEMA = """
+    CREATE TABLE inventory_v2 (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sku TEXT,
+        name TEXT NOT NULL,
+        category TEXT,
+        quantity INTEGER NOT NULL,
+        price REAL NOT NULL,
+        status TEXT DEFAULT 'In Stock',
+        image TEXT
+    );
+    CREATE INDEX idx_inventory_sku ON inventory_v2(sku);
+"""
+
+SEED = """
+    INSERT INTO inventory_v2 (sku, name, category, quantity, price) VALUES
+        ('OLD-1', 'Old Cable', 'Cables', 3, 4.5),
+        ('OLD-2', 'Old Charger', 'Power', 8, 12.0),
+        (NULL, 'Loose Part', 'Misc', 1, 0.5)
+"""
+
+UPLOAD = b"""\xef\xbb\xbfsku,name,category,quantity,price
+OLD-1,Cable v2,Cables,10,5.0
+NEW-1,Fresh Hub,Hubs,4,20
+,No SKU One,,2,1
+,No SKU Two,Misc,2,1
+NEW-1,Fresh Hub Again,Hubs,6,21
+BAD,Broken Row,Misc,lots,1
+"""
+
+EXPECTED_COUNTS = {'imported': 3, 'updated': 2, 'skipped': 0, 'invalid': 1}
+
+
+def status_for(quantity, category):
+    return "In Stock" if quantity > 5 else "Low Stock"
+
+
+def run_import(conn):
+    conn.execute(SEED)
+    conn.commit()
+    counts = import_rows(conn, iter_csv_upload(io.BytesIO(UPLOAD)), status_for, batch_size=2)
+    rows = conn.execute(
+        "SELECT IFNULL(sku, ''), name, category, quantity, price FROM inventory_v2 ORDER BY name"
+    ).fetchall()
+    return counts, rows
+
+
+def legacy_db():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(LEGACY_SCHEMA)
+    return conn
+
+
+def migrated(conn):
+    migrate(conn)
+    return conn
+
+
+def main():
+    failed = False
+    results = {}
+    for label, make in (("legacy (non-unique sku index)", legacy_db),
+                        ("legacy, then migrated", lambda: migrated(legacy_db())),
+                        ("fresh, migrated", lambda: migrated(sqlite3.connect(":memory:")))):
+        try:
+            counts, rows = run_import(make())
+        except sqlite3.Error as e:
+            print(f"  {label:<32} ✗ {e}")
+            failed = True
+            continue
+        results[label] = rows
+        ok = counts == EXPECTED_COUNTS
+        failed |= not ok
+        print(f"  {label:<32} {'✓' if ok else '✗'} {counts}")
+
+    if len(set(map(tuple, results.values()))) > 1:
+        print("  ✗ The databases ended up with different rows")
+        failed = True
+
+    print("\n✗ CSV import check failed" if failed else "\n✓ CSV import works with and without a unique sku index")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Query Plan Check
+Migrates a scratch database and runs EXPLAIN QUERY PLAN on the queries
+behind the API endpoints and desktop views. Fails if any of them scans a
+table without an index or sorts through a temporary B-tree.
+
+Run from the root directory:
+    python scripts/check_query_plans.py
+"""
+
+import os
+import re
+import sys
+import sqlite3
+
+# Add parent directory to path to import the shared utilities
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.migrations import migrate
+from utils.sales import SELL_SQL
+from utils.search_index import match_filter
+from utils.thresholds import status_sql
+
+# (where it runs, sql, params)
+QUERIES = [
+    ("dashboard recent sales",
+     "SELECT name, quantity, price, sale_date FROM sales ORDER BY sale_date DESC LIMIT 10", ()),
+    ("GET /api/sales",
+     "SELECT id, name, quantity, price, sale_date FROM sales ORDER BY sale_date DESC LIMIT ?", (50,)),
+    ("desktop recent sales",
+     "SELECT name, quantity, sale_date FROM sales ORDER BY sale_date DESC LIMIT 5", ()),
+    ("product sales history",
+     "SELECT quantity, price, sale_date FROM sales WHERE product_id = ? ORDER BY sale_date DESC", (1,)),
+    ("low stock list",
+     "SELECT id, name, quantity FROM inventory_v2 WHERE status = 'Low Stock'", ()),
+    ("GET /api/categories",
+     "SELECT DISTINCT category FROM inventory_v2 WHERE category IS NOT NULL AND category != '' ORDER BY category", ()),
+    ("products per category",
+     "SELECT category, COUNT(*) FROM inventory_v2 GROUP BY category", ()),
+    ("POST /api/inventory duplicate SKU",
+     "SELECT 1 FROM inventory_v2 WHERE sku=?", ("SKU001",)),
+    ("desktop edit duplicate SKU",
+     "SELECT id FROM inventory_v2 WHERE sku=? AND id!=?", ("SKU001", 1)),
+    ("GET /api/inventory/<id>",
+     "SELECT id, sku, name, category, quantity, price, status, image FROM inventory_v2 WHERE id=?", (1,)),
+    ("POST /api/sales decrement", SELL_SQL, {'id': 1, 'qty': 1}),
+    ("inventory page by name",
+     "SELECT id, name FROM inventory_v2 WHERE name >= ? AND (name, id) > (?, ?) ORDER BY name, id LIMIT 101",
+     ("m", "m", 0)),
+    ("dashboard totals",
+     "SELECT product_count, total_quantity FROM inventory_stats WHERE id = 1", ()),
+    ("PUT /api/thresholds/<category> recompute",
+     f"UPDATE inventory_v2 SET status = {status_sql('quantity', 'inventory_v2.category')} "
+     "WHERE quantity >= ? AND quantity < ? AND inventory_v2.category = ?", (5, 20, "Electronics")),
+    ("PUT /api/thresholds/default recompute",
+     f"UPDATE inventory_v2 SET status = {status_sql('quantity', 'inventory_v2.category')} "
+     "WHERE quantity >= ? AND quantity < ? AND inventory_v2.category NOT IN (SELECT category FROM category_thresholds)",
+     (5, 20)),
+    ("ETag data version",
+     "SELECT version FROM change_counters WHERE name = ?", ("data",)),
+]
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def problems_in(plan):
+    return [d for d in plan if FULL_SCAN.match(d) or "USE TEMP B-TREE" in d]
+
+
+def main():
+    conn = sqlite3.connect(":memory:")
+    migrate(conn)
+    conn.execute("INSERT INTO inventory_v2 (sku, name, category, quantity, price) VALUES ('SKU001', 'Mouse', 'Electronics', 5, 9.99)")
+
+    where, params = match_filter(conn, "mouse")
+    QUERIES.append(("GET /api/inventory?search=", f"SELECT id, name FROM inventory_v2 WHERE {where}", params))
+
+    failures = 0
+    for label, sql, params in QUERIES:
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        bad = problems_in(plan)
+        mark = "✗" if bad else "✓"
+        print(f"{mark} {label}")
+        for detail in plan:
+            print(f"    {detail}")
+        failures += bool(bad)
+    conn.close()
+
+    if failures:
+        print(f"\n✗ {failures} query plan(s) without an index")
+        return 1
+    print(f"\n✓ All {len(QUERIES)} queries use an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Virtual Table Row Model Check
+Loads a small synthetic catalog and asks RowModel (utils/virtual_table.py)
+for windows the desktop table can request with its page cache full,
+including one that spans a loaded page and a missing one. Fails if a
+window comes back with blank rows or rows that differ from a plain
+ORDER BY query.
+
+Run from the root directory:
+    python scripts/check_virtual_table.py
+"""
+
+import os
+import sys
+import random
+import sqlite3
+
+# Add parent directory to path to import the shared utilities
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import dataset, migrations
+from utils.virtual_table import RowModel
+
+COLUMNS = ("id", "sku", "name")
+PAGE_SIZE = 40
+MAX_PAGES = 5
+WINDOW = 30
+
+
+def check_window(model, expected, start):
+    """Number of blank rows, or -1 if the rows are complete but wrong"""
+    first, total, rows = model.window(start, WINDOW)
+    blank = sum(row is None for row in rows)
+    if blank:
+        return blank
+    return 0 if rows == expected[first:first + WINDOW] else -1
+
+
+def report(label, problem):
+    detail = {0: "", -1: " (wrong rows)"}.get(problem, f" ({problem} blank rows)")
+    print(f"  {label:<40} {'✗' if problem else '✓'}{detail}")
+    return bool(problem)
+
+
+def main():
+    conn = sqlite3.connect(":memory:")
+    migrations.migrate(conn)
+    dataset.generate(conn, 3000, 0, seed=1)
+    expected = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM inventory_v2 ORDER BY name, id").fetchall()
+
+    model = RowModel(conn, COLUMNS, page_size=PAGE_SIZE, max_pages=MAX_PAGES)
+    model.set_sort("name")
+    model.refresh()
+    failed = False
+
+    # Page 4 is the oldest of a full cache; rows 176..205 need it and the missing page 5
+    for page in (4, 26, 27, 1, 2):
+        model.store_page(page, model.fetch_page(page))
+    failed |= report("loaded + missing page, cache full", check_window(model, expected, 176))
+
+    rnd = random.Random(1)
+    problem = 0
+    for _ in range(200):
+        problem = check_window(model, expected, rnd.randrange(len(expected)))
+        if problem:
+            break
+    failed |= report("200 random windows", problem)
+
+    print("\n✗ Virtual table check failed" if failed else "\n✓ Every window came back complete and in order")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
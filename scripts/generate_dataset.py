@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Synthetic Dataset Generator
+Builds a benchmark database of any size: products with skewed categories
+and realistic SKUs, names and prices, a sales history with weekly and
+seasonal patterns, per-category low stock thresholds and placeholder
+images. The same --seed always produces the same data.
+
+Run from the root directory:
+    python scripts/generate_dataset.py --db bench.db --products 100000 --sales 1000000
+    python scripts/generate_dataset.py --db big.db --products 1000000 --sales 10000000 --images 50
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+from datetime import date
+
+# Add parent directory to path to import the shared utilities
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import dataset
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic inventory database")
+    parser.add_argument('--db', required=True, help="Database file to create")
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--sales', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--categories', type=int, default=12)
+    parser.add_argument('--category-skew', type=float, default=1.0,
+                        help="Zipf exponent for category sizes (0 = even)")
+    parser.add_argument('--start', type=parse_date, help="First sale date (default: a year before --end)")
+    parser.add_argument('--end', type=parse_date, help="Last sale date (default: today)")
+    parser.add_argument('--threshold-share', type=float, default=0.3,
+                        help="Fraction of categories with their own low stock threshold")
+    parser.add_argument('--images', type=int, default=0,
+                        help="Placeholder images to write to an images folder next to --db")
+    parser.add_argument('--stock', type=int, help="Give every product this quantity")
+    parser.add_argument('--force', action='store_true', help="Replace --db if it exists")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        if not args.force:
+            print(f"✗ {args.db} already exists (use --force to replace it)")
+            return 1
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+    image_dir = os.path.join(os.path.dirname(os.path.abspath(args.db)), "images")
+    print(f"Generating {args.products:,} products and {args.sales:,} sales into {args.db} (seed {args.seed})")
+    start = time.perf_counter()
+    conn = sqlite3.connect(args.db)
+    try:
+        counts = dataset.generate(
+            conn, args.products, args.sales, seed=args.seed,
+            categories=args.categories, category_skew=args.category_skew,
+            start=args.start, end=args.end, threshold_share=args.threshold_share,
+            image_dir=image_dir if args.images else None, images=args.images, stock=args.stock,
+        )
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    finally:
+        conn.close()
+
+    print(f"✓ {counts['products']:,} products in {counts['categories']} categories, "
+          f"{counts['sales']:,} sales, {counts['images']} images in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,9 +12,11 @@ import sys
 import sqlite3
 from datetime import datetime
 
-# Add parent directory to path to import app module
+# Add parent directory to path to import the shared utilities
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from utils.migrations import migrate
+
 def get_db_path():
     """Get the path to the database file"""
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -26,57 +28,8 @@ def init_db():
     conn = sqlite3.connect(db_path)
     c = conn.cursor()
     
-    # Users table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            username TEXT PRIMARY KEY,
-            password_hash TEXT,
-            role TEXT
-        )
-    """)
-    
-    # Inventory table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS inventory_v2 (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            sku TEXT UNIQUE,
-            name TEXT NOT NULL,
-            category TEXT,
-            quantity INTEGER NOT NULL,
-            price REAL NOT NULL,
-            status TEXT DEFAULT 'In Stock',
-            image TEXT
-        )
-    """)
-    
-    # Sales table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS sales (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            product_id INTEGER,
-            sku TEXT,
-            name TEXT,
-            quantity INTEGER,
-            price REAL,
-            sale_date TEXT
-        )
-    """)
-    
-    # Settings table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS app_settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        )
-    """)
-    
-    # Category thresholds
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS category_thresholds (
-            category TEXT PRIMARY KEY,
-            threshold INTEGER NOT NULL
-        )
-    """)
+    # Tables, triggers and indexes are versioned in utils/migrations.py
+    migrate(conn)
     
     # Check if default users exist and create them if not
     c.execute("SELECT count(*) FROM users")
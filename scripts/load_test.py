@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - API Load Test
+Replays a weighted mix of login, dashboard, inventory search, sale,
+CSV import and CSV export requests at fixed concurrency against the real
+app, either in-process (Flask test client) or over localhost (serve.py
+on a scratch database), and reports throughput and p50/p95/p99 latency
+per endpoint. --json saves the run so commits can be compared with
+--compare.
+
+Run from the root directory:
+    python scripts/load_test.py --target both --concurrency 8 --duration 15 --json run.json
+    python scripts/load_test.py --target http --mix search=60,sale=40 --compare run.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import signal
+import socket
+import sqlite3
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import http.client
+from datetime import datetime, timezone
+
+# Add parent directory to path to import app module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as inventory_app
+from utils import dataset
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUTH = {'Authorization': 'loadtest'}
+DEFAULT_MIX = "login=5,dashboard=20,search=35,sale=25,import=5,export=10"
+CSV_IMPORT_ROWS = 50
+SEARCH_WORDS = [w.lower() for w in dataset.BRANDS + dataset.ADJECTIVES] + \
+    [noun.lower() for _, nouns in dataset.CATEGORIES.values() for noun in nouns]
+
+
+# --- Request mix ---
+# Each operation returns (method, path, json_body, csv_upload)
+
+def op_login(rnd, products):
+    return 'POST', '/api/login', {'username': 'admin', 'password': 'admin'}, None
+
+
+def op_dashboard(rnd, products):
+    return 'GET', '/api/dashboard', None, None
+
+
+def op_search(rnd, products):
+    term = rnd.choice(SEARCH_WORDS)
+    if rnd.random() < 0.3:
+        # Typing in progress: a short prefix
+        term = term[:rnd.randint(2, 4)]
+    return 'GET', f'/api/inventory?limit=50&search={term.replace(" ", "+")}', None, None
+
+
+def op_sale(rnd, products):
+    return 'POST', '/api/sales', {'product_id': rnd.randint(1, products), 'quantity': rnd.randint(1, 3)}, None
+
+
+def op_import(rnd, products):
+    # SKUs from a fixed pool: inserts at first, then mostly updates
+    out = io.StringIO()
+    out.write("sku,name,category,quantity,price\n")
+    for _ in range(CSV_IMPORT_ROWS):
+        sku = f"LOAD-{rnd.randint(1, 5000):05d}"
+        out.write(f"{sku},Load Test Item,Electronics,{rnd.randint(0, 500)},{rnd.uniform(1, 200):.2f}\n")
+    return 'POST', '/api/import-csv', None, out.getvalue().encode()
+
+
+def op_export(rnd, products):
+    return 'GET', '/api/export-csv?columns=sku,name,quantity,price', None, None
+
+
+OPERATIONS = {
+    'login': op_login,
+    'dashboard': op_dashboard,
+    'search': op_search,
+    'sale': op_sale,
+    'import': op_import,
+    'export': op_export,
+}
+
+
+def parse_mix(text):
+    """"search=60,sale=40" -> {'search': 60.0, 'sale': 40.0}"""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r} (choose from {', '.join(OPERATIONS)})")
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise ValueError(f"Weight for {name} must be a number")
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The mix needs at least one operation with a positive weight")
+    return mix
+
+
+# --- Transports ---
+
+class InProcessClient:
+    """Flask test client: the full request path without sockets"""
+
+    def __init__(self):
+        self.client = inventory_app.app.test_client()
+
+    def send(self, method, path, body, upload):
+        kwargs = {'headers': AUTH}
+        if body is not None:
+            kwargs['json'] = body
+        if upload is not None:
+            kwargs['data'] = {'file': (io.BytesIO(upload), 'load.csv')}
+            kwargs['content_type'] = 'multipart/form-data'
+        resp = self.client.open(path, method=method, **kwargs)
+        # Drains streamed responses such as the CSV export
+        resp.get_data()
+        return resp.status_code
+
+    def close(self):
+        pass
+
+
+class HttpClient:
+    """One keep-alive connection to a running server"""
+
+    def __init__(self, port):
+        self.port = port
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+
+    def send(self, method, path, body, upload):
+        headers = dict(AUTH)
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        if upload is not None:
+            boundary = uuid.uuid4().hex
+            payload = (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="load.csv"\r\n'
+                f'Content-Type: text/csv\r\n\r\n'
+            ).encode() + upload + f'\r\n--{boundary}--\r\n'.encode()
+            headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            resp = self.conn.getresponse()
+            resp.read()
+            return resp.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+            return 0
+
+    def close(self):
+        self.conn.close()
+
+
+# --- Load loop ---
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def run_load(make_client, mix, concurrency, duration, products, seed):
+    """Drive concurrency clients for duration seconds; returns the per-endpoint summary"""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = {name: [] for name in names}
+    statuses = {name: {} for name in names}
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+    deadline = [0.0]
+
+    def worker(index):
+        rnd = random.Random(seed * 1000 + index)
+        client = make_client()
+        local = {name: [] for name in names}
+        local_status = {name: {} for name in names}
+        barrier.wait()
+        try:
+            while time.perf_counter() < deadline[0]:
+                name = rnd.choices(names, weights)[0]
+                method, path, body, upload = OPERATIONS[name](rnd, products)
+                start = time.perf_counter()
+                status = client.send(method, path, body, upload)
+                local[name].append(time.perf_counter() - start)
+                local_status[name][status] = local_status[name].get(status, 0) + 1
+        finally:
+            client.close()
+        with lock:
+            for name in names:
+                samples[name].extend(local[name])
+                for status, count in local_status[name].items():
+                    statuses[name][status] = statuses[name].get(status, 0) + count
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    deadline[0] = time.perf_counter() + duration
+    barrier.wait()
+    for t in threads:
+        t.join()
+
+    summary, total = {}, 0
+    for name in names:
+        latencies = sorted(samples[name])
+        total += len(latencies)
+        # 2xx/3xx and expected client errors (e.g. out of stock) count as served
+        errors = sum(count for status, count in statuses[name].items() if status == 0 or status >= 500)
+        summary[name] = {
+            'requests': len(latencies),
+            'rps': len(latencies) / duration,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'errors': errors,
+            'statuses': {str(status): count for status, count in sorted(statuses[name].items())},
+        }
+    return {'total_requests': total, 'total_rps': total / duration, 'endpoints': summary}
+
+
+# --- Fixtures and servers ---
+
+def use_database(path):
+    inventory_app.db_pool.close_all()
+    inventory_app.DB_PATH = path
+    inventory_app.db_pool = inventory_app.open_pool(path)
+
+
+def build_fixture(path, products, sales, seed):
+    use_database(path)
+    # Creates the schema and the default admin/user accounts
+    inventory_app.init_db()
+    conn = sqlite3.connect(path)
+    dataset.generate(conn, products, sales, seed=seed, stock=1000000)
+    conn.close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=0.5)
+        try:
+            conn.request('GET', '/healthz')
+            if conn.getresponse().status == 200:
+                return
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not become ready")
+
+
+def run_http(db, args, mix):
+    port = free_port()
+    command = [sys.executable, 'serve.py', '--db', db, '--port', str(port),
+               '--threads', str(args.server_threads), '--workers', str(args.server_workers)]
+    proc = subprocess.Popen(command, cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_ready(port)
+        return run_load(lambda: HttpClient(port), mix, args.concurrency, args.duration, args.products, args.seed)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# --- Reporting ---
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_result(label, result, baseline=None):
+    print(f"\n{label}: {result['total_rps']:.1f} req/s ({result['total_requests']} requests)")
+    print(f"  {'endpoint':<10} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, row in result['endpoints'].items():
+        line = (f"  {name:<10} {row['requests']:>7} {row['rps']:>8.1f} {row['p50_ms']:>8.2f} "
+                f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['errors']:>7}")
+        before = (baseline or {}).get('endpoints', {}).get(name)
+        if before and before['p95_ms']:
+            change = (row['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100
+            line += f"   p95 {change:+.0f}% vs baseline"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the inventory API with a weighted request mix")
+    parser.add_argument('--target', choices=('inprocess', 'http', 'both'), default='both')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"Operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per target")
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--sales', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--server-threads', type=int, default=8, help="Waitress threads (http target)")
+    parser.add_argument('--server-workers', type=int, default=1, help="Waitress processes (http target)")
+    parser.add_argument('--json', help="Write the results to this file")
+    parser.add_argument('--compare', help="Earlier --json file to compare p95 latencies against")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    args.concurrency = max(1, args.concurrency)
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+
+    targets = ('inprocess', 'http') if args.target == 'both' else (args.target,)
+    results = {}
+    print(f"Products: {args.products:,}  Sales: {args.sales:,}  Concurrency: {args.concurrency}  "
+          f"Duration: {args.duration:.0f}s  Mix: {', '.join(f'{k}={v:g}' for k, v in mix.items())}")
+    for target in targets:
+        # A fresh database per target so earlier writes don't skew the next run
+        with tempfile.TemporaryDirectory() as tmp:
+            db = os.path.join(tmp, 'load.db')
+            build_fixture(db, args.products, args.sales, args.seed)
+            if target == 'inprocess':
+                results[target] = run_load(InProcessClient, mix, args.concurrency, args.duration,
+                                           args.products, args.seed)
+            else:
+                inventory_app.db_pool.close_all()
+                results[target] = run_http(db, args, mix)
+            inventory_app.db_pool.close_all()
+        print_result("In-process (test client)" if target == 'inprocess' else "HTTP (Waitress on localhost)",
+                     results[target], baseline.get(target))
+
+    if args.json:
+        report = {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'config': {key: getattr(args, key) for key in
+                       ('concurrency', 'duration', 'products', 'sales', 'seed', 'server_threads', 'server_workers')},
+            'mix': mix,
+            'results': results,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Results written to {args.json}")
+
+    errors = sum(row['errors'] for result in results.values() for row in result['endpoints'].values())
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
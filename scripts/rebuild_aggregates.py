@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Dashboard Aggregates Rebuild
+Recomputes inventory_stats/category_stats from inventory_v2 and checks
+the trigger-maintained values against a fresh scan.
+
+Run from the root directory:
+    python scripts/rebuild_aggregates.py            # rebuild, then verify
+    python scripts/rebuild_aggregates.py --check    # verify only
+"""
+
+import os
+import sys
+import sqlite3
+import argparse
+
+# Add parent directory to path to import the shared utilities
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import aggregates
+
+
+def get_db_path():
+    """Get the path to the database file"""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, "store_inventory.db")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild and verify the dashboard aggregates")
+    parser.add_argument('--db', default=get_db_path(), help="Database file (default: store_inventory.db)")
+    parser.add_argument('--check', action='store_true', help="Only compare stored aggregates with a fresh scan")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"✗ Database not found: {args.db}")
+        return 1
+
+    conn = sqlite3.connect(args.db)
+    try:
+        aggregates.ensure_schema(conn)
+        if args.check:
+            problems = aggregates.verify(conn)
+            if problems:
+                print("✗ Aggregates drifted from inventory_v2:")
+                for p in problems:
+                    print(f"  {p}")
+        else:
+            before = aggregates.verify(conn)
+            aggregates.rebuild(conn)
+            problems = aggregates.verify(conn)
+            conn.commit()
+            print(f"✓ Rebuilt aggregates ({len(before)} mismatch(es) corrected)")
+            for p in before:
+                print(f"  {p}")
+        totals = aggregates.read_totals(conn)
+    finally:
+        conn.close()
+
+    for name, value in totals.items():
+        print(f"  {name:<20} {value}")
+    if problems:
+        return 1
+    print("✓ Aggregates match inventory_v2")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
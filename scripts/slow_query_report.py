@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Slow Query Report
+Summarizes the slow-query log written when QUERY_PROFILER = True
+([LOGGING] in config.ini): statements ranked by total time across the log
+and its rotated backups, from every process that wrote to it.
+
+Run from the root directory:
+    python scripts/slow_query_report.py
+    python scripts/slow_query_report.py --log slow_queries.log --top 10
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+import configparser
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def default_log():
+    config = configparser.ConfigParser()
+    config.read(os.path.join(BASE_DIR, "config.ini"))
+    return os.path.join(BASE_DIR, config.get('LOGGING', 'SLOW_QUERY_LOG', fallback='slow_queries.log'))
+
+
+def read_entries(path):
+    """Slow-query entries from path and its rotated backups (path.1, path.2, ...)"""
+    for name in sorted(glob.glob(glob.escape(path) + ".*"), reverse=True) + [path]:
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding='utf-8') as f:
+            for line in f:
+                # Exit-time summaries are plain text between the JSON lines
+                if line.startswith("{"):
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank slow-query log entries by total time")
+    parser.add_argument('--log', default=default_log())
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    totals = {}
+    for entry in read_entries(args.log):
+        stats = totals.setdefault(entry['sql'], {'count': 0, 'ms': 0.0, 'max_ms': 0.0, 'rows': 0, 'params': set()})
+        stats['count'] += 1
+        stats['ms'] += entry['ms']
+        stats['max_ms'] = max(stats['max_ms'], entry['ms'])
+        stats['rows'] += entry.get('rows', 0)
+        stats['params'].add(entry.get('params', ''))
+
+    if not totals:
+        print(f"✗ No slow queries in {args.log} (is QUERY_PROFILER = True in config.ini?)")
+        return 1
+
+    ranked = sorted(totals.items(), key=lambda item: -item[1]['ms'])[:args.top]
+    print(f"Slow queries in {args.log}: {sum(s['count'] for s in totals.values())} entries, "
+          f"{len(totals)} distinct statements\n")
+    print(f"  {'total ms':>10} {'count':>6} {'avg ms':>8} {'max ms':>8} {'rows':>9}  sql")
+    for sql, stats in ranked:
+        print(f"  {stats['ms']:>10.1f} {stats['count']:>6} {stats['ms'] / stats['count']:>8.2f} "
+              f"{stats['max_ms']:>8.2f} {stats['rows']:>9}  {sql}")
+        print(f"  {'':>47}params: {', '.join(sorted(stats['params']))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
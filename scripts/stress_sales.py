@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Concurrent Sales Stress Test
+Fires thousands of parallel sales at a handful of products with less stock
+than is being bought, once with the old read-check-write sequence and once
+with the conditional UPDATE ... RETURNING used by record_sale/confirm_sale.
+Reports oversold units (sales recorded beyond the stock removed) and
+throughput. Exits non-zero if the current sale path oversells.
+
+Run from the root directory:
+    python scripts/stress_sales.py --sales 5000 --threads 16
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+
+# Add parent directory to path to import the shared utilities
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as inventory_app
+from utils import dataset
+from utils.db_pool import ConnectionPool, load_settings
+from utils.sales import SaleError, sell
+
+
+def legacy_sale(conn, product_id, quantity):
+    """The previous record_sale: SELECT, check in Python, then write the new quantity"""
+    row = conn.execute("SELECT sku, name, quantity, price, category FROM inventory_v2 WHERE id=?", (product_id,)).fetchone()
+    if row is None:
+        raise SaleError("Product not found")
+    sku, name, current_qty, price, category = row
+    if quantity > current_qty:
+        raise SaleError("Not enough stock")
+    new_qty = current_qty - quantity
+    conn.execute("UPDATE inventory_v2 SET quantity=? WHERE id=?", (new_qty, product_id))
+    conn.execute(
+        "INSERT INTO sales (product_id, sku, name, quantity, price, sale_date) VALUES (?, ?, ?, ?, ?, ?)",
+        (product_id, sku, name, quantity, price, datetime.now().isoformat())
+    )
+    conn.commit()
+    return new_qty
+
+
+def current_sale(conn, product_id, quantity):
+    """record_sale as served by app.py: sell() under the pool's write lock"""
+    with inventory_app.db_pool.write_lock:
+        return sell(conn, product_id, quantity)
+
+
+def seed(path, products, stock):
+    inventory_app.DB_PATH = path
+    inventory_app.db_pool = ConnectionPool(path, load_settings(inventory_app.config))
+    inventory_app.init_db()
+    conn = sqlite3.connect(path)
+    dataset.generate(conn, products, seed=products, stock=stock)
+    conn.close()
+    return inventory_app.db_pool
+
+
+def run(sale_fn, path, args):
+    pool = seed(path, args.products, args.stock)
+    per_thread = args.sales // args.threads
+    outcomes = {'sold': 0, 'rejected': 0, 'errors': 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+
+    def worker(seed_value):
+        rnd = random.Random(seed_value)
+        conn = pool.acquire()
+        local = {'sold': 0, 'rejected': 0, 'errors': 0}
+        barrier.wait()
+        for _ in range(per_thread):
+            try:
+                sale_fn(conn, rnd.randint(1, args.products), rnd.randint(1, 3))
+                local['sold'] += 1
+            except SaleError:
+                local['rejected'] += 1
+            except sqlite3.OperationalError:
+                conn.rollback()
+                local['errors'] += 1
+        pool.release()
+        with lock:
+            for key, value in local.items():
+                outcomes[key] += value
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    pool.close_all()
+
+    conn = sqlite3.connect(path)
+    removed = args.products * args.stock - conn.execute("SELECT SUM(quantity) FROM inventory_v2").fetchone()[0]
+    recorded = conn.execute("SELECT COALESCE(SUM(quantity), 0) FROM sales").fetchone()[0]
+    negative = conn.execute("SELECT COUNT(*) FROM inventory_v2 WHERE quantity < 0").fetchone()[0]
+    conn.close()
+    outcomes.update(
+        per_sec=per_thread * args.threads / elapsed,
+        oversold=recorded - removed,
+        negative=negative,
+    )
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress concurrent sales for oversell and throughput")
+    parser.add_argument('--sales', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--products', type=int, default=20)
+    parser.add_argument('--stock', type=int, default=100, help="Starting quantity per product")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = run(legacy_sale, os.path.join(tmp, 'legacy.db'), args)
+        current = run(current_sale, os.path.join(tmp, 'current.db'), args)
+
+    print(f"Sales: {args.sales}  Threads: {args.threads}  Products: {args.products} x {args.stock} units")
+    for label, r in (("Read-check-write", legacy), ("Conditional UPDATE", current)):
+        print(f"  {label:<20}: {r['per_sec']:8.1f} sales/s  sold {r['sold']:>5}  rejected {r['rejected']:>5}  "
+              f"lock errors {r['errors']:>4}  oversold units {r['oversold']:>4}  negative rows {r['negative']}")
+
+    if current['oversold'] or current['negative']:
+        print("✗ Conditional UPDATE oversold")
+        return 1
+    print("✓ No oversell with the conditional UPDATE")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
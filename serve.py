@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+CHRIS EFFECT - Production Web Server
+Serves the Flask app from app.py with Waitress instead of the Werkzeug
+development server. Threads, worker processes, host, port, keep-alive and
+queue depth come from the [SERVER] section of config.ini.
+
+Run from the root directory:
+    python serve.py
+    python serve.py --port 8080 --workers 4
+"""
+
+import os
+import sys
+import time
+import signal
+import socket
+import _thread
+import argparse
+import threading
+
+# Add the current directory to path to allow imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as inventory_app
+
+try:
+    from waitress import create_server
+except ImportError:
+    create_server = None
+
+
+def load_server_settings(config, section="SERVER"):
+    """[SERVER] options with production defaults"""
+    return {
+        'host': config.get(section, 'HOST', fallback='127.0.0.1'),
+        'port': config.getint(section, 'PORT', fallback=5000),
+        'threads': config.getint(section, 'THREADS', fallback=8),
+        'workers': config.getint(section, 'WORKERS', fallback=1),
+        'backlog': config.getint(section, 'BACKLOG', fallback=1024),
+        'connection_limit': config.getint(section, 'CONNECTION_LIMIT', fallback=1000),
+        'keep_alive': config.getint(section, 'KEEP_ALIVE_TIMEOUT', fallback=120),
+        'shutdown_timeout': config.getint(section, 'SHUTDOWN_TIMEOUT', fallback=10),
+    }
+
+
+# Time the event loop gets to send the last responses once the request threads have finished
+FLUSH_GRACE = 0.5
+
+
+def run_worker(settings, sock=None):
+    """Serve until SIGTERM/SIGINT, then drain for up to shutdown_timeout seconds
+
+    Only Waitress's public server.run(), task_dispatcher.shutdown() and
+    close() are used: the event loop keeps running (and sending responses)
+    while the request threads finish, then the loop is stopped.
+    """
+    options = dict(
+        threads=settings['threads'],
+        backlog=settings['backlog'],
+        connection_limit=settings['connection_limit'],
+        channel_timeout=settings['keep_alive'],
+        ident='ChrisEffect',
+    )
+    if sock is not None:
+        options['sockets'] = [sock]
+    else:
+        options.update(host=settings['host'], port=settings['port'])
+    server = create_server(inventory_app.app, **options)
+    stopping, drained = threading.Event(), threading.Event()
+
+    def drain():
+        stopping.wait()
+        server.task_dispatcher.shutdown(timeout=settings['shutdown_timeout'])
+        time.sleep(FLUSH_GRACE)
+        drained.set()
+        # Runs the signal handler below on the main thread, which stops server.run()
+        _thread.interrupt_main()
+
+    def on_signal(signum, frame):
+        if drained.is_set():
+            raise KeyboardInterrupt
+        # A second signal (e.g. Ctrl+C reaching a worker and its parent) must not cut the drain short
+        stopping.set()
+
+    threading.Thread(target=drain, name="drain", daemon=True).start()
+    signal.signal(signal.SIGTERM, on_signal)
+    signal.signal(signal.SIGINT, on_signal)
+    try:
+        server.run()
+    finally:
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        server.close()
+        inventory_app.db_pool.close_all()
+
+
+def run_workers(settings):
+    """Fork settings['workers'] processes that accept on one shared listening socket"""
+    sock = socket.create_server((settings['host'], settings['port']), backlog=settings['backlog'])
+    # No pooled connection may cross the fork; each worker opens its own
+    inventory_app.db_pool.close_all()
+
+    children = []
+    for _ in range(settings['workers']):
+        pid = os.fork()
+        if pid == 0:
+            use_database(inventory_app.DB_PATH)
+            try:
+                run_worker(settings, sock)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    sock.close()
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for pid in children:
+        while True:
+            try:
+                os.waitpid(pid, 0)
+                break
+            except InterruptedError:
+                continue
+            except ChildProcessError:
+                break
+
+
+def use_database(path):
+    """Point the app at another database file"""
+    inventory_app.db_pool.close_all()
+    inventory_app.DB_PATH = path
+    inventory_app.db_pool = inventory_app.open_pool(path)
+
+
+def main():
+    settings = load_server_settings(inventory_app.config)
+    parser = argparse.ArgumentParser(description="Serve the inventory web app with Waitress")
+    parser.add_argument('--host', default=settings['host'])
+    parser.add_argument('--port', type=int, default=settings['port'])
+    parser.add_argument('--threads', type=int, default=settings['threads'])
+    parser.add_argument('--workers', type=int, default=settings['workers'],
+                        help="Worker processes (POSIX only; one process elsewhere)")
+    parser.add_argument('--db', help="Database file (default: store_inventory.db)")
+    args = parser.parse_args()
+    settings.update(host=args.host, port=args.port, threads=args.threads, workers=max(1, args.workers))
+    if args.db:
+        use_database(args.db)
+
+    if create_server is None:
+        print("❌ Waitress is not installed. Run: pip install -r requirements.txt")
+        return 1
+
+    inventory_app.startup()
+    if settings['workers'] > 1 and not hasattr(os, 'fork'):
+        print("Worker processes need fork(); running a single process")
+        settings['workers'] = 1
+
+    print(f"Serving on http://{settings['host']}:{settings['port']}/ "
+          f"({settings['workers']} process(es) x {settings['threads']} threads)")
+    if settings['workers'] > 1:
+        run_workers(settings)
+    else:
+        run_worker(settings)
+    print("Server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
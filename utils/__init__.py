@@ -0,0 +1,3 @@
+"""
+CHRIS EFFECT - Shared utilities used by the Flask app, the desktop app and scripts
+"""
@@ -0,0 +1,156 @@
+"""
+CHRIS EFFECT - Dashboard aggregates
+inventory_stats (one row) and category_stats are kept current by triggers
+on inventory_v2, so dashboard totals are a single-row read instead of
+full-table scans.
+"""
+
+STAT_COLUMNS = ("product_count", "total_quantity", "total_value", "low_stock_count", "out_of_stock_count")
+
+# total_value is a running REAL sum, so allow for float drift when verifying
+VALUE_TOLERANCE = 0.01
+VALUE_RELATIVE_TOLERANCE = 1e-9
+
+_ADD_NEW = """
+    UPDATE inventory_stats SET
+        product_count = product_count + 1,
+        total_quantity = total_quantity + new.quantity,
+        total_value = total_value + new.quantity * new.price,
+        low_stock_count = low_stock_count + (new.status IS 'Low Stock'),
+        out_of_stock_count = out_of_stock_count + (new.status IS 'Out of Stock')
+    WHERE id = 1;
+    INSERT INTO category_stats (category, product_count, quantity)
+    VALUES (IFNULL(new.category, ''), 1, new.quantity)
+    ON CONFLICT(category) DO UPDATE SET
+        product_count = product_count + 1,
+        quantity = quantity + excluded.quantity;
+"""
+
+_REMOVE_OLD = """
+    UPDATE inventory_stats SET
+        product_count = product_count - 1,
+        total_quantity = total_quantity - old.quantity,
+        total_value = total_value - old.quantity * old.price,
+        low_stock_count = low_stock_count - (old.status IS 'Low Stock'),
+        out_of_stock_count = out_of_stock_count - (old.status IS 'Out of Stock')
+    WHERE id = 1;
+    UPDATE category_stats SET
+        product_count = product_count - 1,
+        quantity = quantity - old.quantity
+    WHERE category = IFNULL(old.category, '');
+    DELETE FROM category_stats WHERE category = IFNULL(old.category, '') AND product_count <= 0;
+"""
+
+
+def ensure_schema(conn):
+    """Create the aggregate tables and triggers, building them from scratch the first time"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='inventory_stats'"
+    ).fetchone()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS inventory_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            product_count INTEGER NOT NULL DEFAULT 0,
+            total_quantity INTEGER NOT NULL DEFAULT 0,
+            total_value REAL NOT NULL DEFAULT 0,
+            low_stock_count INTEGER NOT NULL DEFAULT 0,
+            out_of_stock_count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS category_stats (
+            category TEXT PRIMARY KEY,
+            product_count INTEGER NOT NULL DEFAULT 0,
+            quantity INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS inventory_stats_ai AFTER INSERT ON inventory_v2 BEGIN
+            {_ADD_NEW}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS inventory_stats_ad AFTER DELETE ON inventory_v2 BEGIN
+            {_REMOVE_OLD}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS inventory_stats_au
+        AFTER UPDATE OF quantity, price, status, category ON inventory_v2 BEGIN
+            {_REMOVE_OLD}
+            {_ADD_NEW}
+        END
+    """)
+    if not exists:
+        rebuild(conn)
+
+
+def _computed(conn):
+    """Aggregates recomputed directly from inventory_v2 (full scan)"""
+    totals = conn.execute("""
+        SELECT COUNT(*),
+               COALESCE(SUM(quantity), 0),
+               COALESCE(SUM(quantity * price), 0),
+               COALESCE(SUM(status IS 'Low Stock'), 0),
+               COALESCE(SUM(status IS 'Out of Stock'), 0)
+        FROM inventory_v2
+    """).fetchone()
+    categories = conn.execute("""
+        SELECT IFNULL(category, ''), COUNT(*), SUM(quantity)
+        FROM inventory_v2
+        GROUP BY IFNULL(category, '')
+    """).fetchall()
+    return tuple(totals), {row[0]: (row[1], row[2]) for row in categories}
+
+
+def rebuild(conn):
+    """Recompute both aggregate tables from inventory_v2"""
+    totals, categories = _computed(conn)
+    conn.execute("DELETE FROM inventory_stats")
+    conn.execute(
+        f"INSERT INTO inventory_stats (id, {', '.join(STAT_COLUMNS)}) VALUES (1, ?, ?, ?, ?, ?)", totals
+    )
+    conn.execute("DELETE FROM category_stats")
+    conn.executemany(
+        "INSERT INTO category_stats (category, product_count, quantity) VALUES (?, ?, ?)",
+        [(cat, count, qty) for cat, (count, qty) in categories.items()]
+    )
+
+
+def verify(conn):
+    """Compare the stored aggregates with a fresh scan; returns a list of mismatch messages"""
+    totals, categories = _computed(conn)
+    stored = read_totals(conn)
+    problems = []
+    for name, expected in zip(STAT_COLUMNS, totals):
+        actual = stored[name]
+        if name == "total_value":
+            off = abs(actual - expected) > max(VALUE_TOLERANCE, abs(expected) * VALUE_RELATIVE_TOLERANCE)
+        else:
+            off = actual != expected
+        if off:
+            problems.append(f"{name}: stored {actual}, actual {expected}")
+    stored_cats = {
+        row[0]: (row[1], row[2])
+        for row in conn.execute("SELECT category, product_count, quantity FROM category_stats")
+    }
+    for cat in sorted(set(stored_cats) | set(categories)):
+        if stored_cats.get(cat) != categories.get(cat):
+            problems.append(f"category {cat or 'Uncategorized'!r}: stored {stored_cats.get(cat)}, actual {categories.get(cat)}")
+    return problems
+
+
+def read_totals(conn):
+    """The single inventory_stats row as a dict"""
+    row = conn.execute(f"SELECT {', '.join(STAT_COLUMNS)} FROM inventory_stats WHERE id = 1").fetchone()
+    if row is None:
+        return dict.fromkeys(STAT_COLUMNS, 0)
+    return dict(zip(STAT_COLUMNS, tuple(row)))
+
+
+def top_categories(conn, limit=5):
+    """[(category, quantity)] ordered by quantity, largest first"""
+    return [
+        (row[0] or 'Uncategorized', row[1])
+        for row in conn.execute("SELECT category, quantity FROM category_stats ORDER BY quantity DESC LIMIT ?", (limit,))
+    ]
@@ -0,0 +1,49 @@
+"""
+CHRIS EFFECT - Columnar JSON responses
+Opt-in compact format for large listings (?format=columnar): column names
+once, then each row as an array -
+{"columns": ["id", "sku", ...], "rows": [[1, "A-1", ...], ...]} - so rows
+go from the cursor to the encoder without a dict per row or repeated keys
+on the wire. Encoded with orjson when it is installed, else the json
+module.
+"""
+
+import json
+import sqlite3
+
+from flask import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FORMAT_ARG = "format"
+COLUMNAR = "columnar"
+
+
+def requested(args):
+    """True if the query string asks for ?format=columnar"""
+    return args.get(FORMAT_ARG, "").lower() == COLUMNAR
+
+
+def table(columns, rows):
+    """{"columns": [...], "rows": rows}; rows may be tuples or sqlite3.Rows"""
+    return {"columns": list(columns), "rows": rows}
+
+
+def _encode_row(value):
+    if isinstance(value, sqlite3.Row):
+        return tuple(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload):
+    """payload as compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_encode_row)
+    return json.dumps(payload, default=_encode_row, separators=(",", ":")).encode("utf-8")
+
+
+def response(payload, status=200):
+    return Response(dumps(payload), status=status, mimetype="application/json")
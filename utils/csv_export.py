@@ -0,0 +1,46 @@
+"""
+CHRIS EFFECT - Streaming CSV export
+Writes inventory rows through csv.writer in fixed-size chunks so memory
+stays flat regardless of table size.
+"""
+
+import io
+import csv
+
+EXPORT_COLUMNS = ("id", "sku", "name", "category", "quantity", "price", "status", "image")
+DEFAULT_FETCH_SIZE = 1000
+
+
+def parse_columns(spec):
+    """Turn a "sku,name,quantity" spec into a validated column tuple"""
+    if not spec:
+        return EXPORT_COLUMNS
+    columns = tuple(c.strip().lower() for c in spec.split(",") if c.strip())
+    unknown = [c for c in columns if c not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export column(s): {', '.join(unknown)}")
+    return columns or EXPORT_COLUMNS
+
+
+def iter_inventory_csv(conn, columns=EXPORT_COLUMNS, fetch_size=DEFAULT_FETCH_SIZE):
+    """Yield the inventory as CSV text, one chunk per fetchmany() batch"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+
+    # Column names are validated against EXPORT_COLUMNS, never taken raw from input
+    cursor = conn.execute(f"SELECT {', '.join(columns)} FROM inventory_v2 ORDER BY id")
+    try:
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            writer.writerows(tuple(r) for r in rows)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+    finally:
+        cursor.close()
+    tail = buf.getvalue()
+    if tail:
+        yield tail
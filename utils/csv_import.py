@@ -0,0 +1,112 @@
+"""
+CHRIS EFFECT - Streaming CSV import
+Decodes an upload incrementally, validates rows into batches and writes
+each batch in its own short transaction so the write lock is released
+between batches. Rows are split into UPDATEs and INSERTs by SKU rather than
+INSERT ... ON CONFLICT(sku), which needs a UNIQUE index on sku that older
+databases may not have yet.
+"""
+
+import io
+import csv
+from itertools import islice
+
+DEFAULT_BATCH_SIZE = 5000
+
+# SQLite's default host parameter limit is 999 on older builds
+_LOOKUP_CHUNK = 900
+
+UPDATE_SQL = """
+    UPDATE inventory_v2
+    SET name=?, category=?, quantity=?, price=?, status=?
+    WHERE sku=?
+"""
+
+INSERT_SQL = """
+    INSERT INTO inventory_v2 (sku, name, category, quantity, price, status)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def iter_csv_upload(stream, encoding='utf-8-sig'):
+    """Yield dict rows from a binary stream without reading it into memory"""
+    text = io.TextIOWrapper(stream, encoding=encoding, newline='')
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        # Don't let the wrapper close the caller's stream
+        text.detach()
+
+
+def parse_row(row):
+    """Validate one CSV row, returning (sku, name, category, qty, price) or None"""
+    name = (row.get('name') or '').strip()
+    sku = (row.get('sku') or '').strip()
+    category = (row.get('category') or 'Uncategorized').strip() or 'Uncategorized'
+    try:
+        qty = int(row.get('quantity') or 0)
+        price = float(row.get('price') or 0)
+    except (TypeError, ValueError):
+        return None
+    if not name or qty < 0 or price < 0:
+        return None
+    return sku, name, category, qty, price
+
+
+def _existing_skus(conn, skus):
+    found = set()
+    skus = list(skus)
+    for start in range(0, len(skus), _LOOKUP_CHUNK):
+        chunk = skus[start:start + _LOOKUP_CHUNK]
+        marks = ','.join('?' * len(chunk))
+        found.update(r[0] for r in conn.execute(f"SELECT sku FROM inventory_v2 WHERE sku IN ({marks})", chunk))
+    return found
+
+
+def import_rows(conn, rows, status_for, batch_size=DEFAULT_BATCH_SIZE):
+    """Insert or update validated rows in batches of batch_size, one transaction per batch
+
+    status_for(quantity, category) computes the stored status column.
+    Returns the same imported/updated/skipped/invalid counts as the old importer.
+    """
+    counts = {'imported': 0, 'updated': 0, 'skipped': 0, 'invalid': 0}
+    batch_size = max(1, int(batch_size))
+    rows = iter(rows)
+
+    while True:
+        raw_batch = list(islice(rows, batch_size))
+        if not raw_batch:
+            break
+
+        keyed, inserts = [], []
+        for raw in raw_batch:
+            parsed = parse_row(raw)
+            if parsed is None:
+                counts['invalid'] += 1
+                continue
+            sku, name, category, qty, price = parsed
+            values = (sku or None, name, category, qty, price, status_for(qty, category))
+            (keyed if sku else inserts).append(values)
+
+        # Take the write lock up front so the SKU lookup and the writes see the same rows
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            # Rows with a SKU already in the table (or earlier in this batch) are updates
+            existing = _existing_skus(conn, {v[0] for v in keyed})
+            updates = []
+            for values in keyed:
+                if values[0] in existing:
+                    updates.append(values[1:] + values[:1])
+                else:
+                    inserts.append(values)
+                    existing.add(values[0])
+            counts['updated'] += len(updates)
+            counts['imported'] += len(inserts)
+
+            # Inserts first: a SKU new to the table is inserted by its first row in the batch
+            if inserts:
+                conn.executemany(INSERT_SQL, inserts)
+            if updates:
+                conn.executemany(UPDATE_SQL, updates)
+
+    return counts
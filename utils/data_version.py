@@ -0,0 +1,109 @@
+"""
+CHRIS EFFECT - Data version counter
+A single number in change_counters ('data') that triggers bump on every
+write to inventory_v2 or sales, from any process. Read endpoints use it
+as their ETag so unchanged data is answered with 304.
+
+inventory_changes is a row-level feed next to it: one entry per inserted,
+updated or deleted product with a bitmask of the columns an update
+touched, so a view can patch just those rows. Triggers keep only the
+newest CHANGE_LOG_SIZE entries.
+"""
+
+COUNTER = "data"
+WATCHED_TABLES = ("inventory_v2", "sales")
+
+CHANGE_LOG_SIZE = 10000
+# Bit i of an update's columns mask = CHANGE_COLUMNS[i] changed
+CHANGE_COLUMNS = ("sku", "name", "category", "quantity", "price", "status", "image")
+
+
+def ensure_schema(conn):
+    """Create the counter row and the triggers that bump it"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS change_counters (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO change_counters (name, version) VALUES (?, 0)", (COUNTER,))
+
+    bump = f"UPDATE change_counters SET version = version + 1 WHERE name = '{COUNTER}';"
+    for table in WATCHED_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_data_version
+                AFTER {event} ON {table} BEGIN {bump} END
+            """)
+
+
+def current(conn):
+    """The current data version (primary-key lookup, no table scan)"""
+    row = conn.execute("SELECT version FROM change_counters WHERE name = ?", (COUNTER,)).fetchone()
+    return row[0] if row else 0
+
+
+def etag(version):
+    return f"data-{version}"
+
+
+def ensure_change_log(conn):
+    """Create inventory_changes and the triggers that append to it"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS inventory_changes (
+            seq INTEGER PRIMARY KEY,
+            product_id INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            columns INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    mask = " | ".join(f"((NEW.{c} IS NOT OLD.{c}) << {bit})" for bit, c in enumerate(CHANGE_COLUMNS))
+    prune = f"""
+        DELETE FROM inventory_changes
+        WHERE seq <= (SELECT MAX(seq) FROM inventory_changes) - {CHANGE_LOG_SIZE};
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS inventory_v2_insert_change_log
+        AFTER INSERT ON inventory_v2 BEGIN
+            INSERT INTO inventory_changes (product_id, op) VALUES (NEW.id, 'I');
+            {prune}
+        END
+    """)
+    # Updates that leave every column as it was (e.g. status recomputes) aren't logged
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS inventory_v2_update_change_log
+        AFTER UPDATE ON inventory_v2 WHEN ({mask}) != 0 BEGIN
+            INSERT INTO inventory_changes (product_id, op, columns) VALUES (NEW.id, 'U', {mask});
+            {prune}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS inventory_v2_delete_change_log
+        AFTER DELETE ON inventory_v2 BEGIN
+            INSERT INTO inventory_changes (product_id, op) VALUES (OLD.id, 'D');
+            {prune}
+        END
+    """)
+
+
+def change_log_head(conn):
+    """seq of the newest inventory change (0 before the first)"""
+    return conn.execute("SELECT IFNULL(MAX(seq), 0) FROM inventory_changes").fetchone()[0]
+
+
+def changes_since(conn, seq):
+    """[(seq, product_id, op, columns)] newer than seq, oldest first
+
+    None if entries after seq were already pruned; reload everything then.
+    """
+    oldest = conn.execute("SELECT MIN(seq) FROM inventory_changes").fetchone()[0]
+    if oldest is not None and seq < oldest - 1:
+        return None
+    return conn.execute(
+        "SELECT seq, product_id, op, columns FROM inventory_changes WHERE seq > ? ORDER BY seq", (seq,)
+    ).fetchall()
+
+
+def columns_mask(columns):
+    """Bitmask of CHANGE_COLUMNS for the given column names (others ignored)"""
+    return sum(1 << CHANGE_COLUMNS.index(c) for c in columns if c in CHANGE_COLUMNS)
@@ -0,0 +1,257 @@
+"""
+CHRIS EFFECT - Synthetic datasets
+Builds deterministic, production-sized catalogs for benchmarks: products
+with skewed categories, lognormal prices and realistic SKUs and names,
+sales spread over a date range with weekly and yearly seasonality, low
+stock thresholds and placeholder images. Rows go in with executemany in
+large transactions while triggers and secondary indexes are set aside;
+derived state (search index, aggregates, data version) is rebuilt once at
+the end, so the result is what the app would have built row by row.
+"""
+
+import os
+import math
+import zlib
+import random
+import struct
+from itertools import accumulate
+from datetime import date, timedelta
+
+from utils import aggregates, data_version, search_index, thresholds
+from utils.migrations import migrate
+
+BATCH_SIZE = 50000
+
+CATEGORIES = {
+    # name: (median price, nouns)
+    "Electronics": (89.0, ("Headphones", "Charger", "Webcam", "Speaker", "Monitor", "Keyboard", "Mouse", "Router")),
+    "Accessories": (24.0, ("Cable", "Case", "Stand", "Adapter", "Organizer", "Mount", "Sleeve", "Strap")),
+    "Furniture": (240.0, ("Desk", "Chair", "Shelf", "Cabinet", "Lamp", "Table", "Stool", "Drawer")),
+    "Clothing": (35.0, ("Jacket", "Shirt", "Hoodie", "Jeans", "Sneakers", "Cap", "Scarf", "Socks")),
+    "Food": (6.5, ("Coffee", "Tea", "Granola", "Pasta", "Olive Oil", "Honey", "Chocolate", "Snack Bar")),
+    "Toys": (19.0, ("Puzzle", "Robot", "Blocks", "Doll", "Kite", "Board Game", "Car", "Plush")),
+    "Books": (15.0, ("Notebook", "Cookbook", "Novel", "Atlas", "Planner", "Guide", "Journal", "Comic")),
+    "Garden": (29.0, ("Hose", "Planter", "Shears", "Seeds", "Rake", "Sprinkler", "Gloves", "Trowel")),
+    "Sports": (42.0, ("Ball", "Racket", "Yoga Mat", "Dumbbell", "Bottle", "Helmet", "Gloves", "Rope")),
+    "Beauty": (14.0, ("Serum", "Cream", "Shampoo", "Brush", "Lotion", "Balm", "Cleanser", "Mask")),
+    "Office": (11.0, ("Stapler", "Pens", "Binder", "Labels", "Tape", "Folder", "Marker", "Clipboard")),
+    "Automotive": (37.0, ("Wiper", "Floor Mat", "Charger", "Cover", "Polish", "Jump Starter", "Gauge", "Light")),
+}
+BRANDS = ("Acme", "Nova", "Orbit", "Summit", "Vertex", "Lumen", "Apex", "Harbor", "Pioneer", "Zenith",
+          "Cobalt", "Everest", "Kinetic", "Maple", "Quartz", "Atlas")
+ADJECTIVES = ("Classic", "Pro", "Ultra", "Compact", "Deluxe", "Eco", "Smart", "Premium", "Mini", "Max",
+              "Wireless", "Portable", "Heavy Duty", "Lite", "Essential", "Signature")
+GENERIC_NOUNS = ("Item", "Kit", "Set", "Pack", "Bundle", "Refill", "Part", "Tool")
+
+# Relative sales by hour of day (shops open 8:00-21:00)
+HOUR_WEIGHTS = (0, 0, 0, 0, 0, 0, 0, 0, 4, 6, 8, 9, 11, 10, 9, 9, 10, 11, 12, 10, 7, 4, 0, 0)
+SALE_QUANTITIES = ((1, 2, 3, 4, 5), (70, 18, 7, 3, 2))
+
+
+def category_names(count):
+    """The first count category names; generic ones past the built-in list"""
+    names = list(CATEGORIES)[:count]
+    names.extend(f"Category {i + 1}" for i in range(len(names), count))
+    return names
+
+
+def zipf_weights(count, skew):
+    """Weight of rank i is 1 / i**skew; skew 0 is uniform"""
+    return [1 / (rank ** skew) for rank in range(1, count + 1)]
+
+
+def _sku_prefix(category):
+    letters = "".join(ch for ch in category.upper() if ch.isalpha())
+    return (letters[:3] or "GEN").ljust(3, "X")
+
+
+def _price(rnd, median):
+    # Long right tail; most prices end in .99
+    price = rnd.lognormvariate(math.log(median), 0.8)
+    return round(max(1.0, round(price)) - 0.01, 2)
+
+
+def _quantity(rnd, stock):
+    if stock is not None:
+        return stock
+    roll = rnd.random()
+    if roll < 0.04:
+        return 0
+    if roll < 0.15:
+        return rnd.randint(1, 15)
+    return int(rnd.lognormvariate(4.0, 1.0)) + 1
+
+
+def _png(width, height, rgb):
+    """A solid-colour PNG, built with zlib so Pillow isn't needed"""
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+    rows = b"".join(b"\x00" + bytes(rgb) * width for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+def write_images(image_dir, count, rnd):
+    """Write count placeholder images into the app's images folder; returns their stored paths"""
+    os.makedirs(image_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        name = f"synthetic_{i:03d}.png"
+        with open(os.path.join(image_dir, name), "wb") as f:
+            f.write(_png(64, 64, (rnd.randrange(256), rnd.randrange(256), rnd.randrange(256))))
+        # Same form as uploads: relative to the app directory
+        paths.append(f"images/{name}")
+    return paths
+
+
+def _set_aside(conn, tables):
+    """Drop triggers and secondary indexes on tables; returns the SQL to recreate them"""
+    placeholders = ", ".join("?" * len(tables))
+    objects = conn.execute(f"""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE type IN ('trigger', 'index') AND tbl_name IN ({placeholders}) AND sql IS NOT NULL
+    """, tables).fetchall()
+    for kind, name, _ in objects:
+        conn.execute(f"DROP {kind.upper()} {name}")
+    # Indexes first, so triggers come back onto a fully indexed table
+    return [sql for kind, _, sql in sorted(objects, key=lambda obj: obj[0] != "index")]
+
+
+def _insert_products(conn, rnd, count, categories, category_skew, image_paths, image_share, stock, resolver):
+    cum_weights = list(accumulate(zipf_weights(len(categories), category_skew)))
+    prefixes = {category: _sku_prefix(category) for category in categories}
+    sql = """
+        INSERT INTO inventory_v2 (id, sku, name, category, quantity, price, status, image)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    for start in range(0, count, BATCH_SIZE):
+        size = min(BATCH_SIZE, count - start)
+        rows = []
+        for offset, category in enumerate(rnd.choices(categories, cum_weights=cum_weights, k=size)):
+            product_id = start + offset + 1
+            median, nouns = CATEGORIES.get(category, (20.0, GENERIC_NOUNS))
+            name = f"{rnd.choice(BRANDS)} {rnd.choice(ADJECTIVES)} {rnd.choice(nouns)}"
+            if rnd.random() < 0.5:
+                name += f" {rnd.choice('ABCDEFGHJKLMNPRSTVX')}{rnd.randint(1, 999)}"
+            quantity = _quantity(rnd, stock)
+            image = rnd.choice(image_paths) if image_paths and rnd.random() < image_share else None
+            rows.append((
+                product_id, f"{prefixes[category]}-{product_id:07d}", name, category,
+                quantity, _price(rnd, median), resolver.status(quantity, category), image,
+            ))
+        with conn:
+            conn.executemany(sql, rows)
+
+
+def day_weights(start, end, rnd):
+    """[(day, weight)] for start..end: weekends busier, a December peak and a late-summer dip"""
+    days = []
+    day = start
+    while day <= end:
+        weekly = 1.35 if day.weekday() >= 5 else 1.0
+        # Peaks around day 350 (mid-December), lowest around day 167
+        yearly = 1.0 + 0.4 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 350) / 365.25)
+        days.append((day, weekly * yearly * rnd.uniform(0.85, 1.15)))
+        day += timedelta(days=1)
+    return days
+
+
+def _insert_sales(conn, rnd, count, products, start, end):
+    days = day_weights(start, end, rnd)
+    total = sum(weight for _, weight in days)
+    # Popularity follows a power law over a shuffled product order
+    popular = list(range(1, products + 1))
+    rnd.shuffle(popular)
+    hours = range(24)
+    # Copies sku, name and price from the product as the app does when it records a sale
+    sql = """
+        INSERT INTO sales (product_id, sku, name, quantity, price, sale_date)
+        SELECT id, sku, name, ?, price, ? FROM inventory_v2 WHERE id = ?
+    """
+    rows, allocated, running = [], 0, 0.0
+    for day, weight in days:
+        # Apportion so the per-day counts add up to exactly count
+        running += weight
+        day_count = round(count * running / total) - allocated
+        allocated += day_count
+        if not day_count:
+            continue
+        stamp = day.isoformat()
+        quantities = rnd.choices(SALE_QUANTITIES[0], weights=SALE_QUANTITIES[1], k=day_count)
+        micros = sorted(
+            hour * 3600000000 + int(rnd.random() * 3600000000)
+            for hour in rnd.choices(hours, weights=HOUR_WEIGHTS, k=day_count)
+        )
+        for quantity, us in zip(quantities, micros):
+            seconds, us = divmod(us, 1000000)
+            minutes, seconds = divmod(seconds, 60)
+            hour, minutes = divmod(minutes, 60)
+            product_id = popular[int(products * rnd.random() ** 3)]
+            rows.append((quantity, f"{stamp}T{hour:02d}:{minutes:02d}:{seconds:02d}.{us:06d}", product_id))
+        if len(rows) >= BATCH_SIZE:
+            with conn:
+                conn.executemany(sql, rows)
+            rows = []
+    if rows:
+        with conn:
+            conn.executemany(sql, rows)
+
+
+def generate(conn, products, sales=0, seed=0, categories=12, category_skew=1.0,
+             start=None, end=None, threshold_share=0.3, image_dir=None, images=0, image_share=0.4,
+             stock=None):
+    """Fill an empty database with a synthetic catalog and sales history
+
+    categories are Zipf-distributed with exponent category_skew (0 = even).
+    Sales fall between start and end (default: the year up to today). About
+    threshold_share of categories get their own low stock threshold. With
+    image_dir, images placeholder PNGs are written there and image_share of
+    products point at one. stock gives every product the same quantity
+    (for sales benchmarks that must not run out). Same seed, same data.
+    Returns the row counts written.
+    """
+    if products < 1:
+        raise ValueError("products must be at least 1")
+    migrate(conn)
+    for table in ("inventory_v2", "sales"):
+        if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+            raise ValueError(f"{table} already has rows; generate into an empty database")
+
+    rnd = random.Random(seed)
+    end = end or date.today()
+    start = start or end - timedelta(days=364)
+    if start > end:
+        raise ValueError("start must not be after end")
+    names = category_names(max(1, categories))
+
+    with conn:
+        conn.execute("DELETE FROM category_thresholds")
+        conn.executemany(
+            "INSERT INTO category_thresholds (category, threshold) VALUES (?, ?)",
+            [(name, rnd.randint(3, 30)) for name in names if rnd.random() < threshold_share]
+        )
+    resolver = thresholds.ThresholdResolver()
+    resolver.sync(conn)
+
+    image_paths = write_images(image_dir, images, rnd) if image_dir and images else []
+
+    # Durability doesn't matter for a fixture that can be regenerated
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    conn.execute("PRAGMA synchronous = OFF")
+    with conn:
+        restore = _set_aside(conn, ("inventory_v2", "sales"))
+    try:
+        _insert_products(conn, rnd, products, names, category_skew, image_paths, image_share, stock, resolver)
+        if sales:
+            _insert_sales(conn, rnd, sales, products, start, end)
+    finally:
+        with conn:
+            for sql in restore:
+                conn.execute(sql)
+        conn.execute(f"PRAGMA synchronous = {int(synchronous)}")
+
+    with conn:
+        search_index.rebuild(conn)
+        aggregates.rebuild(conn)
+        conn.execute("UPDATE change_counters SET version = version + 1 WHERE name = ?", (data_version.COUNTER,))
+    return {'products': products, 'sales': sales, 'categories': len(names), 'images': len(image_paths)}
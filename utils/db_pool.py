@@ -0,0 +1,122 @@
+"""
+CHRIS EFFECT - SQLite connection pool
+Keeps one long-lived, pre-tuned connection per worker thread so requests
+don't pay for connection setup and journal locking on every call.
+"""
+
+import sqlite3
+import threading
+
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+DEFAULT_SETTINGS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout_ms": 5000,
+    "cache_size_kb": 20000,
+    "mmap_size": 268435456,
+    "statement_cache": 256,
+    "max_idle": 16,
+}
+
+
+def load_settings(config, section="DATABASE"):
+    """Read connection tuning options from a ConfigParser section"""
+    settings = dict(DEFAULT_SETTINGS)
+    if config is None or not config.has_section(section):
+        return settings
+    for key, default in DEFAULT_SETTINGS.items():
+        if isinstance(default, int):
+            settings[key] = config.getint(section, key, fallback=default)
+        else:
+            settings[key] = config.get(section, key, fallback=default).strip()
+    return settings
+
+
+def connect(path, settings=None, row_factory=sqlite3.Row, factory=sqlite3.Connection):
+    """Open a connection (of class factory) and apply the journal, cache and mmap pragmas"""
+    settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+    journal_mode = settings["journal_mode"].upper()
+    synchronous = settings["synchronous"].upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Unsupported journal mode: {journal_mode}")
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"Unsupported synchronous mode: {synchronous}")
+
+    conn = sqlite3.connect(
+        path,
+        timeout=int(settings["busy_timeout_ms"]) / 1000.0,
+        check_same_thread=False,
+        cached_statements=int(settings["statement_cache"]),
+        factory=factory,
+    )
+    conn.row_factory = row_factory
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    conn.execute(f"PRAGMA busy_timeout={int(settings['busy_timeout_ms'])}")
+    # Negative cache_size is in KiB rather than pages
+    conn.execute(f"PRAGMA cache_size=-{int(settings['cache_size_kb'])}")
+    conn.execute(f"PRAGMA mmap_size={int(settings['mmap_size'])}")
+    return conn
+
+
+class ConnectionPool:
+    """Hands each worker thread its own connection and recycles it between requests"""
+
+    def __init__(self, path, settings=None, factory=sqlite3.Connection):
+        self.path = path
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.factory = factory
+        self._local = threading.local()
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+        # Hot write paths queue here instead of in SQLite's sleep-and-retry busy handler
+        self.write_lock = threading.Lock()
+
+    def acquire(self):
+        """Return the calling thread's connection, reusing an idle one if possible"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = connect(self.path, self.settings, factory=self.factory)
+        self._local.conn = conn
+        return conn
+
+    def release(self):
+        """Detach the calling thread's connection, rolling back anything left open"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Closed or broken connection: drop it instead of recycling it
+            self._discard(conn)
+            return
+        with self._lock:
+            if not self._closed and len(self._idle) < self.settings["max_idle"]:
+                self._idle.append(conn)
+                return
+        self._discard(conn)
+
+    def close_all(self):
+        """Close every idle connection and stop recycling released ones"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
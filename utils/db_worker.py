@@ -0,0 +1,122 @@
+"""
+CHRIS EFFECT - Background database worker
+One thread that owns a SQLite connection and runs jobs on it in order, so
+listings, searches, imports and exports stay off the Tk event loop.
+DBWorker.submit(job) calls job(conn) on that thread and returns a
+concurrent.futures.Future; TkDispatcher runs a callback with the result
+back on the Tk thread, polling finished futures with root.after.
+"""
+
+import sys
+import queue
+import threading
+from concurrent.futures import Future
+
+POLL_MS = 10
+
+
+class DBWorker:
+    """A thread with its own connection; jobs run one at a time in submission order"""
+
+    def __init__(self, connect, name="db-worker"):
+        self._connect = connect
+        self._jobs = queue.SimpleQueue()
+        self._ready = Future()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def connection(self):
+        """The worker's connection (waits until it is open); only use it inside jobs"""
+        return self._ready.result()
+
+    def submit(self, job, *args, **kwargs):
+        """Run job(conn, *args, **kwargs) on the worker; cancel() drops it if it hasn't started"""
+        future = Future()
+        self._jobs.put((future, job, args, kwargs))
+        return future
+
+    def call(self, job, *args, **kwargs):
+        """submit() and wait; for short jobs only, since the caller blocks"""
+        if threading.current_thread() is self._thread:
+            return job(self.connection(), *args, **kwargs)
+        return self.submit(job, *args, **kwargs).result()
+
+    def close(self, timeout=5.0):
+        """Finish queued jobs, then close the connection"""
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            conn = self._connect()
+        except BaseException as e:
+            self._ready.set_exception(e)
+            conn = None
+        else:
+            self._ready.set_result(conn)
+
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                break
+            future, job, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            if conn is None:
+                future.set_exception(self._ready.exception())
+                continue
+            try:
+                result = job(conn, *args, **kwargs)
+            except BaseException as e:
+                # Don't leave a half-written transaction open for the next job
+                if conn.in_transaction:
+                    conn.rollback()
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        if conn is not None:
+            conn.close()
+
+
+class TkDispatcher:
+    """Calls back on the Tk thread when futures finish; polls only while some are pending"""
+
+    def __init__(self, root, interval_ms=POLL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._done = queue.SimpleQueue()
+        self._pending = 0
+        self._polling = False
+
+    def when_done(self, future, on_result, on_error=None):
+        """on_result(result) or on_error(exception) on the Tk thread; nothing if cancelled"""
+        self._pending += 1
+        future.add_done_callback(lambda f: self._done.put((f, on_result, on_error)))
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.interval_ms, self._poll)
+        return future
+
+    def _poll(self):
+        while True:
+            try:
+                future, on_result, on_error = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if future.cancelled():
+                continue
+            try:
+                error = future.exception()
+                if error is None:
+                    on_result(future.result())
+                elif on_error is not None:
+                    on_error(error)
+                else:
+                    raise error
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
+        if self._pending > 0:
+            self.root.after(self.interval_ms, self._poll)
+        else:
+            self._polling = False
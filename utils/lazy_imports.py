@@ -0,0 +1,57 @@
+"""
+CHRIS EFFECT - Lazy optional imports
+The camera scanner (OpenCV, pyzbar) and image previews (Pillow) are
+optional and slow to import, so they load the first time a feature uses
+them rather than when the desktop app starts. available() only locates a
+package on disk and never imports it.
+"""
+
+import importlib
+import importlib.util
+import threading
+
+_modules = {}
+_lock = threading.Lock()
+
+
+def available(name):
+    """True if the top-level package of name is installed (without importing it)"""
+    try:
+        return importlib.util.find_spec(name.partition('.')[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def load(name):
+    """Import name on first use; None if it is missing or fails to import
+
+    The outcome is cached either way, so a broken install is only tried once.
+    """
+    with _lock:
+        if name not in _modules:
+            try:
+                _modules[name] = importlib.import_module(name)
+            except Exception:
+                # pyzbar, for one, is importable only when the zbar library is present
+                _modules[name] = None
+        return _modules[name]
+
+
+def load_pil():
+    """Pillow's (Image, ImageTk), or None without Pillow"""
+    image, image_tk = load('PIL.Image'), load('PIL.ImageTk')
+    if image is None or image_tk is None:
+        return None
+    return image, image_tk
+
+
+def load_scanner():
+    """(cv2, pyzbar.pyzbar) for camera scanning, or None if either is unusable"""
+    cv2, decoder = load('cv2'), load('pyzbar.pyzbar')
+    if cv2 is None or decoder is None:
+        return None
+    return cv2, decoder
+
+
+def scanner_available():
+    return available('cv2') and available('pyzbar')
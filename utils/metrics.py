@@ -0,0 +1,184 @@
+"""
+CHRIS EFFECT - Request metrics
+Per-route request counts, latency histograms, response bytes and SQL
+statement counts/time, rendered in the Prometheus text format for
+/api/metrics. SQL is timed by TimedConnection, a sqlite3.Connection
+subclass the pool opens instead of the plain one; statements and fetches
+add to a per-thread tally that the app resets at the start of each
+request.
+"""
+
+import bisect
+import sqlite3
+import threading
+import time
+
+# Upper bounds in seconds, as in Prometheus client defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_tally = threading.local()
+
+
+# --- SQL timing ---
+
+def reset_sql():
+    """Start a new statement tally for the calling thread"""
+    _tally.count = 0
+    _tally.seconds = 0.0
+
+
+def sql_totals():
+    """(statements, seconds) spent in SQLite by this thread since reset_sql()"""
+    return getattr(_tally, "count", 0), getattr(_tally, "seconds", 0.0)
+
+
+def _add(statements, seconds):
+    try:
+        _tally.count += statements
+        _tally.seconds += seconds
+    except AttributeError:
+        _tally.count, _tally.seconds = statements, seconds
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Counts statements and times execute and fetch calls (iterating a cursor is not timed)"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _add(1, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _add(1, time.perf_counter() - start)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            _add(0, time.perf_counter() - start)
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            _add(0, time.perf_counter() - start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            _add(0, time.perf_counter() - start)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors, including those behind conn.execute(), are TimedCursors"""
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or TimedCursor)
+
+    # sqlite3.Connection.execute() doesn't go through self.cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# --- Registry ---
+
+class _RouteStats:
+    __slots__ = ("statuses", "buckets", "seconds", "bytes", "sql_count", "sql_seconds")
+
+    def __init__(self, bucket_count):
+        self.statuses = {}
+        self.buckets = [0] * (bucket_count + 1)
+        self.seconds = 0.0
+        self.bytes = 0
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Thread-safe per-route counters; record() is a dict lookup and a few additions"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bucket_bounds = tuple(buckets)
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, method, status, seconds, response_bytes=0, sql_count=0, sql_seconds=0.0):
+        key = (route, method)
+        bucket = bisect.bisect_left(self.bucket_bounds, seconds)
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = _RouteStats(len(self.bucket_bounds))
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.buckets[bucket] += 1
+            stats.seconds += seconds
+            stats.bytes += response_bytes
+            stats.sql_count += sql_count
+            stats.sql_seconds += sql_seconds
+
+    def snapshot(self):
+        """{(route, method): copy of its stats}"""
+        with self._lock:
+            copies = {}
+            for key, stats in self._routes.items():
+                copy = _RouteStats(len(self.bucket_bounds))
+                copy.statuses = dict(stats.statuses)
+                copy.buckets = list(stats.buckets)
+                copy.seconds, copy.bytes = stats.seconds, stats.bytes
+                copy.sql_count, copy.sql_seconds = stats.sql_count, stats.sql_seconds
+                copies[key] = copy
+            return copies
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        routes = sorted(self.snapshot().items())
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("http_requests_total", "counter", "Requests handled, by route, method and status.")
+        for (route, method), stats in routes:
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f'http_requests_total{{route="{_label(route)}",method="{method}",status="{status}"}} {count}')
+
+        family("http_request_duration_seconds", "histogram", "Time from request start to response end.")
+        for (route, method), stats in routes:
+            labels = f'route="{_label(route)}",method="{method}"'
+            cumulative = 0
+            for bound, count in zip(self.bucket_bounds, stats.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            total = cumulative + stats.buckets[-1]
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {total}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.seconds:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {total}")
+
+        for name, attr, help_text, fmt in (
+            ("http_response_bytes_total", "bytes", "Response body bytes sent.", "{}"),
+            ("db_statements_total", "sql_count", "SQL statements executed while handling requests.", "{}"),
+            ("db_statement_seconds_total", "sql_seconds", "Time spent executing and fetching SQL.", "{:.6f}"),
+        ):
+            family(name, "counter", help_text)
+            for (route, method), stats in routes:
+                value = fmt.format(getattr(stats, attr))
+                lines.append(f'{name}{{route="{_label(route)}",method="{method}"}} {value}')
+        return "\n".join(lines) + "\n"
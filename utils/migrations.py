@@ -0,0 +1,143 @@
+"""
+CHRIS EFFECT - Schema migrations
+One ordered list of schema steps shared by app.py, CE.py and
+scripts/load_sample_data.py. PRAGMA user_version records the last step
+applied, so each step runs once per database. Add new steps at the end;
+don't edit a step once it has shipped.
+"""
+
+from utils import aggregates, data_version, pagination, search_index, thresholds
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+def _base_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password_hash TEXT,
+            role TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS inventory_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sku TEXT UNIQUE,
+            name TEXT NOT NULL,
+            category TEXT,
+            quantity INTEGER NOT NULL,
+            price REAL NOT NULL,
+            status TEXT DEFAULT 'In Stock',
+            image TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sales (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER,
+            sku TEXT,
+            name TEXT,
+            quantity INTEGER,
+            price REAL,
+            sale_date TEXT
+        )
+    """)
+
+
+def _hot_query_indexes(conn):
+    # Recent sales (dashboard, /api/sales) and per-product sales history
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_sale_date ON sales (sale_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_product_date ON sales (product_id, sale_date)")
+    # Status filters and the category list / grouping
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_inventory_status ON inventory_v2 (status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_inventory_category ON inventory_v2 (category)")
+
+
+def _has_unique_index(conn, table, column):
+    for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+        name, unique = index[1], index[2]
+        columns = [row[2] for row in conn.execute(f"PRAGMA index_info('{name}')")]
+        if unique and columns == [column]:
+            return True
+    return False
+
+
+def _unique_sku(conn):
+    # Databases created by the desktop app had no UNIQUE constraint on sku
+    if _has_unique_index(conn, "inventory_v2", "sku"):
+        return
+    # A blank SKU means "no SKU"; store it as NULL so blanks don't collide
+    conn.execute("UPDATE inventory_v2 SET sku = NULL WHERE TRIM(sku) = ''")
+    dupes = conn.execute("""
+        SELECT sku, COUNT(*) FROM inventory_v2
+        WHERE sku IS NOT NULL
+        GROUP BY sku HAVING COUNT(*) > 1
+        LIMIT 20
+    """).fetchall()
+    if dupes:
+        listed = ", ".join(f"{sku} (x{count})" for sku, count in dupes)
+        raise MigrationError(f"Duplicate SKUs must be resolved before upgrading: {listed}")
+    # Those databases may already have a plain index under this name, which
+    # CREATE ... IF NOT EXISTS would keep
+    conn.execute("DROP INDEX IF EXISTS idx_inventory_sku")
+    conn.execute("CREATE UNIQUE INDEX idx_inventory_sku ON inventory_v2 (sku)")
+    if not _has_unique_index(conn, "inventory_v2", "sku"):
+        raise MigrationError("Could not create a unique index on inventory_v2.sku")
+
+
+def _status_band_index(conn):
+    # (category, quantity) serves threshold recomputes as a range scan, and
+    # still covers the category list, so the single-column index goes
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_inventory_category_quantity ON inventory_v2 (category, quantity)")
+    conn.execute("DROP INDEX IF EXISTS idx_inventory_category")
+    # Recomputes only touch rows a threshold move can flip, so start from correct statuses
+    thresholds.recompute_all_statuses(conn)
+
+
+def _category_sort_index(conn):
+    # Keyset pages sorted by category (pagination.SORT_KEYS["category"])
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_inventory_category_id ON inventory_v2 (IFNULL(category, ''), id)")
+
+
+# (version, description, step); each step must be safe on databases that
+# already have some of these objects, since pre-versioning databases start at 0
+MIGRATIONS = (
+    (1, "users, inventory and sales tables", _base_tables),
+    (2, "settings and low stock thresholds", thresholds.ensure_schema),
+    (3, "full-text search index", search_index.ensure_schema),
+    (4, "keyset pagination sort indexes", pagination.ensure_sort_indexes),
+    (5, "dashboard aggregates", aggregates.ensure_schema),
+    (6, "data version counter", data_version.ensure_schema),
+    (7, "sales, status and category indexes", _hot_query_indexes),
+    (8, "unique sku index", _unique_sku),
+    (9, "category/quantity index and status repair", _status_band_index),
+    (10, "inventory row change log", data_version.ensure_change_log),
+    (11, "category sort index", _category_sort_index),
+)
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply pending steps, each in its own transaction; returns the versions applied"""
+    applied = []
+    for version, description, step in MIGRATIONS:
+        if current_version(conn) >= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while we waited for the lock
+            if current_version(conn) < version:
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {version}")
+                applied.append(version)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return applied
@@ -0,0 +1,88 @@
+"""
+CHRIS EFFECT - Keyset pagination over inventory_v2
+Pages are addressed by an opaque cursor holding the last (sort key, id)
+seen, so every page is an index range scan instead of an OFFSET walk.
+"""
+
+import json
+import base64
+import binascii
+
+# Sort name -> SQL expression; each has a matching (expression, id) index below.
+# Nullable columns sort through IFNULL so the row-value comparison never sees NULL.
+SORT_KEYS = {
+    "name": "name",
+    "sku": "IFNULL(sku, '')",
+    "quantity": "quantity",
+    "price": "price",
+    "status": "IFNULL(status, '')",
+    "category": "IFNULL(category, '')",
+}
+DEFAULT_SORT = "name"
+MAX_PAGE_SIZE = 500
+
+
+class CursorError(ValueError):
+    pass
+
+
+def ensure_sort_indexes(conn):
+    # Migration 4: the sorts it shipped with. Later sorts get their own migration step
+    for sort in ("name", "sku", "quantity", "price", "status"):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_inventory_{sort}_id ON inventory_v2 ({SORT_KEYS[sort]}, id)")
+
+
+def encode_cursor(sort, descending, value, row_id):
+    payload = json.dumps([sort, int(descending), value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort, descending):
+    """Return (value, id) from a cursor, checking it was issued for this sort"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        c_sort, c_desc, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError, binascii.Error):
+        raise CursorError("Invalid cursor")
+    if c_sort != sort or bool(c_desc) != descending or not isinstance(row_id, int):
+        raise CursorError("Cursor does not match the requested sort")
+    return value, row_id
+
+
+def fetch_page(conn, columns, sort=DEFAULT_SORT, descending=False, limit=50, after=None,
+               where=None, params=()):
+    """Fetch one page of rows; returns (rows, next_cursor or None)
+
+    columns must include "id". where/params add an extra filter (e.g. a search match).
+    """
+    if sort not in SORT_KEYS:
+        raise CursorError(f"Unsupported sort: {sort}")
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    expr = SORT_KEYS[sort]
+    direction = "DESC" if descending else "ASC"
+
+    clauses, args = [], list(params)
+    if where:
+        clauses.append(f"({where})")
+    if after:
+        value, row_id = decode_cursor(after, sort, descending)
+        # The leading single-column bound lets SQLite seek into expression indexes too
+        op = '<' if descending else '>'
+        clauses.append(f"{expr} {op}= ? AND ({expr}, id) {op} (?, ?)")
+        args.extend([value, value, row_id])
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    rows = conn.execute(f"""
+        SELECT {', '.join(columns)}, {expr} AS _sort_key
+        FROM inventory_v2
+        {where_sql}
+        ORDER BY {expr} {direction}, id {direction}
+        LIMIT ?
+    """, args + [limit + 1]).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, descending, last[-1], last[columns.index("id")])
+    return [tuple(r)[:-1] for r in rows], next_cursor
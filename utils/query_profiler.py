@@ -0,0 +1,274 @@
+"""
+CHRIS EFFECT - Query profiler
+Opt-in ([LOGGING] QUERY_PROFILER in config.ini). Connections opened with
+ProfiledConnection time every statement from execute to its last fetched
+row and note the parameter shape, the rows returned and how many
+statements SQLite actually ran for it (set_trace_callback also reports
+trigger programs and implicit BEGINs). Statements are grouped by their
+normalized SQL for report(), and any over the threshold is written to a
+rotating slow-query log as one JSON object per line.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+import logging.handlers
+from datetime import datetime
+
+from utils.metrics import TimedConnection, TimedCursor
+
+DEFAULT_SLOW_MS = 100.0
+NORMALIZED_CACHE_SIZE = 4096
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+_active = None
+_trace = threading.local()
+# Stands in for executemany()'s parameter rows, which may be a one-pass generator
+EXECUTEMANY = object()
+
+
+def normalize(sql):
+    """SQL with literals as ?, IN lists folded and whitespace collapsed"""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SPACE.sub(" ", sql).strip()
+    return _IN_LIST.sub("(...)", sql)
+
+
+def param_shape(parameters):
+    """Types of the bound parameters, never their values: "(int, str)", "{qty: int}" """
+    if parameters is EXECUTEMANY:
+        return "many"
+    if not parameters:
+        return "()"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+
+
+class QueryProfiler:
+    """Per-statement totals plus a slow-query log; safe to share between threads"""
+
+    def __init__(self, slow_ms=DEFAULT_SLOW_MS, log_path=None, max_bytes=10485760, backup_count=5):
+        self.slow_ms = slow_ms
+        self.log_path = log_path
+        self._stats = {}
+        self._normalized = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        if log_path:
+            handler = logging.handlers.RotatingFileHandler(
+                log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.logger.addHandler(handler)
+
+    def _normalize(self, sql):
+        key = self._normalized.get(sql)
+        if key is None:
+            key = normalize(sql)
+            if len(self._normalized) < NORMALIZED_CACHE_SIZE:
+                self._normalized[sql] = key
+        return key
+
+    def record(self, sql, parameters, seconds, rows, statements=1):
+        key = self._normalize(sql)
+        shape = param_shape(parameters)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0,
+                                            'statements': 0, 'shapes': set()}
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            stats['rows'] += rows
+            stats['statements'] += statements
+            stats['shapes'].add(shape)
+        if seconds * 1000 >= self.slow_ms and self.logger.handlers:
+            self.logger.info(json.dumps({
+                'at': datetime.now().isoformat(timespec='milliseconds'),
+                'ms': round(seconds * 1000, 3),
+                'rows': rows,
+                'statements': statements,
+                'params': shape,
+                'sql': key,
+            }))
+
+    def summary(self, limit=20):
+        """Statements ranked by total time: [{sql, calls, total_ms, avg_ms, max_ms, rows, ...}]"""
+        with self._lock:
+            items = [(key, dict(stats, shapes=sorted(stats['shapes']))) for key, stats in self._stats.items()]
+        items.sort(key=lambda item: -item[1]['seconds'])
+        return [{
+            'sql': key,
+            'calls': stats['calls'],
+            'total_ms': round(stats['seconds'] * 1000, 3),
+            'avg_ms': round(stats['seconds'] * 1000 / stats['calls'], 3),
+            'max_ms': round(stats['max_seconds'] * 1000, 3),
+            'rows': stats['rows'],
+            'statements_per_call': round(stats['statements'] / stats['calls'], 2),
+            'param_shapes': stats['shapes'],
+        } for key, stats in items[:limit]]
+
+    def report(self, limit=20):
+        """summary() as a text table"""
+        rows = self.summary(limit)
+        if not rows:
+            return "Query profile: no statements recorded"
+        lines = [f"Query profile (top {len(rows)} by total time)",
+                 f"  {'total ms':>10} {'calls':>7} {'avg ms':>8} {'max ms':>8} {'rows':>9} {'stmts':>5}  sql"]
+        for row in rows:
+            sql = row['sql'] if len(row['sql']) <= 100 else row['sql'][:97] + "..."
+            lines.append(f"  {row['total_ms']:>10.1f} {row['calls']:>7} {row['avg_ms']:>8.2f} {row['max_ms']:>8.2f} "
+                         f"{row['rows']:>9} {row['statements_per_call']:>5g}  {sql}")
+        return "\n".join(lines)
+
+    def write_report(self, limit=50):
+        """Append report() to the slow-query log (e.g. at exit)"""
+        if self.logger.handlers and self._stats:
+            self.logger.info(self.report(limit))
+
+
+def from_config(config, base_dir, section="LOGGING"):
+    """A QueryProfiler if QUERY_PROFILER is on in config, else None"""
+    if config is None or not config.getboolean(section, 'QUERY_PROFILER', fallback=False):
+        return None
+    log_path = config.get(section, 'SLOW_QUERY_LOG', fallback='slow_queries.log')
+    return QueryProfiler(
+        slow_ms=config.getfloat(section, 'SLOW_QUERY_MS', fallback=DEFAULT_SLOW_MS),
+        log_path=os.path.join(base_dir, log_path) if log_path else None,
+        max_bytes=config.getint(section, 'LOG_MAX_SIZE', fallback=10485760),
+        backup_count=config.getint(section, 'LOG_BACKUP_COUNT', fallback=5),
+    )
+
+
+def install(profiler):
+    """Make profiler the one ProfiledConnections report to (None turns recording off)"""
+    global _active
+    _active = profiler
+
+
+def connection_factory():
+    """ProfiledConnection while a profiler is installed, else the plain sqlite3.Connection"""
+    return ProfiledConnection if _active is not None else sqlite3.Connection
+
+
+# --- Instrumented connection ---
+
+def _on_statement(sql):
+    # Called by SQLite for every statement it starts, trigger programs included
+    _trace.count = getattr(_trace, 'count', 0) + 1
+
+
+class ProfiledCursor(TimedCursor):
+    """Times each statement until its rows are consumed, then reports it to the profiler"""
+
+    _pending = None
+
+    def _start(self, sql, parameters):
+        self._flush()
+        self._pending = [sql, parameters, 0.0, 0, getattr(_trace, 'count', 0)]
+
+    def _flush(self):
+        pending, self._pending = self._pending, None
+        if pending is None or _active is None:
+            return
+        sql, parameters, seconds, rows, statements = pending
+        if rows == 0 and self.rowcount > 0:
+            # INSERT/UPDATE/DELETE: rows affected
+            rows = self.rowcount
+        _active.record(sql, parameters, seconds, rows, statements)
+
+    def _timed(self, call, *args):
+        start = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            if self._pending is not None:
+                self._pending[2] += time.perf_counter() - start
+
+    def _run(self, call, sql, parameters, bound):
+        self._start(sql, bound)
+        try:
+            return self._timed(call, sql, parameters)
+        finally:
+            # Everything SQLite started during the call: this statement plus its triggers
+            if self._pending is not None:
+                self._pending[4] = max(1, getattr(_trace, 'count', 0) - self._pending[4])
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, parameters, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._run(super().executemany, sql, seq_of_parameters, EXECUTEMANY)
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._flush()
+        elif self._pending is not None:
+            self._pending[3] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        if not rows:
+            self._flush()
+        elif self._pending is not None:
+            self._pending[3] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        if self._pending is not None:
+            self._pending[3] += len(rows)
+        self._flush()
+        return rows
+
+    def __next__(self):
+        try:
+            row = self._timed(super().__next__)
+        except StopIteration:
+            self._flush()
+            raise
+        if self._pending is not None:
+            self._pending[3] += 1
+        return row
+
+    def close(self):
+        self._flush()
+        super().close()
+
+    def __del__(self):
+        # Cursors read with a single fetchone() are usually just dropped
+        self._flush()
+
+
+class ProfiledConnection(TimedConnection):
+    """TimedConnection whose cursors report to the installed QueryProfiler"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_trace_callback(_on_statement)
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or ProfiledCursor)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            if _active is not None:
+                _active.record("COMMIT", (), time.perf_counter() - start, 0)
@@ -0,0 +1,110 @@
+"""
+CHRIS EFFECT - Sales
+Every stock decrement is one conditional UPDATE ... RETURNING that checks
+stock, subtracts it and recomputes the status in the same statement, so
+concurrent sales can't oversell. Batches apply all lines in one
+transaction, or none of them.
+"""
+
+from datetime import datetime
+
+from utils.thresholds import status_sql
+
+MAX_BATCH_LINES = 500
+
+SELL_SQL = f"""
+    UPDATE inventory_v2
+    SET quantity = quantity - :qty,
+        status = {status_sql('quantity - :qty', 'inventory_v2.category')}
+    WHERE id = :id AND quantity >= :qty
+    RETURNING sku, name, quantity, price
+"""
+
+INSERT_SALE_SQL = """
+    INSERT INTO sales (product_id, sku, name, quantity, price, sale_date)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+class SaleError(ValueError):
+    """A sale that can't be recorded; problems lists the offending lines"""
+
+    def __init__(self, message, problems=()):
+        super().__init__(message)
+        self.problems = list(problems)
+
+
+class ProductNotFound(SaleError):
+    pass
+
+
+def parse_lines(lines):
+    """Validate [{product_id, quantity}, ...] into [(product_id, quantity)]"""
+    if not isinstance(lines, list) or not lines:
+        raise SaleError("lines must be a non-empty list")
+    if len(lines) > MAX_BATCH_LINES:
+        raise SaleError(f"At most {MAX_BATCH_LINES} lines per batch")
+
+    parsed, problems = [], []
+    for index, line in enumerate(lines):
+        try:
+            product_id = int(line.get('product_id'))
+            quantity = int(line.get('quantity', 0))
+        except (AttributeError, TypeError, ValueError):
+            problems.append({'line': index, 'error': 'product_id and quantity must be integers'})
+            continue
+        if quantity <= 0:
+            problems.append({'line': index, 'product_id': product_id, 'error': 'Quantity must be greater than zero'})
+            continue
+        parsed.append((product_id, quantity))
+    if problems:
+        raise SaleError("Invalid sale lines", problems)
+    return parsed
+
+
+def _sell_line(conn, product_id, quantity, sale_date):
+    """Decrement and log one line inside the caller's transaction; returns the new quantity"""
+    row = conn.execute(SELL_SQL, {'id': product_id, 'qty': quantity}).fetchall()
+    if not row:
+        if conn.execute("SELECT 1 FROM inventory_v2 WHERE id = ?", (product_id,)).fetchone() is None:
+            raise ProductNotFound("Product not found")
+        raise SaleError("Not enough stock")
+    sku, name, new_qty, price = row[0]
+    conn.execute(INSERT_SALE_SQL, (product_id, sku, name, quantity, price, sale_date))
+    return new_qty
+
+
+def sell(conn, product_id, quantity):
+    """Record one sale and its stock decrement in a single transaction; returns the new quantity
+
+    Raises ProductNotFound, or SaleError when there isn't enough stock.
+    """
+    if quantity <= 0:
+        raise SaleError("Quantity must be greater than zero")
+    with conn:
+        return _sell_line(conn, product_id, quantity, datetime.now().isoformat())
+
+
+def record_sales(conn, lines):
+    """Apply parsed (product_id, quantity) lines atomically
+
+    Raises SaleError (and writes nothing) if any product is missing or short.
+    Returns [{product_id, quantity, new_quantity}] in line order, where
+    new_quantity is the stock left once that line is applied.
+    """
+    sale_date = datetime.now().isoformat()
+    results, problems = [], []
+
+    with conn:
+        # Repeated products draw down the same stock, line by line
+        for index, (product_id, quantity) in enumerate(lines):
+            try:
+                new_qty = _sell_line(conn, product_id, quantity, sale_date)
+            except SaleError as e:
+                problems.append({'line': index, 'product_id': product_id, 'error': str(e)})
+                continue
+            results.append({'product_id': product_id, 'quantity': quantity, 'new_quantity': new_qty})
+        if problems:
+            raise SaleError("Sale not recorded", problems)
+
+    return results
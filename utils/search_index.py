@@ -0,0 +1,139 @@
+"""
+CHRIS EFFECT - Full-text product search
+Two FTS5 indexes over inventory_v2, kept in sync by triggers:
+  inventory_fts      word index with prefix tables, for 1-2 character prefixes
+  inventory_fts_tri  trigram index, for substring matches of 3+ characters
+Falls back to LIKE scans when the SQLite build has no FTS5.
+"""
+
+import sqlite3
+
+SEARCH_COLUMNS = ("name", "sku", "category")
+TRIGRAM_MIN_LENGTH = 3
+
+_INDEXES = {
+    "inventory_fts": "tokenize='unicode61', prefix='1 2 3'",
+    "inventory_fts_tri": "tokenize='trigram'",
+}
+
+
+def fts5_available(conn):
+    """True if this SQLite build can create FTS5 tables with the trigram tokenizer"""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts5_probe USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def ensure_schema(conn):
+    """Create the FTS5 indexes and sync triggers; returns False if FTS5 is unavailable"""
+    if not fts5_available(conn):
+        return False
+
+    cols = ", ".join(SEARCH_COLUMNS)
+    new_vals = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+    old_vals = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+
+    for table, options in _INDEXES.items():
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+        ).fetchone()
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
+                {cols}, content='inventory_v2', content_rowid='id', {options}
+            )
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON inventory_v2 BEGIN
+                INSERT INTO {table} (rowid, {cols}) VALUES (new.id, {new_vals});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON inventory_v2 BEGIN
+                INSERT INTO {table} ({table}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});
+            END
+        """)
+        # Quantity/status changes (sales) don't touch the index
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF {cols} ON inventory_v2 BEGIN
+                INSERT INTO {table} ({table}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});
+                INSERT INTO {table} (rowid, {cols}) VALUES (new.id, {new_vals});
+            END
+        """)
+        if not exists:
+            conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+    return True
+
+
+def fts_ready(conn):
+    """True if the FTS5 indexes exist in this database"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='inventory_fts_tri'"
+    ).fetchone() is not None
+
+
+def rebuild(conn):
+    """Re-index every product from inventory_v2 (after bulk loads with the triggers off)"""
+    if not fts_ready(conn):
+        return False
+    for table in _INDEXES:
+        conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+    return True
+
+
+def _quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def match_query(term, column=None):
+    """Return (fts_table, match_expression) for a raw search term"""
+    scope = f"{column} : " if column else ""
+    if len(term) >= TRIGRAM_MIN_LENGTH:
+        return "inventory_fts_tri", scope + _quote(term)
+    return "inventory_fts", scope + _quote(term) + "*"
+
+
+def search(conn, term, columns, column=None, limit=None):
+    """Rows of `columns` from inventory_v2 matching term, best match first
+
+    column restricts the match to one of SEARCH_COLUMNS (e.g. "name").
+    """
+    select = ", ".join(f"i.{c}" for c in columns)
+    limit_sql = " LIMIT ?" if limit else ""
+    table, expression = match_query(term, column)
+    params = [expression] + ([limit] if limit else [])
+    try:
+        return conn.execute(f"""
+            SELECT {select}
+            FROM {table} f JOIN inventory_v2 i ON i.id = f.rowid
+            WHERE {table} MATCH ?
+            ORDER BY f.rank, i.name{limit_sql}
+        """, params).fetchall()
+    except sqlite3.OperationalError:
+        # No FTS5 in this build (or index not created yet): scan with LIKE
+        return like_search(conn, term, columns, column, limit)
+
+
+def match_filter(conn, term, column=None):
+    """(sql, params) filter on inventory_v2.id for use inside a larger query"""
+    if fts_ready(conn):
+        table, expression = match_query(term, column)
+        return f"id IN (SELECT rowid FROM {table} WHERE {table} MATCH ?)", [expression]
+    searched = (column,) if column else SEARCH_COLUMNS
+    return " OR ".join(f"{c} LIKE ?" for c in searched), ['%' + term + '%'] * len(searched)
+
+
+def like_search(conn, term, columns, column=None, limit=None):
+    select = ", ".join(f"i.{c}" for c in columns)
+    searched = (column,) if column else SEARCH_COLUMNS
+    where = " OR ".join(f"i.{c} LIKE ?" for c in searched)
+    params = ['%' + term + '%'] * len(searched)
+    limit_sql = ""
+    if limit:
+        limit_sql = " LIMIT ?"
+        params.append(limit)
+    return conn.execute(
+        f"SELECT {select} FROM inventory_v2 i WHERE {where} ORDER BY i.name{limit_sql}", params
+    ).fetchall()
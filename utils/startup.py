@@ -0,0 +1,26 @@
+"""
+CHRIS EFFECT - Startup timing
+Records named milestones (DB init, server ready, first request, first
+paint) relative to launch and prints them as one report line.
+"""
+
+import time
+
+
+class StartupTimer:
+    """Milestones in milliseconds since the timer was created; each is kept only the first time"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = {}
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = (time.perf_counter() - self.started) * 1000
+
+    def report(self):
+        parts, previous = [], 0.0
+        for name, at in self.marks.items():
+            parts.append(f"{name} {at:.0f} ms (+{at - previous:.0f})")
+            previous = at
+        return "Startup: " + ", ".join(parts)
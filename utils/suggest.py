@@ -0,0 +1,302 @@
+"""
+CHRIS EFFECT - Search box suggestions
+An in-memory index of every product name and SKU for type-ahead, so a
+keystroke never scans inventory_v2:
+  names  each distinct name once; every word maps to the names using it,
+         and a sorted word list turns a typed prefix into a word range
+  SKUs   one list kept in case-insensitive order, searched by bisection
+It loads once, then catches up from the inventory_changes feed
+(data_version) before each lookup, re-reading only the products whose
+name or SKU changed. Keep it on one thread: SuggestionIndex has no locks.
+"""
+
+import re
+import string
+from array import array
+from bisect import bisect_left, insort
+from itertools import chain, islice
+
+from utils import data_version
+
+DEFAULT_LIMIT = 5
+# Names walked before a lookup switches to bitmaps
+QUICK_SCAN = 200
+# Words used by at least 1/MASK_SHARE of the names (and MASK_MIN) keep a bitmap of them
+MASK_SHARE = 128
+MASK_MIN = 1024
+# Rarer words under a typed prefix are added to its bitmap up to this many names
+LOOSE_BITS = 4000
+# Names checked when no typed word has a bitmap
+MAX_WALK = 5000
+# Past this many SKU moves, rebuilding the sorted list beats shifting it per SKU
+SKU_SHIFT_LIMIT = 50
+CHANGE_BATCH = 500
+
+_WORD = re.compile(r"\w+")
+_NONZERO = re.compile(rb"[^\x00]")
+# ASCII-only, like SQLite's upper(), so the SKU order loaded from SQL matches bisect's
+_ASCII_UPPER = str.maketrans(string.ascii_lowercase, string.ascii_uppercase)
+
+
+def sku_key(text):
+    return text.translate(_ASCII_UPPER)
+
+
+def _sku_entry(sku):
+    """sku as kept in the sorted list: its sku_key, then NUL and the SKU itself if that differs"""
+    key = sku_key(sku)
+    # Upper-case SKUs (nearly all) are stored as themselves; NUL sorts a key's variants after it
+    return sku if key == sku else f"{key}\0{sku}"
+
+
+def name_words(text):
+    return _WORD.findall(text.casefold())
+
+
+def _word_check(words):
+    """match(casefolded name) for names with a word starting with each of words; None if no words"""
+    if not words:
+        return None
+    return re.compile("".join(rf"(?=.*\b{re.escape(w)})" for w in words), re.S).match
+
+
+def _bitmap(slots, size):
+    bits = bytearray((size + 7) // 8)
+    for slot in slots:
+        bits[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _bits(mask):
+    """The set bit positions of mask, lowest first"""
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for match in _NONZERO.finditer(data):
+        position = match.start()
+        byte = data[position]
+        for bit in range(8):
+            if byte >> bit & 1:
+                yield position * 8 + bit
+
+
+class SuggestionIndex:
+    """Prefix matches over product names and SKUs"""
+
+    def __init__(self):
+        self.loaded = False
+        # inventory_changes seq the index is current to
+        self.version = 0
+        self._clear()
+
+    def _clear(self):
+        # Name slot -> name (None once no product uses it; its slot isn't reused)
+        self._names = []
+        self._name_refs = []
+        self._name_slots = {}
+        # Word -> array of name slots, ascending; _words holds the keys in order
+        self._postings = {}
+        self._words = []
+        # _sku_entry of every SKU, in order
+        self._skus = []
+        # Product id -> (name slot or None, sku or None)
+        self._products = {}
+        # Word -> int with bit i set if name slot i has the word (common words only)
+        self._masks = {}
+
+    # --- Loading ---
+    def load(self, conn):
+        """Index every product from scratch"""
+        self._clear()
+        # Read the head first: a write that lands during the scan is replayed by catch_up
+        self.version = data_version.change_log_head(conn)
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        # SQLite sorts the SKUs (in _sku_entry order), so the list is built by appending
+        cursor.execute("SELECT id, name, sku FROM inventory_v2 ORDER BY upper(sku), sku")
+        for product_id, name, sku in cursor:
+            slot = self._link_name(name, loading=True) if name else None
+            if sku:
+                self._skus.append(_sku_entry(sku))
+            self._products[product_id] = (slot, sku)
+        self._words = sorted(self._postings)
+        common = max(MASK_MIN, len(self._names) // MASK_SHARE)
+        for word, posting in self._postings.items():
+            if len(posting) >= common:
+                self._masks[word] = _bitmap(posting, len(self._names))
+        self.loaded = True
+
+    def catch_up(self, conn):
+        """Apply the name and SKU changes since the last load or catch-up"""
+        changes = data_version.changes_since(conn, self.version)
+        if changes is None:
+            # Older entries were pruned from the feed
+            return self.load(conn)
+        if not changes:
+            return
+        watched = data_version.columns_mask(("name", "sku"))
+        ids = list({product_id for _, product_id, op, columns in changes if op != "U" or columns & watched})
+        self.version = changes[-1][0]
+        if not ids:
+            return
+
+        current = {}
+        for start in range(0, len(ids), CHANGE_BATCH):
+            batch = ids[start:start + CHANGE_BATCH]
+            rows = conn.execute(
+                f"SELECT id, name, sku FROM inventory_v2 WHERE id IN ({', '.join('?' * len(batch))})", batch
+            ).fetchall()
+            current.update((row[0], (row[1], row[2])) for row in rows)
+
+        gone, added = set(), []
+        for product_id in ids:
+            old_slot, old_sku = self._products.pop(product_id, (None, None))
+            name, sku = current.get(product_id, (None, None))
+            # Link before unlinking, so an unchanged name keeps its slot
+            slot = self._link_name(name) if name else None
+            if old_slot is not None:
+                self._unlink_name(old_slot)
+            if sku != old_sku:
+                if old_sku:
+                    gone.add(old_sku)
+                if sku:
+                    added.append(sku)
+            if product_id in current:
+                self._products[product_id] = (slot, sku)
+        self._move_skus(gone, added)
+
+    def lookup(self, conn, term, limit=DEFAULT_LIMIT):
+        """Catch up (loading the first time), then suggest(term); a DBWorker job"""
+        if self.loaded:
+            self.catch_up(conn)
+        else:
+            self.load(conn)
+        return self.suggest(term, limit)
+
+    def _link_name(self, name, loading=False):
+        """Slot of name, adding it if no product uses it yet"""
+        slot = self._name_slots.get(name)
+        if slot is None:
+            slot = len(self._names)
+            self._names.append(name)
+            self._name_refs.append(0)
+            self._name_slots[name] = slot
+            for word in set(name_words(name)):
+                posting = self._postings.get(word)
+                if posting is None:
+                    posting = self._postings[word] = array("i")
+                    if not loading:
+                        self._words.insert(bisect_left(self._words, word), word)
+                posting.append(slot)
+                if word in self._masks:
+                    self._masks[word] |= 1 << slot
+        self._name_refs[slot] += 1
+        return slot
+
+    def _unlink_name(self, slot):
+        self._name_refs[slot] -= 1
+        if not self._name_refs[slot]:
+            # The slot stays in its postings and bitmaps and is skipped; the next load drops it
+            del self._name_slots[self._names[slot]]
+            self._names[slot] = None
+
+    def _move_skus(self, gone, added):
+        gone = {_sku_entry(sku) for sku in gone}
+        added = sorted(_sku_entry(sku) for sku in added)
+        if len(gone) + len(added) <= SKU_SHIFT_LIMIT:
+            for entry in gone:
+                index = bisect_left(self._skus, entry)
+                if index < len(self._skus) and self._skus[index] == entry:
+                    del self._skus[index]
+            for entry in added:
+                insort(self._skus, entry)
+            return
+        kept = [entry for entry in self._skus if entry not in gone]
+        kept.extend(added)
+        # Two sorted runs: the sort merges them in one pass
+        kept.sort()
+        self._skus = kept
+
+    # --- Lookup ---
+    def suggest(self, term, limit=DEFAULT_LIMIT):
+        """Up to limit names with a word starting with each word of term, then SKUs starting with term"""
+        term = term.strip()
+        if not term:
+            return []
+        results = self._match_names(name_words(term), limit)
+        if len(results) < limit:
+            results.extend(self._match_skus(sku_key(term), limit - len(results)))
+        return results
+
+    def _word_keys(self, prefix):
+        """The indexed words starting with prefix"""
+        start = bisect_left(self._words, prefix)
+        return self._words[start:bisect_left(self._words, prefix + "\U0010ffff", start)]
+
+    def _match_names(self, words, limit):
+        if not words:
+            return []
+        # (names under it, query word, index words it is a prefix of), fewest names first
+        ranges = []
+        for word in set(words):
+            keys = self._word_keys(word)
+            ranges.append((sum(len(self._postings[k]) for k in keys), word, keys))
+        ranges.sort()
+        size, _, keys = ranges[0]
+        if not size:
+            return []
+
+        # Usually the first names under the rarest word are enough
+        check = _word_check([word for _, word, _ in ranges[1:]])
+        results = self._checked(islice(chain.from_iterable(self._postings[k] for k in keys), QUICK_SCAN), check, limit)
+        if len(results) >= limit or size <= QUICK_SCAN:
+            return results
+
+        # A rare combination: AND the bitmaps of the words that have one and
+        # walk what is left; the rest of the words are checked per name
+        mask, unmasked = None, []
+        for size, word, keys in ranges:
+            word_mask = self._range_mask(keys)
+            if word_mask is None:
+                unmasked.append(word)
+            else:
+                mask = word_mask if mask is None else mask & word_mask
+        check = _word_check(unmasked)
+        if mask is None:
+            # Only short, very common prefixes: the names under the first one, bounded
+            size, _, keys = ranges[0]
+            return self._checked(islice(chain.from_iterable(self._postings[k] for k in keys), MAX_WALK), check, limit)
+        return self._checked(_bits(mask), check, limit)
+
+    def _range_mask(self, keys):
+        """Bitmap of the names under keys, or None when too many of them have no bitmap"""
+        mask, loose = 0, []
+        for key in keys:
+            if key in self._masks:
+                mask |= self._masks[key]
+            else:
+                loose.append(self._postings[key])
+        if sum(len(posting) for posting in loose) > LOOSE_BITS:
+            return None
+        if loose:
+            mask |= _bitmap(chain.from_iterable(loose), len(self._names))
+        return mask
+
+    def _checked(self, slots, check, limit):
+        results, seen = [], set()
+        for slot in slots:
+            name = self._names[slot]
+            if name is None or slot in seen:
+                continue
+            seen.add(slot)
+            if check is None or check(name.casefold()):
+                results.append(name)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _match_skus(self, prefix, limit):
+        index = bisect_left(self._skus, prefix)
+        results = []
+        while index < len(self._skus) and len(results) < limit and self._skus[index].startswith(prefix):
+            results.append(self._skus[index].rpartition("\0")[2])
+            index += 1
+        return results
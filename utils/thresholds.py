@@ -0,0 +1,204 @@
+"""
+CHRIS EFFECT - Low stock threshold resolver
+Caches the default and per-category thresholds in memory so computing a
+product status is a dictionary lookup instead of two queries.
+"""
+
+import threading
+
+DEFAULT_LOW_STOCK = 10
+
+
+def ensure_schema(conn):
+    """Create the threshold tables and the triggers that bump their change counter"""
+    c = conn.cursor()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS app_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS category_thresholds (
+            category TEXT PRIMARY KEY,
+            threshold INTEGER NOT NULL
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS change_counters (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    c.execute("INSERT OR IGNORE INTO change_counters (name, version) VALUES ('thresholds', 0)")
+
+    # Writes from any process (app.py, CE.py, sqlite shell) bump the counter
+    bump = "UPDATE change_counters SET version = version + 1 WHERE name = 'thresholds';"
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS category_thresholds_{event.lower()}_version
+            AFTER {event} ON category_thresholds
+            BEGIN {bump} END
+        """)
+        row = "OLD" if event == "DELETE" else "NEW"
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS app_settings_{event.lower()}_version
+            AFTER {event} ON app_settings
+            WHEN {row}.key = 'low_stock_default'
+            BEGIN {bump} END
+        """)
+
+
+def compute_status(quantity, threshold):
+    if quantity <= 0:
+        return 'Out of Stock'
+    if quantity < threshold:
+        return 'Low Stock'
+    return 'In Stock'
+
+
+def status_sql(quantity, category):
+    """SQL expression equivalent to compute_status(), resolving the threshold in the same statement"""
+    threshold = f"""COALESCE(
+        (SELECT threshold FROM category_thresholds t WHERE t.category = NULLIF({category}, '')),
+        (SELECT CAST(value AS INTEGER) FROM app_settings WHERE key = 'low_stock_default'),
+        {DEFAULT_LOW_STOCK}
+    )"""
+    return f"""CASE
+        WHEN {quantity} <= 0 THEN 'Out of Stock'
+        WHEN {quantity} < {threshold} THEN 'Low Stock'
+        ELSE 'In Stock'
+    END"""
+
+
+def _stored_default(conn):
+    row = conn.execute("SELECT value FROM app_settings WHERE key = 'low_stock_default'").fetchone()
+    try:
+        return int(row[0]) if row else DEFAULT_LOW_STOCK
+    except (TypeError, ValueError):
+        return DEFAULT_LOW_STOCK
+
+
+def _stored_override(conn, category):
+    row = conn.execute("SELECT threshold FROM category_thresholds WHERE category = ?", (category,)).fetchone()
+    return int(row[0]) if row else None
+
+
+def _recompute_band(conn, old, new, scope, params):
+    """Re-derive status for the rows a threshold move can affect; returns rows updated
+
+    Only quantities in [min(old, new), max(old, new)) flip between Low Stock and
+    In Stock, and Out of Stock (quantity <= 0) never depends on the threshold,
+    so this is an index range scan rather than a pass over the whole table.
+    """
+    if old == new:
+        return 0
+    low, high = max(min(old, new), 1), max(old, new)
+    cur = conn.execute(f"""
+        UPDATE inventory_v2
+        SET status = {status_sql('quantity', 'inventory_v2.category')}
+        WHERE quantity >= ? AND quantity < ? AND {scope}
+    """, [low, high] + list(params))
+    return cur.rowcount
+
+
+def set_default_threshold(conn, value):
+    """Store the default threshold and update affected statuses in one transaction"""
+    # Take the write lock first so the old threshold can't change underneath us
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        old = _stored_default(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO app_settings (key, value) VALUES ('low_stock_default', ?)", (str(value),)
+        )
+        # Categories with their own override keep their threshold
+        return _recompute_band(conn, old, value, """(
+            NULLIF(inventory_v2.category, '') IS NULL
+            OR inventory_v2.category NOT IN (SELECT category FROM category_thresholds)
+        )""", ())
+
+
+def set_category_threshold(conn, category, value):
+    """Store a category override and update that category's statuses in one transaction"""
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        old = _stored_override(conn, category)
+        if old is None:
+            old = _stored_default(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO category_thresholds (category, threshold) VALUES (?, ?)", (category, value)
+        )
+        return _recompute_band(conn, old, value, "inventory_v2.category = ?", (category,))
+
+
+def clear_category_threshold(conn, category):
+    """Drop a category override, returning that category's statuses to the default"""
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        old = _stored_override(conn, category)
+        conn.execute("DELETE FROM category_thresholds WHERE category = ?", (category,))
+        if old is None:
+            return 0
+        return _recompute_band(conn, old, _stored_default(conn), "inventory_v2.category = ?", (category,))
+
+
+def recompute_all_statuses(conn):
+    """Bring every stored status in line with the current thresholds; returns rows updated"""
+    status = status_sql('quantity', 'inventory_v2.category')
+    return conn.execute(
+        f"UPDATE inventory_v2 SET status = {status} WHERE status IS NOT {status}"
+    ).rowcount
+
+
+class ThresholdResolver:
+    """Process-wide threshold map, reloaded only when the DB change counter moves"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        # (default, overrides) swapped as one tuple so readers never see a half reload
+        self._state = (DEFAULT_LOW_STOCK, {})
+
+    def invalidate(self):
+        """Force the next sync() to reload from the database"""
+        self._version = None
+
+    def sync(self, conn):
+        """Reload the map if the thresholds changed since the last load (one PK lookup)"""
+        row = conn.execute("SELECT version FROM change_counters WHERE name = 'thresholds'").fetchone()
+        version = row[0] if row else 0
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            default = conn.execute("SELECT value FROM app_settings WHERE key = 'low_stock_default'").fetchone()
+            try:
+                default_threshold = int(default[0]) if default else DEFAULT_LOW_STOCK
+            except (TypeError, ValueError):
+                default_threshold = DEFAULT_LOW_STOCK
+            overrides = {}
+            for category, threshold in conn.execute("SELECT category, threshold FROM category_thresholds"):
+                try:
+                    overrides[category] = int(threshold)
+                except (TypeError, ValueError):
+                    continue
+            self._state = (default_threshold, overrides)
+            self._version = version
+
+    @property
+    def default(self):
+        return self._state[0]
+
+    @property
+    def overrides(self):
+        return dict(self._state[1])
+
+    def threshold(self, category):
+        default, overrides = self._state
+        if not category:
+            return default
+        return overrides.get(category, default)
+
+    def status(self, quantity, category):
+        return compute_status(quantity, self.threshold(category))
@@ -0,0 +1,487 @@
+"""
+CHRIS EFFECT - Virtual inventory table
+Row model and Treeview driver for the desktop inventory table. RowModel
+addresses the rows of one ordered, optionally filtered inventory_v2 query
+by position and loads them from SQLite a page at a time - keyset from the
+previous page while scrolling; a jump seeks from the nearest page
+boundary already seen, or reads back from the end when that is closer -
+keeping only a bounded number of pages. Every sort has an (expression, id)
+index (pagination.SORT_KEYS), and the pages and boundaries of the last few
+sorts are kept, so switching back to a column whose rows haven't changed
+doesn't query at all. VirtualTreeview holds Treeview items for just the
+rows on screen and drives its own scrollbar, mouse wheel and arrow keys,
+so a refresh costs a count plus one page however big the catalog is.
+
+After a write, sync() reads the inventory_changes feed (data_version):
+updates that can't move a row are patched into the loaded pages and the
+matching items; inserts, deletes and re-sorting updates reload the
+window, and redrawing only touches the items that differ.
+
+RowModel does all of its SQL in the jobs VirtualTreeview hands to its
+runner - on the desktop, the DB worker thread (utils/db_worker.py) - and
+the view draws only the rows those jobs return, on the Tk thread.
+"""
+
+from collections import OrderedDict
+
+from utils import data_version
+from utils.aggregates import read_totals
+from utils.pagination import SORT_KEYS
+from utils.search_index import SEARCH_COLUMNS
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MAX_PAGES = 64
+WHEEL_ROWS = 3
+# Past this many changes at once, reloading the window is cheaper than patching
+MAX_PATCH_CHANGES = 500
+# Earlier sorts whose loaded pages are kept for switching back
+SORT_CACHE_SIZE = 4
+
+# Sort name -> SQL expression ("id" is the rowid, so it needs no index of its own)
+SORTS = dict(SORT_KEYS, id="id")
+
+
+class RowModel:
+    """Rows of inventory_v2 by position for the current filter and sort"""
+
+    def __init__(self, conn, columns, page_size=DEFAULT_PAGE_SIZE, max_pages=DEFAULT_MAX_PAGES):
+        if "id" not in columns:
+            raise ValueError("columns must include id")
+        self.conn = conn
+        self.columns = tuple(columns)
+        self.id_index = self.columns.index("id")
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.sort = "id"
+        self.descending = False
+        self.where = None
+        self.params = ()
+        self.total = 0
+        # inventory_changes seq the loaded rows are current to
+        self.version = 0
+        self._pages = OrderedDict()
+        # Product id -> (page, offset) for every loaded row
+        self._positions = {}
+        # Page -> (sort key, id) of its last row, kept after the page is evicted
+        self._bounds = {}
+        # Whether the pages are current to version for this filter and sort
+        self._loaded = False
+        # (sort, descending) -> (version, total, pages, positions, bounds) of earlier sorts
+        self._sort_cache = OrderedDict()
+
+    def set_filter(self, where=None, params=()):
+        """Restrict rows to an SQL condition on inventory_v2 (e.g. search_index.match_filter)"""
+        params = tuple(params)
+        if (where, params) != (self.where, self.params):
+            self._loaded = False
+            self._sort_cache.clear()
+        self.where = where
+        self.params = params
+
+    def set_sort(self, sort, descending=False):
+        """Change the order, keeping the current sort's pages for switching back"""
+        if sort not in SORTS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        if (sort, descending) == (self.sort, self.descending):
+            return
+        if self._loaded:
+            self._sort_cache[(self.sort, self.descending)] = (
+                self.version, self.total, self._pages, self._positions, self._bounds
+            )
+            while len(self._sort_cache) > SORT_CACHE_SIZE:
+                self._sort_cache.popitem(last=False)
+        self.sort = sort
+        self.descending = descending
+        cached = self._sort_cache.pop((sort, descending), None)
+        if cached is None:
+            self._pages, self._positions, self._bounds = OrderedDict(), {}, {}
+            self._loaded = False
+        else:
+            self.version, self.total, self._pages, self._positions, self._bounds = cached
+            self._loaded = True
+
+    def refresh(self):
+        """Recount and forget every loaded page, unless no product changed since they loaded
+
+        Returns the total.
+        """
+        head = data_version.change_log_head(self.conn)
+        if self._loaded and head == self.version:
+            return self.total
+        self.version = head
+        self._pages.clear()
+        self._positions.clear()
+        self._bounds.clear()
+        self._sort_cache.clear()
+        self._loaded = True
+        if self.where:
+            self.total = self.conn.execute(
+                f"SELECT COUNT(*) FROM inventory_v2 WHERE {self.where}", self.params
+            ).fetchone()[0]
+        else:
+            self.total = read_totals(self.conn)["product_count"]
+        return self.total
+
+    def missing_pages(self, start, stop):
+        """Pages holding rows start..stop-1 that aren't loaded"""
+        stop = min(stop, self.total)
+        if stop <= start:
+            return []
+        first, last = start // self.page_size, (stop - 1) // self.page_size
+        return [page for page in range(first, last + 1) if page not in self._pages]
+
+    def ensure(self, start, stop):
+        # Mark the window's loaded pages as recently used first, so storing a
+        # missing page can't evict one of them
+        stop = min(stop, self.total)
+        if stop > start:
+            for page in range(start // self.page_size, (stop - 1) // self.page_size + 1):
+                if page in self._pages:
+                    self._pages.move_to_end(page)
+        for page in self.missing_pages(start, stop):
+            self.store_page(page, self.fetch_page(page))
+
+    def window(self, start, count):
+        """(first, total, rows) for count rows from start, clamped to the end and loaded as needed"""
+        first = max(0, min(start, self.total - count))
+        self.ensure(first, first + count)
+        return first, self.total, self.rows(first, first + count)
+
+    def rows(self, start, stop):
+        """Rows start..stop-1, None where a page isn't loaded"""
+        stop = min(stop, self.total)
+        result = []
+        for index in range(start, stop):
+            page = self._pages.get(index // self.page_size)
+            offset = index % self.page_size
+            result.append(page[offset] if page is not None and offset < len(page) else None)
+        return result
+
+    def fetch_page(self, page):
+        """Query one page; returns its rows with the sort key appended to each"""
+        start = page * self.page_size
+        # Walk the fewest index entries: on from the nearest earlier page boundary, or back from the end
+        anchor = max((p for p in self._bounds if p < page), default=None)
+        skip = start if anchor is None else start - (anchor + 1) * self.page_size
+        count = min(self.page_size, self.total - start)
+        from_end = self.total - start - count
+        if count > 0 and from_end < skip:
+            rows = self._query(not self.descending, None, count, from_end)
+            rows.reverse()
+            return rows
+        return self._query(self.descending, self._bounds.get(anchor), self.page_size, skip)
+
+    def _query(self, descending, after, limit, offset):
+        expr = SORTS[self.sort]
+        direction = "DESC" if descending else "ASC"
+        clauses, args = ([f"({self.where})"], list(self.params)) if self.where else ([], [])
+        if after is not None:
+            # Continue after a page's last row instead of walking OFFSET rows from the start
+            key, row_id = after
+            op = "<" if descending else ">"
+            if self.sort == "id":
+                clauses.append(f"id {op} ?")
+                args.append(row_id)
+            else:
+                clauses.append(f"{expr} {op}= ? AND ({expr}, id) {op} (?, ?)")
+                args.extend([key, key, row_id])
+        order = f"id {direction}" if self.sort == "id" else f"{expr} {direction}, id {direction}"
+        where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        return cursor.execute(f"""
+            SELECT {', '.join(self.columns)}, {expr}
+            FROM inventory_v2
+            {where_sql}
+            ORDER BY {order}
+            LIMIT ? OFFSET ?
+        """, args + [limit, offset]).fetchall()
+
+    def store_page(self, page, rows):
+        if rows:
+            self._bounds[page] = (rows[-1][-1], rows[-1][self.id_index])
+        self._pages[page] = [row[:-1] for row in rows]
+        self._pages.move_to_end(page)
+        for offset, row in enumerate(rows):
+            self._positions[row[self.id_index]] = (page, offset)
+        while len(self._pages) > self.max_pages:
+            _, evicted = self._pages.popitem(last=False)
+            for row in evicted:
+                self._positions.pop(row[self.id_index], None)
+
+    def apply_changes(self):
+        """Patch loaded rows updated since the last refresh or apply
+
+        Returns [(position, row)] for the patched rows, or None when rows were
+        added or removed, or an update may have moved one (refresh() then).
+        """
+        changes = data_version.changes_since(self.conn, self.version)
+        if changes is None or len(changes) > MAX_PATCH_CHANGES:
+            return None
+        if not changes:
+            return []
+        # Columns whose change can move a row or take it in or out of the filter
+        moving = data_version.columns_mask((self.sort,))
+        if self.where:
+            moving |= data_version.columns_mask(SEARCH_COLUMNS)
+        for _, _, op, columns in changes:
+            if op != "U" or columns & moving:
+                return None
+        self.version = changes[-1][0]
+
+        loaded = list({product_id for _, product_id, _, _ in changes if product_id in self._positions})
+        if not loaded:
+            return []
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(
+            f"SELECT {', '.join(self.columns)} FROM inventory_v2 WHERE id IN ({', '.join('?' * len(loaded))})",
+            loaded,
+        ).fetchall()
+        patched = []
+        for row in rows:
+            page, offset = self._positions[row[self.id_index]]
+            self._pages[page][offset] = row
+            patched.append((page * self.page_size + offset, row))
+        return patched
+
+
+class VirtualTreeview:
+    """Shows RowModel rows in a ttk.Treeview, one item per visible row (item id = product id)
+
+    format_row(row, index) returns the (values, tags) for a row at position index.
+    run(job, callback) must call job() where the model's connection lives and
+    then callback(result) on the Tk thread; by default both run immediately.
+    """
+
+    def __init__(self, tree, scrollbar, model, format_row, run=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.model = model
+        self.format_row = format_row
+        self.run = run or (lambda job, callback: callback(job()))
+        self.first = 0
+        self.visible = 30
+        self.total = 0
+        self._selected = set()
+        # Item id -> (values, tags) as drawn, for every item in the Treeview
+        self._rendered = {}
+        self._shown = []
+        self._drawn_first = 0
+        self._inflight = 0
+        self._scroll_pending = False
+
+        scrollbar.configure(command=self.yview)
+        tree.bind("<Configure>", self._on_configure, add="+")
+        tree.bind("<MouseWheel>", self._on_wheel)
+        tree.bind("<Button-4>", lambda e: self.scroll(-WHEEL_ROWS))
+        tree.bind("<Button-5>", lambda e: self.scroll(WHEEL_ROWS))
+        tree.bind("<ButtonPress-1>", self._on_click, add="+")
+        tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"),
+                          ("<Home>", "home"), ("<End>", "end")):
+            tree.bind(key, lambda e, s=step: self._on_key(s))
+
+    # --- Data ---
+    def refresh(self, reset_position=False, prepare=None, on_done=None):
+        """Recount and redraw; prepare(model) runs first, with the query (e.g. set_filter)
+
+        on_done(total) runs on the Tk thread once the rows are drawn.
+        """
+        if reset_position:
+            self.first = 0
+        model, first, visible = self.model, self.first, self.visible
+
+        def job():
+            if prepare is not None:
+                prepare(model)
+            model.refresh()
+            return model.window(first, visible)
+        self._submit(job, on_done)
+
+    def sync(self, on_done=None):
+        """Catch up with writes: patch changed rows in place, or reload the window"""
+        model, first, visible = self.model, self.first, self.visible
+
+        def job():
+            patched = model.apply_changes()
+            if patched is None:
+                model.refresh()
+                return model.window(first, visible)
+            return patched
+        self._submit(job, on_done)
+
+    def selected_ids(self):
+        """Ids of every selected product, including ones scrolled out of view"""
+        return sorted(self._selected)
+
+    def clear_selection(self):
+        self._selected.clear()
+        self.tree.selection_set(())
+
+    def _submit(self, job, on_done=None):
+        self._inflight += 1
+
+        def guarded():
+            # Errors come back as results so the in-flight count stays right
+            try:
+                return job()
+            except Exception as e:
+                return e
+
+        def done(result):
+            self._inflight -= 1
+            if isinstance(result, Exception):
+                self._scroll_pending = False
+                raise result
+            if isinstance(result, tuple):
+                first, self.total, rows = result
+                if not self._scroll_pending:
+                    self.first = first
+                self.draw(first, rows)
+            else:
+                self._patch(result)
+            if on_done is not None:
+                on_done(self.total)
+            if self._scroll_pending and not self._inflight:
+                self._scroll_pending = False
+                self._request_window()
+        self.run(guarded, done)
+
+    def _request_window(self):
+        # While a load is running, just remember to fetch the latest position after it
+        if self._inflight:
+            self._scroll_pending = True
+            return
+        model, first, visible = self.model, self.first, self.visible
+        self._submit(lambda: model.window(first, visible))
+
+    # --- Drawing ---
+    def draw(self, first, rows):
+        """Show rows (from the model) as the window starting at position first"""
+        wanted = {}
+        for offset, row in enumerate(rows):
+            if row is None:
+                continue
+            # setdefault: a row that moved between two page loads is shown once
+            wanted.setdefault(str(row[self.model.id_index]), self.format_row(row, first + offset))
+
+        # Touch only the items that differ from what is drawn
+        tree = self.tree
+        stale = [iid for iid in self._rendered if iid not in wanted]
+        if stale:
+            tree.delete(*stale)
+            for iid in stale:
+                del self._rendered[iid]
+        order = [iid for iid in self._shown if iid in self._rendered]
+        for index, (iid, item) in enumerate(wanted.items()):
+            drawn = self._rendered.get(iid)
+            if drawn is None:
+                tree.insert("", index, iid=iid, values=item[0], tags=item[1])
+                order.insert(index, iid)
+            else:
+                if drawn != item:
+                    tree.item(iid, values=item[0], tags=item[1])
+                if order[index] != iid:
+                    tree.move(iid, "", index)
+                    order.remove(iid)
+                    order.insert(index, iid)
+            self._rendered[iid] = item
+        self._shown = order
+        self._drawn_first = first
+
+        selected = [iid for iid in order if int(iid) in self._selected]
+        if set(selected) != set(tree.selection()):
+            tree.selection_set(selected)
+        self._update_scrollbar()
+
+    def _patch(self, patched):
+        for position, row in patched:
+            iid = str(row[self.model.id_index])
+            if iid in self._rendered:
+                item = self.format_row(row, position)
+                if self._rendered[iid] != item:
+                    self.tree.item(iid, values=item[0], tags=item[1])
+                    self._rendered[iid] = item
+
+    def _update_scrollbar(self):
+        if self.total <= 0:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.first / self.total, min(1.0, (self.first + self.visible) / self.total))
+
+    def _on_configure(self, event=None):
+        # Fit exactly the rows that are fully on screen, so the Treeview never scrolls itself
+        if not self._shown:
+            return
+        box = self.tree.bbox(self._shown[0])
+        if not box:
+            return
+        visible = max(1, (self.tree.winfo_height() - box[1]) // max(1, box[3]))
+        if visible != self.visible:
+            self.visible = visible
+            self._request_window()
+
+    # --- Scrolling ---
+    def scroll_to(self, index):
+        self.first = max(0, min(index, self.total - self.visible))
+        self._update_scrollbar()
+        self._request_window()
+
+    def scroll(self, rows):
+        self.scroll_to(self.first + rows)
+        return "break"
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"|"pages")"""
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            count = int(args[1])
+            self.scroll(count * self.visible if args[2] == "pages" else count)
+
+    def _on_wheel(self, event):
+        steps = -event.delta // 120 if abs(event.delta) >= 120 else (-1 if event.delta > 0 else 1)
+        return self.scroll(steps * WHEEL_ROWS)
+
+    # --- Selection ---
+    def _on_click(self, event):
+        # A plain click replaces the selection, including rows scrolled out of view
+        if not event.state & 0x0005 and self.tree.identify_region(event.x, event.y) in ("cell", "tree"):
+            self._selected.clear()
+
+    def _on_select(self, event=None):
+        shown = {int(iid) for iid in self._shown}
+        self._selected = (self._selected - shown) | {int(iid) for iid in self.tree.selection()}
+
+    def _on_key(self, step):
+        total = self.total
+        if not total:
+            return "break"
+        focus = self.tree.focus()
+        position = self._drawn_first + (self._shown.index(focus) if focus in self._shown else 0)
+        if step == "page":
+            step = self.visible
+        elif step == "-page":
+            step = -self.visible
+        elif step == "home":
+            step = -total
+        elif step == "end":
+            step = total
+        target = max(0, min(total - 1, position + step))
+        if target < self.first:
+            self.first = target
+        elif target >= self.first + self.visible:
+            self.first = target - self.visible + 1
+        self._selected.clear()
+
+        def focus_target(total):
+            offset = target - self._drawn_first
+            if 0 <= offset < len(self._shown):
+                iid = self._shown[offset]
+                self._selected = {int(iid)}
+                self.tree.focus(iid)
+                self.tree.selection_set(iid)
+        model, first, visible = self.model, self.first, self.visible
+        self._submit(lambda: model.window(first, visible), focus_target)
+        return "break"